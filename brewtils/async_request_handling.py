@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""Asyncio-based request processing
+
+This module requires Python 3.7+. It's only imported when a Plugin is created with the
+``async_processing`` option.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import threading
+import time
+from concurrent.futures import wait
+from functools import partial
+
+import brewtils.plugin
+from brewtils import metrics, tracing
+from brewtils.models import Request
+from brewtils.request_handling import (
+    RequestProcessor,
+    _close_parameters,
+    _command_option,
+    _span_attributes,
+)
+
+
+class _NoLimit(object):
+    """Stand-in for a Semaphore when a command has no limit"""
+
+    async def __aenter__(self):
+        pass
+
+    async def __aexit__(self, *args):
+        pass
+
+    def locked(self):
+        return False
+
+
+class AsyncRequestProcessor(RequestProcessor):
+    """RequestProcessor that runs commands on an asyncio event loop
+
+    Commands defined with ``async def`` are run as coroutines on an event loop owned by
+    this processor. That allows an I/O-bound plugin to have a large number of Requests
+    in flight without needing a thread for each one.
+
+    Regular commands, parameter resolution and Request updates all block, so they are
+    run on the processor's thread pool (sized by ``max_workers``). The total number of
+    Requests being processed at once is limited by ``max_concurrent``. Commands with
+    their own ``max_concurrent`` limit are also limited individually, and regular
+    commands that specify a ``pool`` will run in that pool.
+
+    Args:
+        target: Incoming requests will be invoked on this object
+        updater: RequestUpdater that will be used for updating requests
+        consumer: RequestConsumer that will deliver messages to this processor
+        max_concurrent: Max number of Requests to process at once
+        **kwargs: Will be passed to the RequestProcessor
+    """
+
+    def __init__(self, target, updater, consumer, max_concurrent=100, **kwargs):
+        super(AsyncRequestProcessor, self).__init__(target, updater, consumer, **kwargs)
+
+        self._max_concurrent = max_concurrent
+        self._semaphore = None
+
+        # The number of Requests in flight isn't limited by the thread pool here
+        if self._prefetch_tuner:
+            self._prefetch_tuner.workers = max_concurrent
+
+        self._command_semaphores = {}
+        self._command_waiting = {}
+        self._in_flight = set()
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name="AsyncRequestProcessor"
+        )
+        self._loop_thread.daemon = True
+
+    def on_message_received(self, message, headers):
+        """Callback function that will be invoked for received messages
+
+        This will attempt to parse the message and then run the parsed Request through
+        all validation functions that this RequestProcessor knows about.
+
+        If the request parses cleanly and passes validation it will be scheduled on
+        this RequestProcessor's event loop for processing.
+
+        Args:
+            message: The message string
+            headers: The header dictionary
+
+        Returns:
+            A future that will complete when processing finishes
+
+        Raises:
+            DiscardMessageException: The request failed to parse correctly
+            RequestProcessException: Validation failures should raise a subclass of this
+        """
+        request = self._parse(message)
+
+        for func in self._validation_funcs:
+            func(request)
+
+        # This message has already been processed, all it needs to do is update
+        if request.status in Request.COMPLETED_STATUSES:
+            coroutine = self._update_request(request, headers)
+        else:
+            if self._prefetch_tuner:
+                self._prefetch_tuner.received()
+
+            self._enqueued(request)
+            coroutine = self.process_message_async(self._target, request, headers)
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+        self._in_flight.add(future)
+        future.add_done_callback(self._in_flight.discard)
+
+        return future
+
+    async def process_message_async(self, target, request, headers):
+        """Process a message. Intended to be run on the event loop.
+
+        Will set the status to IN_PROGRESS, invoke the command, and set the final
+        status / output / error_class.
+
+        Args:
+            target: The object to invoke received commands on
+            request: The parsed Request
+            headers: Dictionary of headers from the `PikaConsumer`
+
+        Returns:
+            None
+        """
+        # Created here so that it's bound to the correct loop on older Pythons
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+
+        command_semaphore = self._get_command_semaphore(target, request)
+
+        # Requests waiting on their command's limit are (up to a point) excluded from
+        # the prefetch
+        deferred = command_semaphore.locked()
+        if deferred:
+            self._change_waiting(target, request, 1)
+
+        try:
+            # Wait for a command slot first so a Request blocked on its command's limit
+            # doesn't hold one of the overall slots
+            async with command_semaphore:
+                if deferred:
+                    deferred = False
+                    self._change_waiting(target, request, -1)
+
+                async with self._semaphore:
+                    self._dequeued(request)
+
+                    if not self._prefetch_tuner:
+                        return await self._process_message_async(
+                            target, request, headers
+                        )
+
+                    self._prefetch_tuner.started()
+                    start = time.time()
+
+                    try:
+                        await self._process_message_async(target, request, headers)
+                    finally:
+                        self._prefetch_tuner.finished(time.time() - start)
+        finally:
+            if deferred:
+                self._change_waiting(target, request, -1)
+
+    def _change_waiting(self, target, request, change):
+        """Track the Requests waiting on a command's limit. Only run on the loop."""
+        waiting = self._command_waiting.get(request.command, 0) + change
+        self._command_waiting[request.command] = waiting
+
+        limit = _command_option(
+            getattr(target, request.command, None), "_max_concurrent", int
+        )
+        self._change_deferred(limit, waiting, change)
+
+    async def _process_message_async(self, target, request, headers):
+        with tracing.span(
+            "process_message",
+            context=tracing.extract_context(headers, request.metadata),
+            attributes=_span_attributes(request),
+        ):
+            request.status = "IN_PROGRESS"
+            await self._update_request(request, headers)
+
+            try:
+                output = await self._invoke_command_async(target, request, headers)
+            except Exception as exc:
+                self._handle_invoke_failure(request, exc)
+            else:
+                self._handle_invoke_success(request, output)
+
+            await self._update_request(request, headers)
+
+    def startup(self):
+        """Start the RequestProcessor"""
+        if self._prefetch_tuner:
+            self._prefetch_tuner.start()
+
+        self._loop_thread.start()
+        self.consumer.start()
+
+    def shutdown(self):
+        """Stop the RequestProcessor"""
+        self.logger.debug("Shutting down consumer")
+        self.consumer.stop_consuming()
+
+        # Finish all current actions
+        wait(list(self._in_flight))
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+
+        self._shutdown_pools()
+
+        self.consumer.stop()
+        self.consumer.join()
+
+        # Give the updater a chance to shutdown
+        self._updater.shutdown()
+
+    async def _invoke_command_async(self, target, request, headers):
+        """Invoke the function named in request.command
+
+        Coroutine functions are awaited on the event loop. Anything else is run on the
+        thread pool.
+
+        Args:
+            target: The object to search for the function implementation.
+            request: The request to process
+            headers: The headers for this request
+
+        Returns:
+            The output of the function call
+
+        Raises:
+            RequestProcessingError: The specified target does not define a
+                callable implementation of request.command
+        """
+        method = getattr(target, request.command, None)
+
+        if not inspect.iscoroutinefunction(method):
+            pool = self._get_pool(_command_option(method, "_pool", str))
+
+            return await self._loop.run_in_executor(
+                pool,
+                partial(
+                    contextvars.copy_context().run,
+                    self._invoke_command_in_thread,
+                    target,
+                    request,
+                    headers,
+                ),
+            )
+
+        parameters = await self._run_blocking(self._resolve_parameters, request)
+
+        # Each Request is processed in its own task, so this only affects this Request
+        brewtils.plugin.request_context.async_request.set(request)
+
+        metrics.increment(
+            "brewtils_requests_invoked_total", labels={"command": request.command}
+        )
+
+        try:
+            with metrics.timed("invoke", request.command), tracing.span(
+                "invoke_command", attributes=_span_attributes(request)
+            ):
+                return await method(**parameters)
+        finally:
+            _close_parameters(parameters)
+
+    def _get_command_semaphore(self, target, request):
+        """Get the semaphore enforcing a command's max_concurrent limit
+
+        Commands without a limit get a stand-in that never blocks.
+        """
+        if request.command not in self._command_semaphores:
+            method = getattr(target, request.command, None)
+            limit = _command_option(method, "_max_concurrent", int)
+
+            self._command_semaphores[request.command] = (
+                asyncio.Semaphore(limit) if limit else _NoLimit()
+            )
+
+        return self._command_semaphores[request.command]
+
+    def _invoke_command_in_thread(self, target, request, headers):
+        brewtils.plugin.request_context.current_request = request
+
+        return self._invoke_command(target, request, headers)
+
+    async def _update_request(self, request, headers):
+        await self._run_blocking(self._updater.update_request, request, headers)
+
+    def _run_blocking(self, func, *args):
+        # Copy the context so the current tracing span is visible in the thread
+        return self._loop.run_in_executor(
+            self._pool, partial(contextvars.copy_context().run, func, *args)
+        )
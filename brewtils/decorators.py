@@ -11,7 +11,7 @@ import six
 
 from brewtils.choices import process_choices
 from brewtils.display import resolve_form, resolve_schema, resolve_template
-from brewtils.errors import PluginParamError, _deprecate
+from brewtils.errors import PluginParamError, PluginValidationError, _deprecate
 from brewtils.models import Command, Parameter, Resolvable
 
 if sys.version_info.major == 2:
@@ -27,6 +27,9 @@ __all__ = [
     "system",
 ]
 
+# Valid values for the @command executor argument
+EXECUTORS = ("thread", "process")
+
 
 def client(
     _wrapped=None,  # type: Type
@@ -86,6 +89,9 @@ def command(
     icon_name=None,  # type: Optional[str]
     hidden=False,  # type: Optional[bool]
     metadata=None,  # type: Optional[Dict]
+    executor=None,  # type: Optional[str]
+    max_concurrent=None,  # type: Optional[int]
+    pool=None,  # type: Optional[str]
 ):
     """Decorator for specifying Command details
 
@@ -114,6 +120,18 @@ def command(
         icon_name: The icon name. Should be either a FontAwesome or a Glyphicon name.
         hidden: Flag controlling whether the command is visible on the user interface.
         metadata: Free-form dictionary
+        executor: Where the command will be run. Valid options are 'thread' and
+            'process'. Use 'process' for CPU-bound commands so they aren't limited by
+            the GIL - the client object, parameters and return value must be
+            picklable. Worker processes are started with the 'spawn' method, so the
+            module defining the client must be importable without side effects (guard
+            the Plugin's startup with ``if __name__ == "__main__"``). If not given the
+            Plugin's command_executor setting is used.
+        max_concurrent: Maximum number of Requests for this command to process at
+            once. Additional Requests will wait without taking a worker thread.
+        pool: Name of a dedicated thread pool to run this command in, so it doesn't
+            compete with other commands for threads. Pools are sized by the Plugin's
+            command_pools setting.
 
     Returns:
         The decorated function
@@ -148,6 +166,23 @@ def command(
             icon_name=icon_name,
             hidden=hidden,
             metadata=metadata,
+            executor=executor,
+            max_concurrent=max_concurrent,
+            pool=pool,
+        )
+
+    if executor not in (None,) + EXECUTORS:
+        raise PluginValidationError(
+            "Invalid executor '%s', must be one of %s" % (executor, EXECUTORS)
+        )
+
+    if max_concurrent is not None and (
+        not isinstance(max_concurrent, int)
+        or isinstance(max_concurrent, bool)
+        or max_concurrent < 1
+    ):
+        raise PluginValidationError(
+            "Invalid max_concurrent '%s', must be a positive integer" % max_concurrent
         )
 
     new_command = Command(
@@ -166,8 +201,14 @@ def command(
     # Python 2 compatibility
     if hasattr(_wrapped, "__func__"):
         _wrapped.__func__._command = new_command
+        _wrapped.__func__._executor = executor
+        _wrapped.__func__._max_concurrent = max_concurrent
+        _wrapped.__func__._pool = pool
     else:
         _wrapped._command = new_command
+        _wrapped._executor = executor
+        _wrapped._max_concurrent = max_concurrent
+        _wrapped._pool = pool
 
     return _wrapped
 
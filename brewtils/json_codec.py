@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""JSON encoding / decoding used for all Brewtils model (de)serialization
+
+The schemas, ``SchemaParser``, ``RequestProcessor`` and the REST clients all go through
+the ``dumps`` and ``loads`` functions in this module instead of using a JSON library
+directly. That makes it possible to switch to a faster library when one is installed::
+
+    from brewtils import json_codec
+
+    json_codec.set_backend("orjson")
+
+Supported backends are ``orjson``, ``ujson``, ``simplejson`` and ``json`` (the standard
+library). The special name ``auto`` selects the first of those that's installed. If the
+requested backend isn't installed the standard library is used instead.
+"""
+
+import json
+import logging
+
+import six
+
+__all__ = [
+    "BACKENDS",
+    "DEFAULT_BACKEND",
+    "dumps",
+    "get_backend",
+    "loads",
+    "set_backend",
+]
+
+logger = logging.getLogger(__name__)
+
+# Ordered from fastest to slowest, which is the order "auto" will try them
+BACKENDS = ("orjson", "ujson", "simplejson", "json")
+
+DEFAULT_BACKEND = "simplejson"
+
+
+def _load_orjson():
+    import orjson
+
+    # Allow non-string keys to match the behavior of the other libraries
+    option = orjson.OPT_NON_STR_KEYS
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=option).decode("utf-8")
+
+    return _dumps, orjson.loads, False
+
+
+def _load_ujson():
+    import ujson
+
+    def _dumps(obj):
+        return ujson.dumps(obj, escape_forward_slashes=False)
+
+    return _dumps, ujson.loads, False
+
+
+def _load_simplejson():
+    import simplejson
+
+    return simplejson.dumps, simplejson.loads, True
+
+
+def _load_json():
+    return json.dumps, json.loads, True
+
+
+_loaders = {
+    "orjson": _load_orjson,
+    "ujson": _load_ujson,
+    "simplejson": _load_simplejson,
+    "json": _load_json,
+}
+
+# (name, dumps, loads, accepts_kwargs) for the active backend, set at import
+_backend = None
+
+
+def set_backend(name=DEFAULT_BACKEND):
+    # type: (str) -> str
+    """Select the JSON library to use
+
+    Args:
+        name: One of ``BACKENDS`` or ``auto``
+
+    Returns:
+        The name of the backend that is now active. This will be ``json`` if the
+        requested library is not installed.
+
+    Raises:
+        ValueError: The name is not a known backend
+    """
+    global _backend
+
+    if name == "auto":
+        candidates = BACKENDS
+    elif name in BACKENDS:
+        candidates = (name,)
+    else:
+        raise ValueError(
+            "Unknown JSON backend '%s', must be one of %s" % (name, BACKENDS)
+        )
+
+    for candidate in candidates:
+        try:
+            _backend = (candidate,) + _loaders[candidate]()
+            return candidate
+        except ImportError:
+            pass
+
+    logger.warning(
+        "JSON backend '%s' is not installed, falling back to the standard library"
+        % name
+    )
+    _backend = ("json",) + _load_json()
+
+    return "json"
+
+
+def get_backend():
+    # type: () -> str
+    """Get the name of the active JSON backend"""
+    return _backend[0]
+
+
+def dumps(obj, *args, **kwargs):
+    """Serialize an object to a JSON string using the active backend
+
+    Backends that don't support extra formatting arguments (``orjson`` and ``ujson``)
+    will defer to the standard library if any are given.
+
+    Raises:
+        TypeError: The object is not serializable
+        ValueError: The object contains a value that can't be represented, like a
+            circular reference or an integer that's too large for the backend
+    """
+    _, backend_dumps, _, accepts_kwargs = _backend
+
+    if (args or kwargs) and not accepts_kwargs:
+        backend_dumps = json.dumps
+
+    try:
+        return backend_dumps(obj, *args, **kwargs)
+    except OverflowError as ex:
+        # ujson raises OverflowError for large integers and deeply nested objects
+        six.raise_from(ValueError(str(ex)), ex)
+
+
+def loads(s, *args, **kwargs):
+    """Deserialize a JSON string using the active backend
+
+    Raises:
+        ValueError: The string is not valid JSON
+    """
+    _, _, backend_loads, accepts_kwargs = _backend
+
+    if (args or kwargs) and not accepts_kwargs:
+        return json.loads(s, *args, **kwargs)
+
+    return backend_loads(s, *args, **kwargs)
+
+
+set_backend()
@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+"""Metrics for the request processing pipeline
+
+The ``RequestProcessor``, ``PikaConsumer`` and ``HTTPRequestUpdater`` report counters,
+histograms and gauges through the functions in this module. By default those go to a
+``NoopMetricsSink`` and are thrown away. To collect them, install a different sink::
+
+    from brewtils import metrics
+
+    metrics.set_sink(metrics.InMemoryMetricsSink())
+
+``InMemoryMetricsSink`` keeps everything in memory and can render it in the Prometheus
+text exposition format. A ``MetricsServer`` will serve that over HTTP, which is what
+the Plugin's ``metrics_port`` option does. Sending metrics somewhere else is a matter
+of implementing ``MetricsSink``.
+
+Metrics reported:
+
+- ``brewtils_messages_received_total``: Messages received from the queue
+- ``brewtils_requests_parsed_total``: Requests parsed, by command
+- ``brewtils_requests_invoked_total``: Commands invoked, by command
+- ``brewtils_requests_succeeded_total``: Commands that succeeded, by command
+- ``brewtils_requests_failed_total``: Commands that raised, by command
+- ``brewtils_requests_republished_total``: Requests republished, by command
+- ``brewtils_messages_nacked_total``: Messages nacked by the consumer
+- ``brewtils_request_stage_seconds``: Time spent in each stage of processing, by
+  stage (``parse``, ``queue``, ``resolve``, ``invoke`` or ``update``) and command
+- ``brewtils_pool_queue_depth``: Requests waiting for a worker, by pool
+- ``brewtils_file_cache_hits_total``: File parameters found in the file cache
+- ``brewtils_file_cache_misses_total``: File parameters not found in the file cache
+"""
+
+import abc
+import bisect
+import logging
+import threading
+import time
+
+import six
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "InMemoryMetricsSink",
+    "MetricsServer",
+    "MetricsSink",
+    "NoopMetricsSink",
+    "add_gauge",
+    "get_sink",
+    "increment",
+    "is_enabled",
+    "observe",
+    "observe_stage",
+    "set_gauge",
+    "set_sink",
+    "timed",
+]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+@six.add_metaclass(abc.ABCMeta)
+class MetricsSink(object):
+    """Destination for metrics
+
+    Labels are passed as a dictionary of label names to values. Implementations must
+    be safe to call from multiple threads.
+    """
+
+    @abc.abstractmethod
+    def increment(self, name, amount=1, labels=None):
+        """Increment a counter"""
+
+    @abc.abstractmethod
+    def observe(self, name, value, labels=None):
+        """Record a value in a histogram"""
+
+    @abc.abstractmethod
+    def set_gauge(self, name, value, labels=None):
+        """Set a gauge to a value"""
+
+    @abc.abstractmethod
+    def add_gauge(self, name, amount, labels=None):
+        """Add an amount (which may be negative) to a gauge"""
+
+
+class NoopMetricsSink(MetricsSink):
+    """Sink that discards everything"""
+
+    def increment(self, name, amount=1, labels=None):
+        pass
+
+    def observe(self, name, value, labels=None):
+        pass
+
+    def set_gauge(self, name, value, labels=None):
+        pass
+
+    def add_gauge(self, name, amount, labels=None):
+        pass
+
+
+class _Histogram(object):
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """Sink that keeps metrics in memory
+
+    Args:
+        buckets: Upper bounds of the histogram buckets, in increasing order
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def increment(self, name, amount=1, labels=None):
+        key = _key(labels)
+
+        with self._lock:
+            values = self._counters.setdefault(name, {})
+            values[key] = values.get(key, 0) + amount
+
+    def observe(self, name, value, labels=None):
+        key = _key(labels)
+
+        with self._lock:
+            values = self._histograms.setdefault(name, {})
+            if key not in values:
+                values[key] = _Histogram(self.buckets)
+
+            histogram = values[key]
+            histogram.counts[bisect.bisect_left(self.buckets, value)] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def set_gauge(self, name, value, labels=None):
+        key = _key(labels)
+
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def add_gauge(self, name, amount, labels=None):
+        key = _key(labels)
+
+        with self._lock:
+            values = self._gauges.setdefault(name, {})
+            values[key] = values.get(key, 0) + amount
+
+    def get(self, name, labels=None):
+        """Get the current value of a counter or gauge
+
+        Args:
+            name: The metric name
+            labels: The metric labels
+
+        Returns:
+            The value, or 0 if it has never been set
+        """
+        key = _key(labels)
+
+        with self._lock:
+            for metrics in (self._counters, self._gauges):
+                if key in metrics.get(name, {}):
+                    return metrics[name][key]
+
+        return 0
+
+    def get_histogram(self, name, labels=None):
+        """Get the count and sum of a histogram
+
+        Args:
+            name: The metric name
+            labels: The metric labels
+
+        Returns:
+            Tuple of (count, sum), or (0, 0.0) if nothing has been observed
+        """
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_key(labels))
+
+            return (histogram.count, histogram.sum) if histogram else (0, 0.0)
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format
+
+        Returns:
+            The metrics as a string
+        """
+        lines = []
+
+        with self._lock:
+            for metric_type, metrics in (
+                ("counter", self._counters),
+                ("gauge", self._gauges),
+            ):
+                for name in sorted(metrics):
+                    lines.append("# TYPE %s %s" % (name, metric_type))
+
+                    for key, value in sorted(metrics[name].items()):
+                        lines.append(
+                            "%s%s %s" % (name, _format_labels(key), _number(value))
+                        )
+
+            for name in sorted(self._histograms):
+                lines.append("# TYPE %s histogram" % name)
+
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            "%s_bucket%s %d"
+                            % (name, _format_labels(key + (("le", bound),)), cumulative)
+                        )
+
+                    labels = _format_labels(key)
+                    lines.append("%s_sum%s %s" % (name, labels, _number(histogram.sum)))
+                    lines.append("%s_count%s %d" % (name, labels, histogram.count))
+
+        return "\n".join(lines) + "\n"
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+
+        body = self.server.sink.render().encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class MetricsServer(object):
+    """HTTP server exposing an InMemoryMetricsSink in the Prometheus text format
+
+    Metrics are served at ``/metrics``.
+
+    Args:
+        sink: The InMemoryMetricsSink to expose
+        host: Address to listen on
+        port: Port to listen on. Use 0 to pick a free port.
+    """
+
+    def __init__(self, sink, host="127.0.0.1", port=0):
+        self._server = _ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.sink = sink
+        self._thread = None
+
+    @property
+    def port(self):
+        """The port the server is listening on"""
+        return self._server.server_address[1]
+
+    def start(self):
+        """Start serving in a daemon thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="MetricsServer"
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        if self._thread:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+
+def _key(labels):
+    # Label values are normalized to strings so keys always sort (a Request with no
+    # command would otherwise put None next to strings)
+    if not labels:
+        return ()
+
+    return tuple(
+        sorted(
+            (name, "" if value is None else six.text_type(value))
+            for name, value in labels.items()
+        )
+    )
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return (
+        six.text_type(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _format_labels(key):
+    if not key:
+        return ""
+
+    return "{%s}" % ",".join('%s="%s"' % (name, _escape(value)) for name, value in key)
+
+
+class _StageTimer(object):
+    def __init__(self, stage, command):
+        self._stage = stage
+        self._command = command
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.time()
+
+    def __exit__(self, *args):
+        observe_stage(self._stage, self._command, time.time() - self._start)
+
+
+class _NoopTimer(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+_NOOP_TIMER = _NoopTimer()
+
+_sink = NoopMetricsSink()
+_enabled = False
+
+
+def get_sink():
+    """Get the current metrics sink"""
+    return _sink
+
+
+def is_enabled():
+    """Determine if metrics are being collected (the sink isn't a NoopMetricsSink)"""
+    return _enabled
+
+
+def set_sink(sink=None):
+    """Set the metrics sink
+
+    Args:
+        sink: The new MetricsSink. Passing None will install a NoopMetricsSink.
+
+    Returns:
+        The new sink
+    """
+    global _sink, _enabled
+
+    _sink = sink or NoopMetricsSink()
+    _enabled = not isinstance(_sink, NoopMetricsSink)
+
+    return _sink
+
+
+def increment(name, amount=1, labels=None):
+    """Increment a counter on the current sink"""
+    _sink.increment(name, amount=amount, labels=labels)
+
+
+def observe(name, value, labels=None):
+    """Record a histogram value on the current sink"""
+    _sink.observe(name, value, labels=labels)
+
+
+def set_gauge(name, value, labels=None):
+    """Set a gauge on the current sink"""
+    _sink.set_gauge(name, value, labels=labels)
+
+
+def add_gauge(name, amount, labels=None):
+    """Add to a gauge on the current sink"""
+    _sink.add_gauge(name, amount, labels=labels)
+
+
+def timed(stage, command=None):
+    """Context manager that records the time spent in a stage of request processing
+
+    The duration is recorded in ``brewtils_request_stage_seconds`` even if the block
+    raises. Nothing is timed when metrics aren't being collected.
+
+    Args:
+        stage: The stage name
+        command: The command being processed
+
+    Returns:
+        The context manager
+    """
+    return _StageTimer(stage, command) if _enabled else _NOOP_TIMER
+
+
+def observe_stage(stage, command, seconds):
+    """Record the time spent in a stage of request processing
+
+    Args:
+        stage: The stage name
+        command: The command being processed
+        seconds: The time spent
+
+    Returns:
+        None
+    """
+    observe(
+        "brewtils_request_stage_seconds",
+        seconds,
+        labels={"stage": stage, "command": command or ""},
+    )
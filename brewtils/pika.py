@@ -3,6 +3,9 @@ from __future__ import absolute_import
 
 import logging
 import ssl as pyssl
+import threading
+import time
+from collections import OrderedDict, deque
 from functools import partial
 
 from pika import (
@@ -14,13 +17,26 @@ from pika import (
     SSLOptions,
     URLParameters,
 )
-from pika.exceptions import AMQPError
-from pika.spec import PERSISTENT_DELIVERY_MODE
+from pika.adapters.blocking_connection import ReturnedMessage
+from pika.exceptions import (
+    AMQPConnectionError,
+    AMQPError,
+    NackError,
+    UnroutableError,
+)
+from pika.spec import PERSISTENT_DELIVERY_MODE, Basic
 
-from brewtils.errors import DiscardMessageException, RepublishRequestException
+from brewtils import metrics
+from brewtils.errors import (
+    DiscardMessageException,
+    RepublishRequestException,
+    RequestPublishException,
+)
 from brewtils.request_handling import RequestConsumer
 from brewtils.schema_parser import SchemaParser
 
+logger = logging.getLogger(__name__)
+
 
 class PikaClient(object):
     """Base class for connecting to RabbitMQ using Pika
@@ -224,6 +240,408 @@ class TransientPikaClient(PikaClient):
             )
 
 
+class _PooledConnection(object):
+    """A BlockingConnection and channel owned by a PooledPikaClient
+
+    The channel is put into publisher-acknowledgements mode, but confirmations are
+    tracked here instead of by the BlockingChannel. That allows many messages to be
+    published before waiting for the broker to confirm all of them at once.
+    """
+
+    def __init__(self, connection_parameters):
+        self.connection = BlockingConnection(connection_parameters)
+        self.channel = self.connection.channel()
+
+        self._next_tag = 1
+        self._pending = set()
+        self._untracked = set()
+        self._nacked = []
+        self._returned = []
+
+        # The BlockingChannel only supports waiting for one confirmation at a time, so
+        # enable confirmations on the underlying channel directly
+        selected = []
+        self.channel._impl.confirm_delivery(
+            ack_nack_callback=self._on_confirmation,
+            callback=lambda _: selected.append(True),
+        )
+        while not selected:
+            self.connection.process_data_events(time_limit=1)
+
+        self.channel.add_on_return_callback(self._on_return)
+
+    @property
+    def is_open(self):
+        return self.connection.is_open and self.channel.is_open
+
+    def close(self):
+        try:
+            if self.connection.is_open:
+                self.connection.close()
+        except AMQPError:
+            pass
+
+    def publish(self, message, exchange, properties, routing_key, mandatory, track):
+        """Publish a message, returning the delivery tag"""
+        self.channel.basic_publish(
+            exchange=exchange,
+            routing_key=routing_key,
+            body=message,
+            properties=properties,
+            mandatory=mandatory,
+        )
+
+        tag = self._next_tag
+        self._next_tag += 1
+
+        if track:
+            self._pending.add(tag)
+        elif mandatory:
+            self._untracked.add(tag)
+
+        return tag
+
+    def settle(self, timeout):
+        """Wait until the broker has confirmed all untracked mandatory messages
+
+        The broker sends a basic.return before the confirmation of the message it
+        belongs to. Settling before publishing tracked messages means any return
+        received while waiting for their confirmations belongs to one of them.
+        """
+        deadline = time.time() + timeout
+
+        while self._untracked:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.warning(
+                    "Timed out waiting for confirmation of %d untracked messages",
+                    len(self._untracked),
+                )
+                self._untracked.clear()
+                break
+
+            self.connection.process_data_events(time_limit=remaining)
+
+    def wait_for_confirms(self, timeout):
+        """Wait until the broker has confirmed all tracked messages
+
+        Raises:
+            NackError: The broker was unable to process one or more messages
+            UnroutableError: One or more mandatory messages could not be routed
+            RequestPublishException: Timed out waiting for confirmations
+        """
+        deadline = time.time() + timeout
+
+        try:
+            while self._pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise RequestPublishException(
+                        "Timed out waiting for publish confirmations"
+                    )
+
+                self.connection.process_data_events(time_limit=remaining)
+
+            nacked, returned = self._nacked, self._returned
+        finally:
+            self._pending = set()
+            self._nacked = []
+            self._returned = []
+
+        if nacked:
+            raise NackError(nacked)
+        if returned:
+            raise UnroutableError(returned)
+
+    def _on_confirmation(self, frame):
+        method = frame.method
+        tag = method.delivery_tag
+
+        if method.multiple:
+            confirmed = set(t for t in self._pending if t <= tag)
+        else:
+            confirmed = {tag} & self._pending
+
+        self._pending -= confirmed
+
+        if method.multiple:
+            self._untracked -= set(t for t in self._untracked if t <= tag)
+        else:
+            self._untracked.discard(tag)
+
+        if confirmed and isinstance(method, Basic.Nack):
+            self._nacked.extend(confirmed)
+
+    def _on_return(self, _channel, method, properties, body):
+        # Nobody is waiting to be told about returns of untracked messages
+        if not self._pending:
+            logger.debug("Dropping returned message for %s", method.routing_key)
+            return
+
+        self._returned.append(ReturnedMessage(method, properties, body))
+
+
+class PooledPikaClient(PikaClient):
+    """Client implementation that reuses connections and channels
+
+    The ``TransientPikaClient`` opens a new connection for every action. This client
+    instead keeps up to ``pool_size`` connections open and shares them between threads
+    (each connection is only used by one thread at a time).
+
+    If a connection has been closed (for example, if the broker restarted) it's
+    replaced and the action is retried once. Note that means a message could be
+    published twice if the connection is lost after publishing but before the
+    confirmation was received.
+
+    Args:
+        pool_size: Maximum number of connections to keep open
+        confirm_timeout: Maximum time (seconds) to wait for publish confirmations
+        **kwargs: Will be passed to the PikaClient
+    """
+
+    def __init__(self, pool_size=4, confirm_timeout=30, **kwargs):
+        super(PooledPikaClient, self).__init__(**kwargs)
+
+        self._pool_size = pool_size
+        self._confirm_timeout = confirm_timeout
+
+        self._idle = []
+        self._size = 0
+        self._pool_condition = threading.Condition()
+
+    def close(self):
+        """Close all idle connections"""
+        with self._pool_condition:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+
+        for pooled in idle:
+            pooled.close()
+
+    def is_alive(self):
+        try:
+            return self._run(lambda pooled: pooled.is_open)
+        except AMQPError:
+            return False
+
+    def declare_exchange(self):
+        self._run(
+            lambda pooled: pooled.channel.exchange_declare(
+                exchange=self._exchange, exchange_type="topic", durable=True
+            )
+        )
+
+    def setup_queue(self, queue_name, queue_args, routing_keys):
+        """Create a new queue with queue_args and bind it to routing_keys"""
+
+        def _setup(pooled):
+            pooled.channel.queue_declare(queue_name, **queue_args)
+
+            for routing_key in routing_keys:
+                pooled.channel.queue_bind(
+                    queue_name, self._exchange, routing_key=routing_key
+                )
+
+        self._run(_setup)
+
+        return {"name": queue_name, "args": queue_args}
+
+    def publish(self, message, **kwargs):
+        """Publish a message
+
+        Accepts the same arguments as ``TransientPikaClient.publish``.
+
+        Args:
+            message: Message to publish
+            kwargs: Additional message properties
+        """
+        self.publish_batch([(message, kwargs)], confirm=kwargs.get("confirm", False))
+
+    def publish_batch(self, messages, confirm=True):
+        """Publish multiple messages, waiting for confirmation once at the end
+
+        Args:
+            messages: Iterable of (message, kwargs) tuples. The kwargs are the same as
+                the ``publish`` kwargs (except confirm).
+            confirm: Wait for the broker to confirm all messages have been received
+
+        Raises:
+            NackError: The broker was unable to process one or more messages
+            UnroutableError: One or more mandatory messages could not be routed
+            RequestPublishException: Timed out waiting for confirmations
+        """
+        messages = list(messages)
+
+        def _publish(pooled):
+            if confirm:
+                pooled.settle(self._confirm_timeout)
+
+            for message, kwargs in messages:
+                pooled.publish(
+                    message,
+                    exchange=self._exchange,
+                    routing_key=kwargs["routing_key"],
+                    properties=self._properties(kwargs),
+                    mandatory=kwargs.get("mandatory") or False,
+                    track=confirm,
+                )
+
+            if confirm:
+                pooled.wait_for_confirms(self._confirm_timeout)
+
+        self._run(_publish)
+
+    @staticmethod
+    def _properties(kwargs):
+        return BasicProperties(
+            app_id="beer-garden",
+            content_type="text/plain",
+            headers=kwargs.get("headers"),
+            expiration=kwargs.get("expiration"),
+            delivery_mode=kwargs.get("delivery_mode"),
+            priority=kwargs.get("priority"),
+        )
+
+    def _run(self, func):
+        """Run a function with a pooled connection, reconnecting once if necessary"""
+        for attempt in range(2):
+            pooled = self._acquire()
+
+            try:
+                result = func(pooled)
+            except AMQPConnectionError:
+                self._discard(pooled)
+
+                if attempt:
+                    raise
+            except Exception:
+                # Errors like a failed queue declaration will close the channel
+                if pooled.is_open:
+                    self._release(pooled)
+                else:
+                    self._discard(pooled)
+                raise
+            else:
+                self._release(pooled)
+                return result
+
+    def _acquire(self):
+        with self._pool_condition:
+            while not self._idle and self._size >= self._pool_size:
+                self._pool_condition.wait()
+
+            if self._idle:
+                pooled = self._idle.pop()
+            else:
+                pooled = None
+                self._size += 1
+
+        if pooled is not None:
+            # Service heartbeats and find out if the broker has closed the connection
+            try:
+                pooled.connection.process_data_events(time_limit=0)
+                if pooled.is_open:
+                    return pooled
+            except AMQPError:
+                pass
+
+            pooled.close()
+
+        try:
+            return _PooledConnection(self._conn_params)
+        except Exception:
+            self._discard(None)
+            raise
+
+    def _release(self, pooled):
+        with self._pool_condition:
+            self._idle.append(pooled)
+            self._pool_condition.notify()
+
+    def _discard(self, pooled):
+        if pooled is not None:
+            pooled.close()
+
+        with self._pool_condition:
+            self._size -= 1
+            self._pool_condition.notify()
+
+
+class _AckBatcher(object):
+    """Tracks delivery tags so that completed messages can be acked together
+
+    A Basic.Ack with ``multiple`` set acks every unacked message up to and including
+    its delivery tag. That's only safe for the contiguous run of finished messages at
+    the start of the delivery order, so messages still being processed (or nacked)
+    are tracked here too.
+    """
+
+    def __init__(self):
+        self._outstanding = deque()
+        self._ready = set()
+        self._settled = set()
+
+    def __len__(self):
+        return len(self._ready)
+
+    def delivered(self, delivery_tag):
+        """Record that a message was delivered"""
+        self._outstanding.append(delivery_tag)
+
+    def ready(self, delivery_tag):
+        """Record that a message should be acked on the next flush"""
+        self._ready.add(delivery_tag)
+
+    def settled(self, delivery_tag):
+        """Record that a message was acked or nacked outside of a flush"""
+        self._settled.add(delivery_tag)
+
+    def reset(self):
+        """Forget everything, used when the channel changes"""
+        self._outstanding.clear()
+        self._ready.clear()
+        self._settled.clear()
+
+    def flush(self, channel, contiguous_only=False):
+        """Ack messages that are ready
+
+        Args:
+            channel: The channel the messages were delivered on
+            contiguous_only: Only ack the messages that can be acked together. Others
+                will stay ready until a later flush.
+
+        Returns:
+            None
+        """
+        last_contiguous = None
+        while self._outstanding:
+            delivery_tag = self._outstanding[0]
+
+            if delivery_tag in self._ready:
+                self._ready.discard(delivery_tag)
+                last_contiguous = delivery_tag
+            elif delivery_tag in self._settled:
+                self._settled.discard(delivery_tag)
+            else:
+                break
+
+            self._outstanding.popleft()
+
+        if last_contiguous is not None:
+            channel.basic_ack(last_contiguous, multiple=True)
+
+        if contiguous_only:
+            return
+
+        # Anything left finished after a message that is still being processed. Ack
+        # those individually so they don't count against the prefetch limit.
+        for delivery_tag in sorted(self._ready):
+            channel.basic_ack(delivery_tag)
+            self._settled.add(delivery_tag)
+
+        self._ready.clear()
+
+
 class PikaConsumer(RequestConsumer):
     """Pika message consumer
 
@@ -235,6 +653,10 @@ class PikaConsumer(RequestConsumer):
     Unexpected channel closures can indicate a problem with a command that was
     issued.
 
+    Requests that need to be republished are sent on a second channel on the same
+    connection. That channel is in publisher-acknowledgements mode, and the original
+    message is only acked once the broker confirms the republished message.
+
     Args:
         amqp_url: (str) The AMQP url to connect to
         queue_name: (str) The name of the queue to connect to
@@ -248,6 +670,11 @@ class PikaConsumer(RequestConsumer):
             queue before giving up (default -1 aka never)
         max_reconnect_timeout (int): Maximum time to wait before reconnect attempt
         starting_reconnect_timeout (int): Time to wait before first reconnect attempt
+        ack_batch_size (int): Number of finished messages that will trigger an ack.
+            Messages are acked with as few Basic.Ack frames as possible. The default of
+            1 acks each message as soon as it finishes.
+        ack_interval (float): Maximum amount of time to hold a finished message before
+            acking it. Only used if ack_batch_size is greater than 1.
     """
 
     def __init__(
@@ -263,9 +690,14 @@ class PikaConsumer(RequestConsumer):
         self._channel = None
         self._consumer_tag = None
 
+        self._publish_channel = None
+        self._publish_tag = 0
+        self._republishing = OrderedDict()
+
         self._queue_name = queue_name
         self._panic_event = panic_event
         self._max_concurrent = kwargs.get("max_concurrent", 1)
+        self._deferred = 0
         self.logger = logger or logging.getLogger(__name__)
 
         self._max_reconnect_attempts = kwargs.get("max_reconnect_attempts", -1)
@@ -273,6 +705,15 @@ class PikaConsumer(RequestConsumer):
         self._reconnect_timeout = kwargs.get("starting_reconnect_timeout", 5)
         self._reconnect_attempt = 0
 
+        self._ack_batch_size = kwargs.get("ack_batch_size", 1)
+        self._ack_interval = kwargs.get("ack_interval", 0.05)
+        self._ack_timer = None
+        self._acks = _AckBatcher()
+
+        self._finished = deque()
+        self._finished_lock = threading.Lock()
+        self._finish_scheduled = False
+
         if "connection_info" in kwargs:
             params = kwargs["connection_info"]
 
@@ -333,6 +774,7 @@ class PikaConsumer(RequestConsumer):
         (requested) shutdown. It then schedules a channel close on the IOLoop - the
         channel's on_close callback will close the connection, and the connection's
         on_close callback will terminate the IOLoop which will end the PikaConsumer.
+        Any batched acks are sent before the connection is closed.
 
         Returns:
             None
@@ -340,9 +782,7 @@ class PikaConsumer(RequestConsumer):
         self.logger.debug("Stopping request consumer")
 
         if self._connection:
-            self._connection.ioloop.add_callback_threadsafe(
-                partial(self._connection.close)
-            )
+            self._connection.ioloop.add_callback_threadsafe(self._close_connection)
 
     def is_connected(self):
         """Determine if the underlying connection is open
@@ -352,6 +792,51 @@ class PikaConsumer(RequestConsumer):
         """
         return self._connection and self._connection.is_open
 
+    def set_prefetch(self, prefetch_count):
+        """Change the number of unacknowledged messages the broker will deliver
+
+        This can be called from any thread. The new prefetch count will also be used if
+        the consumer reconnects.
+
+        Args:
+            prefetch_count: The new prefetch count
+
+        Returns:
+            None
+        """
+        self._max_concurrent = prefetch_count
+        self._schedule_prefetch()
+
+    def set_deferred(self, deferred_count):
+        """Set the number of delivered messages that are waiting on a command's limit
+
+        This can be called from any thread. Deferred messages are added to the prefetch
+        count, so they don't count against it.
+
+        Args:
+            deferred_count: The number of deferred messages to exclude from the
+                prefetch
+
+        Returns:
+            None
+        """
+        self._deferred = deferred_count
+        self._schedule_prefetch()
+
+    def _prefetch_count(self):
+        return self._max_concurrent + self._deferred
+
+    def _schedule_prefetch(self):
+        if self._connection and self._channel and self._channel.is_open:
+            self._connection.ioloop.add_callback_threadsafe(self._apply_prefetch)
+
+    def _apply_prefetch(self):
+        if self._channel and self._channel.is_open:
+            prefetch_count = self._prefetch_count()
+
+            self.logger.debug("Setting prefetch count to %s", prefetch_count)
+            self._channel.basic_qos(prefetch_count=prefetch_count)
+
     def on_message(self, channel, basic_deliver, properties, body):
         """Invoked when a message is delivered from the queueing service
 
@@ -382,6 +867,9 @@ class PikaConsumer(RequestConsumer):
         except AttributeError:
             pass
 
+        if self._batching_acks:
+            self._acks.delivered(basic_deliver.delivery_tag)
+
         try:
             future = self._on_message_callback(body, properties.headers)
             future.add_done_callback(
@@ -393,7 +881,7 @@ class PikaConsumer(RequestConsumer):
                 "Exception while trying to schedule message %s, about to nack%s: %s"
                 % (basic_deliver.delivery_tag, " and requeue" if requeue else "", ex)
             )
-            self._channel.basic_nack(basic_deliver.delivery_tag, requeue=requeue)
+            self._nack(basic_deliver.delivery_tag, requeue=requeue)
 
     def on_message_callback_complete(self, basic_deliver, future):
         """Invoked when the future returned by _on_message_callback completes.
@@ -401,6 +889,9 @@ class PikaConsumer(RequestConsumer):
         This method will be invoked from the threadpool context. It's only purpose is to
         schedule the final processing steps to take place on the connection's ioloop.
 
+        When acks are batched, messages that finish while the ioloop is busy are
+        collected and finished together in a single ioloop callback.
+
         Args:
             basic_deliver:
             future: Completed future
@@ -408,9 +899,20 @@ class PikaConsumer(RequestConsumer):
         Returns:
             None
         """
-        self._connection.ioloop.add_callback_threadsafe(
-            partial(self.finish_message, basic_deliver, future)
-        )
+        if not self._batching_acks:
+            self._connection.ioloop.add_callback_threadsafe(
+                partial(self.finish_message, basic_deliver, future)
+            )
+            return
+
+        with self._finished_lock:
+            self._finished.append((basic_deliver, future))
+
+            schedule = not self._finish_scheduled
+            self._finish_scheduled = True
+
+        if schedule:
+            self._connection.ioloop.add_callback_threadsafe(self._finish_messages)
 
     def finish_message(self, basic_deliver, future):
         """Finish processing a message
@@ -426,8 +928,8 @@ class PikaConsumer(RequestConsumer):
             - If the exception is an instance of DiscardMessageException it acks the
               message and does not requeue it
             - If the exception is an instance of RepublishRequestException it will
-              construct an entirely new BlockingConnection, use that to publish a new
-              message, and then ack the original message
+              publish a new message on the publish channel. The original message is
+              acked once the broker confirms the new one (see on_republish_confirmed)
             - If the exception is not an instance of either the panic_event is set and
               the consumer will self-destruct
 
@@ -446,7 +948,7 @@ class PikaConsumer(RequestConsumer):
         if not future.exception():
             try:
                 self.logger.debug("Acking message %s", delivery_tag)
-                self._channel.basic_ack(delivery_tag)
+                self._ack(delivery_tag)
             except Exception as ex:
                 self.logger.exception(
                     "Error acking message %s, about to shut down: %s", delivery_tag, ex
@@ -457,24 +959,7 @@ class PikaConsumer(RequestConsumer):
 
             if isinstance(real_ex, RepublishRequestException):
                 try:
-                    with BlockingConnection(self._connection_parameters) as c:
-                        headers = real_ex.headers
-                        headers.update({"request_id": real_ex.request.id})
-                        props = BasicProperties(
-                            app_id="beer-garden",
-                            content_type="text/plain",
-                            headers=headers,
-                            priority=1,
-                            delivery_mode=PERSISTENT_DELIVERY_MODE,
-                        )
-                        c.channel().basic_publish(
-                            exchange=basic_deliver.exchange,
-                            properties=props,
-                            routing_key=basic_deliver.routing_key,
-                            body=SchemaParser.serialize_request(real_ex.request),
-                        )
-
-                    self._channel.basic_ack(delivery_tag)
+                    self.republish(basic_deliver, real_ex)
                 except Exception as ex:
                     self.logger.exception(
                         "Error republishing message %s, about to shut down: %s",
@@ -486,7 +971,7 @@ class PikaConsumer(RequestConsumer):
                 self.logger.info(
                     "Nacking message %s, not attempting to requeue", delivery_tag
                 )
-                self._channel.basic_nack(delivery_tag, requeue=False)
+                self._nack(delivery_tag, requeue=False)
             else:
                 # If request processing throws anything else we terminate
                 self.logger.exception(
@@ -498,6 +983,170 @@ class PikaConsumer(RequestConsumer):
                 )
                 self._panic_event.set()
 
+    def republish(self, basic_deliver, republish_exception):
+        """Republish a request
+
+        The new message is published on the publish channel without waiting for the
+        broker, and the original message is acked when the broker confirms it. If the
+        publish channel isn't open yet the message is published on the consuming
+        channel and the original message is acked immediately.
+
+        This must be invoked on the connection's IOLoop.
+
+        Args:
+            basic_deliver: The basic_deliver of the original message
+            republish_exception: The RepublishRequestException
+
+        Returns:
+            None
+        """
+        metrics.increment(
+            "brewtils_requests_republished_total",
+            labels={"command": republish_exception.request.command},
+        )
+
+        headers = republish_exception.headers
+        headers.update({"request_id": republish_exception.request.id})
+
+        publish_kwargs = dict(
+            exchange=basic_deliver.exchange,
+            routing_key=basic_deliver.routing_key,
+            body=SchemaParser.serialize_request(republish_exception.request),
+            properties=BasicProperties(
+                app_id="beer-garden",
+                content_type="text/plain",
+                headers=headers,
+                priority=1,
+                delivery_mode=PERSISTENT_DELIVERY_MODE,
+            ),
+        )
+
+        if self._publish_channel and self._publish_channel.is_open:
+            self._publish_channel.basic_publish(**publish_kwargs)
+
+            self._publish_tag += 1
+            self._republishing[self._publish_tag] = basic_deliver.delivery_tag
+        else:
+            self._channel.basic_publish(**publish_kwargs)
+            self._ack(basic_deliver.delivery_tag)
+
+    def on_republish_confirmed(self, frame):
+        """Publisher-acknowledgement callback for the publish channel
+
+        Acks the original messages of all republished messages the broker has
+        confirmed. If the broker nacks a republished message the original message can't
+        be acked, so the panic_event is set and the consumer will self-destruct.
+
+        Args:
+            frame: The Basic.Ack or Basic.Nack frame
+
+        Returns:
+            None
+        """
+        method = frame.method
+
+        if method.multiple:
+            confirmed = [t for t in self._republishing if t <= method.delivery_tag]
+        else:
+            confirmed = [method.delivery_tag]
+
+        delivery_tags = [
+            self._republishing.pop(t) for t in confirmed if t in self._republishing
+        ]
+
+        if isinstance(method, Basic.Nack):
+            self.logger.error(
+                "Broker rejected republished messages %s, about to shut down",
+                delivery_tags,
+            )
+            self._panic_event.set()
+            return
+
+        for delivery_tag in delivery_tags:
+            try:
+                self.logger.debug("Acking republished message %s", delivery_tag)
+                self._ack(delivery_tag)
+            except Exception as ex:
+                self.logger.exception(
+                    "Error acking message %s, about to shut down: %s", delivery_tag, ex
+                )
+                self._panic_event.set()
+                return
+
+    def flush_acks(self):
+        """Send any batched acks
+
+        This must be invoked on the connection's IOLoop.
+
+        Returns:
+            None
+        """
+        self._cancel_ack_timer()
+        self._acks.flush(self._channel)
+
+    @property
+    def _batching_acks(self):
+        return self._ack_batch_size > 1
+
+    def _ack(self, delivery_tag):
+        if not self._batching_acks:
+            self._channel.basic_ack(delivery_tag)
+            return
+
+        self._acks.ready(delivery_tag)
+
+        # Messages that finished out of order are usually joined by the ones before
+        # them shortly, so only the timer acks them individually
+        if len(self._acks) >= self._ack_batch_size:
+            self._acks.flush(self._channel, contiguous_only=True)
+
+        if not len(self._acks):
+            self._cancel_ack_timer()
+        elif self._ack_timer is None:
+            self._ack_timer = self._connection.ioloop.call_later(
+                self._ack_interval, self._on_ack_timer
+            )
+
+    def _cancel_ack_timer(self):
+        if self._ack_timer is not None:
+            self._connection.ioloop.remove_timeout(self._ack_timer)
+            self._ack_timer = None
+
+    def _nack(self, delivery_tag, requeue):
+        metrics.increment("brewtils_messages_nacked_total")
+
+        self._channel.basic_nack(delivery_tag, requeue=requeue)
+
+        if self._batching_acks:
+            self._acks.settled(delivery_tag)
+
+    def _on_ack_timer(self):
+        self._ack_timer = None
+
+        try:
+            self.flush_acks()
+        except Exception as ex:
+            self.logger.exception("Error acking messages, about to shut down: %s", ex)
+            self._panic_event.set()
+
+    def _finish_messages(self):
+        with self._finished_lock:
+            finished = list(self._finished)
+            self._finished.clear()
+            self._finish_scheduled = False
+
+        for basic_deliver, future in finished:
+            self.finish_message(basic_deliver, future)
+
+    def _close_connection(self):
+        if self._channel and self._channel.is_open:
+            try:
+                self.flush_acks()
+            except Exception as ex:
+                self.logger.warning("Error acking messages during shutdown: %s", ex)
+
+        self._connection.close()
+
     def open_connection(self):
         """Opens a connection to RabbitMQ
 
@@ -521,7 +1170,8 @@ class PikaConsumer(RequestConsumer):
         This method is called by pika once the connection to RabbitMQ has been
         established.
 
-        The only thing this actually does is call the open_channel method.
+        The only thing this actually does is call the open_channel and
+        open_publish_channel methods.
 
         Args:
             connection: The connection object
@@ -536,6 +1186,7 @@ class PikaConsumer(RequestConsumer):
             self._reconnect_attempt = 0
 
         self.open_channel()
+        self.open_publish_channel()
 
     def on_connection_closed(self, connection, *args):
         """Connection closed callback
@@ -558,6 +1209,12 @@ class PikaConsumer(RequestConsumer):
             None
         """
         self.logger.debug("Connection %s closed: %s", connection, args)
+
+        # Unconfirmed republishes will be redelivered, so just forget about them
+        self._publish_channel = None
+        self._publish_tag = 0
+        self._republishing.clear()
+
         self._connection.ioloop.stop()
 
     def open_channel(self):
@@ -582,8 +1239,42 @@ class PikaConsumer(RequestConsumer):
         self._channel = channel
         self._channel.add_on_close_callback(self.on_channel_closed)
 
+        # Delivery tags are per-channel, so anything being tracked is now meaningless
+        self._ack_timer = None
+        self._acks.reset()
+
         self.start_consuming()
 
+    def open_publish_channel(self):
+        """Open a channel for republishing messages"""
+        self.logger.debug("Opening a new publish channel")
+        self._connection.channel(on_open_callback=self.on_publish_channel_open)
+
+    def on_publish_channel_open(self, channel):
+        """Publish channel open success callback
+
+        This will add a close callback (on_channel_closed) to the channel and put it
+        into publisher-acknowledgements mode. The channel will be used for republishing
+        once the broker has confirmed the mode change.
+
+        Args:
+            channel: The opened channel object
+
+        Returns:
+            None
+        """
+        self.logger.debug("Publish channel opened: %s", channel)
+
+        channel.add_on_close_callback(self.on_channel_closed)
+        channel.confirm_delivery(
+            ack_nack_callback=self.on_republish_confirmed,
+            callback=partial(self.on_publish_channel_confirming, channel),
+        )
+
+    def on_publish_channel_confirming(self, channel, _frame):
+        """Confirm.SelectOk callback for the publish channel"""
+        self._publish_channel = channel
+
     def on_channel_closed(self, channel, *args):
         """Channel closed callback
 
@@ -614,8 +1305,9 @@ class PikaConsumer(RequestConsumer):
         """Begin consuming messages
 
         The RabbitMQ prefetch is set to the maximum number of concurrent
-        consumers. This ensures that messages remain in RabbitMQ until a
-        consuming thread is available to process them.
+        consumers (plus any messages waiting on a command's limit). This ensures
+        that messages remain in RabbitMQ until a consuming thread is available to
+        process them.
 
         An on_cancel_callback is registered so that the consumer is notified if
         it is canceled by the broker.
@@ -625,7 +1317,7 @@ class PikaConsumer(RequestConsumer):
         """
         self.logger.debug("Issuing consumer related RPC commands")
 
-        self._channel.basic_qos(prefetch_count=self._max_concurrent)
+        self._channel.basic_qos(prefetch_count=self._prefetch_count())
         self._channel.add_on_cancel_callback(self.on_consumer_cancelled)
 
         self._consumer_tag = self._channel.basic_consume(
@@ -14,6 +14,7 @@ from pathlib import Path
 from requests import ConnectionError as RequestsConnectionError
 
 import brewtils
+from brewtils import json_codec, metrics, tracing
 from brewtils.config import load_config
 from brewtils.decorators import _parse_client
 from brewtils.display import resolve_template
@@ -30,17 +31,52 @@ from brewtils.log import configure_logging, default_config, find_log_file, read_
 from brewtils.models import Instance, System
 from brewtils.request_handling import (
     AdminProcessor,
+    BatchedHTTPRequestUpdater,
     HTTPRequestUpdater,
     RequestConsumer,
     RequestProcessor,
 )
+from brewtils.resolvers.cache import FileCache
 from brewtils.resolvers.manager import ResolutionManager
 from brewtils.rest.easy_client import EasyClient
 from brewtils.specification import _CONNECTION_SPEC
 
+try:
+    from contextvars import ContextVar
+except ImportError:  # pragma: no cover
+    ContextVar = None
+
+
+class RequestContext(threading.local):
+    """Holds the Request currently being processed
+
+    Requests processed on threads are tracked per-thread. Coroutines run by the
+    ``AsyncRequestProcessor`` all share the event loop thread, so for those the Request
+    is stored in the ``async_request`` context variable instead. That value takes
+    precedence when it's set.
+    """
+
+    async_request = ContextVar("current_request", default=None) if ContextVar else None
+
+    def __init__(self):
+        self._current_request = None
+
+    @property
+    def current_request(self):
+        if self.async_request is not None:
+            request = self.async_request.get()
+            if request is not None:
+                return request
+
+        return self._current_request
+
+    @current_request.setter
+    def current_request(self, request):
+        self._current_request = request
+
+
 # This is what enables request nesting to work easily
-request_context = threading.local()
-request_context.current_request = None
+request_context = RequestContext()
 
 # Global config, used to simplify BG client creation and sanity checks.
 CONFIG = Box(default_box=True)
@@ -141,6 +177,8 @@ class Plugin(object):
         client_key (str): Path to client key. Not necessary if client_cert is a bundle.
         api_version (int): Beer-garden API version to use
         client_timeout (int): Max time to wait for Beer-garden server response
+        conditional_get (bool): Make conditional requests for Systems, Gardens and
+            configuration, reusing the previous response if the resource is unchanged
         username (str): Username for Beer-garden authentication
         password (str): Password for Beer-garden authentication
         access_token (str): Access token for Beer-garden authentication
@@ -171,6 +209,10 @@ class Plugin(object):
             attempts. Negative numbers are interpreted as no maximum.
         starting_timeout (int): Initial time to wait between Request update attempts.
             Will double on subsequent attempts until reaching max_timeout.
+        batch_updates (bool): Queue completed Request updates and send them in
+            batches. IN_PROGRESS updates are still sent immediately.
+        update_batch_size (int): Maximum number of queued Request updates to send in
+            one batch. Only used if batch_updates is set.
 
         mq_max_attempts (int): Number of times to attempt reconnection to message queue
             before giving up. Negative numbers are interpreted as no maximum.
@@ -178,8 +220,56 @@ class Plugin(object):
             reconnect attempts. Negative numbers are interpreted as no maximum.
         mq_starting_timeout (int): Initial time to wait between message queue reconnect
             attempts. Will double on subsequent attempts until reaching mq_max_timeout.
+        mq_ack_batch_size (int): Number of finished Requests that will trigger an ack.
+            Finished Requests are acked together using as few messages as possible.
+            The default of 1 acks each Request as soon as it finishes.
+        mq_ack_interval (float): Maximum amount of time to hold a finished Request
+            before acking it. Only used if mq_ack_batch_size is greater than 1.
+        mq_adaptive_prefetch (bool): Adjust the request consumer's prefetch count
+            based on command latency and pool occupancy, instead of always using
+            max_concurrent.
+        mq_min_prefetch (int): Minimum prefetch count. Only used if
+            mq_adaptive_prefetch is set.
+        mq_max_prefetch (int): Maximum prefetch count. Only used if
+            mq_adaptive_prefetch is set.
         working_directory (str): Path to a preferred working directory. Only used
             when working with bytes parameters.
+        streaming_downloads (bool): Download chunked file parameters concurrently into
+            temporary files in the working directory. Commands are given a file object
+            that can be read while the download is in progress instead of an in-memory
+            copy of the whole file. Commands run in a process still receive in-memory
+            copies. File parameters are closed once the command returns.
+        file_cache_size (int): If set, downloaded Bytes and Base64 parameters are
+            cached in the working directory, up to this many megabytes, so Requests
+            that reference the same file don't download it again. Base64 parameters
+            are not cached when streaming_downloads is enabled.
+        lazy_resolution (bool): Give Bytes and Base64 parameters to commands as proxy
+            objects that are only downloaded when first used. Commands run in a process
+            or defined with ``async def`` still receive downloaded values.
+        fast_parse (bool): Parse incoming Requests with a specialized decoder instead
+            of the marshmallow schema. Faster, but only covers Request messages.
+        command_executor (str): Where to run commands that don't specify an executor
+            in the @command decorator. Either 'thread' (the default) or 'process'.
+            Process workers are spawned rather than forked, so the client must be
+            picklable and its module importable without starting the Plugin.
+        process_workers (int): Maximum number of processes to use for commands run
+            with the 'process' executor. Defaults to the number of CPUs.
+        command_pools (str): Sizes of the named thread pools used by commands that
+            specify a pool in the @command decorator, as a JSON dictionary string.
+            Pools not listed here will have max_concurrent threads.
+        async_processing (bool): Process Requests on an asyncio event loop, allowing
+            commands to be defined with ``async def``. max_concurrent then limits the
+            number of Requests in flight rather than the number of threads. Requires
+            Python 3.7+.
+        json_backend (str): JSON library to use for (de)serialization. One of 'auto',
+            'orjson', 'ujson', 'simplejson' or 'json'. Falls back to 'json' if the
+            requested library is not installed.
+        tracing (bool): Create OpenTelemetry spans around Request processing and
+            propagate trace context to child Requests. Requires the opentelemetry-api
+            package.
+        metrics_port (int): If set, request processing metrics will be collected and
+            served in the Prometheus text format at ``/metrics`` on this port.
+        metrics_host (str): Address the metrics endpoint will listen on.
     """
 
     def __init__(self, client=None, system=None, logger=None, **kwargs):
@@ -187,6 +277,7 @@ class Plugin(object):
         self._instance = None
         self._admin_processor = None
         self._request_processor = None
+        self._metrics_server = None
         self._shutdown_event = threading.Event()
 
         # Need to set up logging before loading config
@@ -206,6 +297,11 @@ class Plugin(object):
             )
         CONFIG = Box(self._config.to_dict(), default_box=True)
 
+        json_codec.set_backend(self._config.json_backend)
+
+        if self._config.tracing:
+            tracing.enable()
+
         # Now set up the system
         self._system = self._setup_system(system, kwargs)
 
@@ -369,6 +465,9 @@ class Plugin(object):
             if not workdir.exists():
                 workdir.mkdir(parents=True)
 
+        if self._config.metrics_port is not None:
+            self._start_metrics_server()
+
         self._logger.debug("Initializing and starting processors")
         self._admin_processor, self._request_processor = self._initialize_processors()
         self._admin_processor.startup()
@@ -391,6 +490,10 @@ class Plugin(object):
         self._request_processor.shutdown()
         self._admin_processor.shutdown()
 
+        if self._metrics_server:
+            self._metrics_server.stop()
+            self._metrics_server = None
+
         try:
             self._ez_client.update_instance(self._instance.id, new_status="STOPPED")
         except Exception:
@@ -401,6 +504,37 @@ class Plugin(object):
 
         self._logger.debug("Successfully shutdown plugin {0}".format(self.unique_name))
 
+    def _start_metrics_server(self):
+        """Start serving metrics over HTTP
+
+        Metrics are collected in memory unless a different sink that can be rendered
+        has already been installed.
+        """
+        sink = metrics.get_sink()
+        if not isinstance(sink, metrics.InMemoryMetricsSink):
+            sink = metrics.set_sink(metrics.InMemoryMetricsSink())
+
+        self._metrics_server = metrics.MetricsServer(
+            sink, host=self._config.metrics_host, port=self._config.metrics_port
+        )
+        self._metrics_server.start()
+
+        self._logger.info(
+            "Serving metrics on %s:%s",
+            self._config.metrics_host,
+            self._metrics_server.port,
+        )
+
+    def _file_cache(self):
+        """Create the cache for downloaded file parameters, if one is configured"""
+        if not self._config.file_cache_size:
+            return None
+
+        return FileCache(
+            os.path.join(self._config.working_directory, "file_cache"),
+            self._config.file_cache_size * 1024 * 1024,
+        )
+
     def _initialize_logging(self):
         """Configure logging with Beer-garden's configuration for this plugin.
 
@@ -561,17 +695,31 @@ class Plugin(object):
             thread_name="Request Consumer",
             queue_name=self._instance.queue_info["request"]["name"],
             max_concurrent=self._config.max_concurrent,
+            ack_batch_size=self._config.mq.ack_batch_size,
+            ack_interval=self._config.mq.ack_interval,
             **common_args
         )
 
         # Both RequestProcessors need an updater
-        updater = HTTPRequestUpdater(
-            self._ez_client,
-            self._shutdown_event,
-            max_attempts=self._config.max_attempts,
-            max_timeout=self._config.max_timeout,
-            starting_timeout=self._config.starting_timeout,
-        )
+        if self._config.batch_updates:
+            updater = BatchedHTTPRequestUpdater(
+                self._ez_client,
+                self._shutdown_event,
+                max_attempts=self._config.max_attempts,
+                max_timeout=self._config.max_timeout,
+                starting_timeout=self._config.starting_timeout,
+                batch_size=self._config.update_batch_size,
+                # Send completed updates as concurrently as the unbatched updater
+                flush_workers=self._config.max_concurrent,
+            )
+        else:
+            updater = HTTPRequestUpdater(
+                self._ez_client,
+                self._shutdown_event,
+                max_attempts=self._config.max_attempts,
+                max_timeout=self._config.max_timeout,
+                starting_timeout=self._config.starting_timeout,
+            )
 
         # Finally, create the actual RequestProcessors
         admin_processor = AdminProcessor(
@@ -581,17 +729,44 @@ class Plugin(object):
             plugin_name=self.unique_name,
             max_workers=1,
         )
-        request_processor = RequestProcessor(
+        request_kwargs = dict(
             target=self._client,
             updater=updater,
             consumer=request_consumer,
             validation_funcs=[self._correct_system, self._is_running],
             plugin_name=self.unique_name,
-            max_workers=self._config.max_concurrent,
-            resolver=ResolutionManager(easy_client=self._ez_client),
+            resolver=ResolutionManager(
+                easy_client=self._ez_client,
+                file_cache=self._file_cache(),
+                streaming_downloads=self._config.streaming_downloads,
+                working_directory=self._config.working_directory,
+            ),
             system=self._system,
+            fast_parse=self._config.fast_parse,
+            default_executor=self._config.command_executor,
+            process_workers=self._config.process_workers,
+            pool_sizes=json.loads(self._config.command_pools),
+            lazy_resolution=self._config.lazy_resolution,
         )
 
+        if self._config.mq.adaptive_prefetch:
+            request_kwargs["prefetch_bounds"] = (
+                self._config.mq.min_prefetch,
+                self._config.mq.max_prefetch,
+            )
+
+        if self._config.async_processing:
+            # Only importable on Python 3
+            from brewtils.async_request_handling import AsyncRequestProcessor
+
+            request_processor = AsyncRequestProcessor(
+                max_concurrent=self._config.max_concurrent, **request_kwargs
+            )
+        else:
+            request_processor = RequestProcessor(
+                max_workers=self._config.max_concurrent, **request_kwargs
+            )
+
         return admin_processor, request_processor
 
     def _start(self):
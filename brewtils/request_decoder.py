@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""Specialized Request decoder
+
+Parsing a Request with the ``RequestSchema`` is relatively expensive - marshmallow has
+to walk every field, invoke processors and construct nested schemas for the parent and
+children. That's fine in most cases, but a Plugin receiving a large number of Requests
+can spend a significant amount of time doing it.
+
+This module builds ``Request`` models directly from the decoded JSON. It mirrors the
+field rules of ``RequestSchema`` (types, ``allow_none``, nesting and exclusions) so it
+produces the same models and rejects the same inputs. It is only intended for the
+plugin consumer path and is enabled with the ``fast_parse`` plugin option.
+"""
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+import six
+from marshmallow import fields
+from marshmallow.exceptions import ValidationError
+
+from brewtils import json_codec
+from brewtils.models import Request
+from brewtils.schemas import DateTime
+
+__all__ = ["parse_request"]
+
+_STRING_FIELDS = (
+    "system",
+    "system_version",
+    "instance_name",
+    "namespace",
+    "command",
+    "command_type",
+    "comment",
+    "output_type",
+    "id",
+    "output",
+    "status",
+    "error_class",
+    "requester",
+)
+_DICT_FIELDS = ("parameters", "metadata")
+_BOOLEAN_FIELDS = ("hidden", "has_parent")
+_DATETIME_FIELDS = ("created_at", "updated_at", "status_updated_at")
+_NESTED_FIELDS = ("parent", "children")
+
+_TRUTHY = fields.Boolean.truthy
+_FALSY = fields.Boolean.falsy
+
+
+def parse_request(data, from_string=False):
+    """Convert raw JSON string or dictionary to a Request model
+
+    This is equivalent to ``SchemaParser.parse_request(data, from_string=from_string)``
+    but does not use marshmallow to do the work.
+
+    Args:
+        data: The raw input
+        from_string: True if input is a JSON string, False if a dictionary
+
+    Returns:
+        A Request object
+
+    Raises:
+        TypeError: Data was None, or not a string when from_string was True
+        ValueError: Data was not valid JSON
+        marshmallow.exceptions.ValidationError: Data failed validation
+    """
+    if data is None:
+        raise TypeError("Data can not be None")
+
+    if from_string:
+        if not isinstance(data, six.string_types):
+            raise TypeError("When from_string=True data must be a string-type")
+
+        data = json_codec.loads(data)
+
+    return _load_request(data)
+
+
+def _load_request(data, exclude=()):
+    if not isinstance(data, Mapping):
+        _fail("_schema", "Invalid input type.")
+
+    kwargs = {}
+
+    for key in _STRING_FIELDS:
+        if key in data:
+            kwargs[key] = _load_string(key, data[key])
+
+    for key in _DICT_FIELDS:
+        if key in data:
+            kwargs[key] = _load_dict(key, data[key])
+
+    for key in _BOOLEAN_FIELDS:
+        if key in data:
+            kwargs[key] = _load_boolean(key, data[key])
+
+    for key in _DATETIME_FIELDS:
+        if key in data:
+            kwargs[key] = _load_datetime(key, data[key])
+
+    for key in _NESTED_FIELDS:
+        if key in data and key not in exclude:
+            kwargs[key] = _load_nested(key, data[key])
+
+    return Request(**kwargs)
+
+
+def _load_nested(key, value):
+    if value is None:
+        return None
+
+    # Parents don't get children, and children don't get parents or children
+    if key == "parent":
+        return _load_request(value, exclude=("children",))
+
+    if not isinstance(value, (list, tuple)):
+        _fail(key, "Invalid type.")
+
+    return [_load_request(child, exclude=("parent", "children")) for child in value]
+
+
+def _load_string(key, value):
+    if value is None:
+        return None
+
+    if isinstance(value, bytes):
+        try:
+            return value.decode("utf-8")
+        except UnicodeDecodeError:
+            _fail(key, "Not a valid utf-8 string.")
+
+    if not isinstance(value, six.string_types):
+        _fail(key, "Not a valid string.")
+
+    return value
+
+
+def _load_dict(key, value):
+    if value is None or isinstance(value, Mapping):
+        return value
+
+    _fail(key, "Not a valid mapping type.")
+
+
+def _load_boolean(key, value):
+    if value is None:
+        return None
+
+    try:
+        if value in _TRUTHY:
+            return True
+        elif value in _FALSY:
+            return False
+    except TypeError:
+        pass
+
+    _fail(key, "Not a valid boolean.")
+
+
+def _load_datetime(key, value):
+    if value is None:
+        return None
+
+    if value:
+        try:
+            return DateTime.from_epoch(value)
+        except (TypeError, AttributeError, ValueError):
+            pass
+
+    _fail(key, "Not a valid datetime.")
+
+
+def _fail(key, message):
+    raise ValidationError({key: [message]}, field_names=[key])
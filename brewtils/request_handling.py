@@ -1,15 +1,22 @@
 # -*- coding: utf-8 -*-
 import abc
-import json
+import io
 import logging
+import math
+import multiprocessing
 import sys
 import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait
 from concurrent.futures.thread import ThreadPoolExecutor
+from functools import partial
 
 import six
 from requests import ConnectionError as RequestsConnectionError
 
 import brewtils.plugin
+from brewtils import json_codec, metrics, tracing
 from brewtils.errors import (
     BGGivesUpError,
     DiscardMessageException,
@@ -21,6 +28,7 @@ from brewtils.errors import (
     parse_exception_as_json,
 )
 from brewtils.models import Request
+from brewtils.request_decoder import parse_request
 from brewtils.schema_parser import SchemaParser
 
 
@@ -41,6 +49,19 @@ class RequestProcessor(object):
         logger: A logger
         plugin_name: The Plugin's unique name
         max_workers: Max number of threads to use in the executor pool
+        resolver: ResolutionManager that will be used to resolve parameters
+        system: The System definition, used to look up command parameters
+        fast_parse: Use the specialized Request decoder instead of the SchemaParser
+        default_executor: Where to run commands that don't specify an executor, either
+            'thread' or 'process'
+        process_workers: Max number of processes to use for 'process' commands
+        pool_sizes: Dictionary mapping named pools (from the @command pool argument)
+            to the max number of threads for that pool. Defaults to max_workers.
+        prefetch_bounds: Tuple of (minimum, maximum) prefetch counts. If given, the
+            consumer's prefetch will be adjusted between these bounds based on
+            observed command latency and pool occupancy.
+        lazy_resolution: Give file parameters to commands as proxies that are
+            downloaded when first used. Not used for commands run in a process.
     """
 
     def __init__(
@@ -54,6 +75,12 @@ class RequestProcessor(object):
         max_workers=None,
         resolver=None,
         system=None,
+        fast_parse=False,
+        default_executor="thread",
+        process_workers=None,
+        pool_sizes=None,
+        prefetch_bounds=None,
+        lazy_resolution=False,
     ):
         self.logger = logger or logging.getLogger(__name__)
 
@@ -64,10 +91,39 @@ class RequestProcessor(object):
         self._updater = updater
         self._plugin_name = plugin_name
         self._validation_funcs = validation_funcs or []
+        self._max_workers = max_workers
         self._pool = ThreadPoolExecutor(max_workers=max_workers)
 
+        # Named pools are created the first time a command using them is received
+        self._pool_sizes = pool_sizes or {}
+        self._named_pools = {}
+
+        # Commands with a max_concurrent limit, by command name
+        self._command_slots = {}
+        self._command_slots_lock = threading.Lock()
+        self._deferred = set()
+        self._deferred_count = 0
+        self._deferred_lock = threading.Lock()
+
         self._resolver = resolver
+        self._lazy_resolution = lazy_resolution
         self._system = system
+        self._fast_parse = fast_parse
+
+        # Only started if a command needs to run in a separate process
+        self._default_executor = default_executor
+        self._process_workers = process_workers
+        self._process_pool = None
+        self._process_pool_lock = threading.Lock()
+
+        # Time and pool name of Requests waiting to be processed, by id
+        self._queued = {}
+
+        self._prefetch_tuner = None
+        if prefetch_bounds:
+            self._prefetch_tuner = _PrefetchTuner(
+                consumer, max_workers, *prefetch_bounds
+            )
 
     def on_message_received(self, message, headers):
         """Callback function that will be invoked for received messages
@@ -97,11 +153,24 @@ class RequestProcessor(object):
         # This message has already been processed, all it needs to do is update
         if request.status in Request.COMPLETED_STATUSES:
             return self._pool.submit(self._updater.update_request, request, headers)
-        else:
-            return self._pool.submit(
-                self.process_message, self._target, request, headers
+
+        if self._prefetch_tuner:
+            self._prefetch_tuner.received()
+
+        method = getattr(self._target, request.command or "", None)
+        pool_name = _command_option(method, "_pool", six.string_types)
+        pool = self._get_pool(pool_name)
+        limit = _command_option(method, "_max_concurrent", int)
+
+        self._enqueued(request, pool_name)
+
+        if limit:
+            return self._submit_limited(
+                pool, limit, self.process_message, self._target, request, headers
             )
 
+        return pool.submit(self.process_message, self._target, request, headers)
+
     def process_message(self, target, request, headers):
         """Process a message. Intended to be run on an Executor.
 
@@ -116,26 +185,48 @@ class RequestProcessor(object):
         Returns:
             None
         """
-        request.status = "IN_PROGRESS"
-        self._updater.update_request(request, headers)
+        self._dequeued(request)
+
+        if not self._prefetch_tuner:
+            return self._process_message(target, request, headers)
+
+        self._prefetch_tuner.started()
+        start = time.time()
 
         try:
-            # Set request context so this request will be the parent of any
-            # generated requests and update status We also need the host/port of
-            #  the current plugin. We currently don't support parent/child
-            # requests across different servers.
-            brewtils.plugin.request_context.current_request = request
+            self._process_message(target, request, headers)
+        finally:
+            self._prefetch_tuner.finished(time.time() - start)
+
+    def _process_message(self, target, request, headers):
+        with tracing.span(
+            "process_message",
+            context=tracing.extract_context(headers, request.metadata),
+            attributes=_span_attributes(request),
+        ):
+            request.status = "IN_PROGRESS"
+            self._updater.update_request(request, headers)
 
-            output = self._invoke_command(target, request, headers)
-        except Exception as exc:
-            self._handle_invoke_failure(request, exc)
-        else:
-            self._handle_invoke_success(request, output)
+            try:
+                # Set request context so this request will be the parent of any
+                # generated requests and update status We also need the host/port of
+                #  the current plugin. We currently don't support parent/child
+                # requests across different servers.
+                brewtils.plugin.request_context.current_request = request
 
-        self._updater.update_request(request, headers)
+                output = self._invoke_command(target, request, headers)
+            except Exception as exc:
+                self._handle_invoke_failure(request, exc)
+            else:
+                self._handle_invoke_success(request, output)
+
+            self._updater.update_request(request, headers)
 
     def startup(self):
         """Start the RequestProcessor"""
+        if self._prefetch_tuner:
+            self._prefetch_tuner.start()
+
         self.consumer.start()
 
     def shutdown(self):
@@ -143,8 +234,10 @@ class RequestProcessor(object):
         self.logger.debug("Shutting down consumer")
         self.consumer.stop_consuming()
 
-        # Finish all current actions
-        self._pool.shutdown(wait=True)
+        # Finish all current actions, including any waiting on a command's limit
+        wait(list(self._deferred))
+
+        self._shutdown_pools()
 
         self.consumer.stop()
         self.consumer.join()
@@ -152,11 +245,54 @@ class RequestProcessor(object):
         # Give the updater a chance to shutdown
         self._updater.shutdown()
 
+    def _shutdown_pools(self):
+        """Shut down all executors, waiting for running work to finish"""
+        self._pool.shutdown(wait=True)
+
+        for pool in self._named_pools.values():
+            pool.shutdown(wait=True)
+
+        if self._process_pool:
+            self._process_pool.shutdown(wait=True)
+
+    def _enqueued(self, request, pool_name=None):
+        """Record that a Request is waiting to be processed"""
+        if not metrics.is_enabled():
+            return
+
+        pool_name = pool_name or "default"
+
+        self._queued[id(request)] = (time.time(), pool_name)
+        metrics.add_gauge("brewtils_pool_queue_depth", 1, labels={"pool": pool_name})
+
+    def _dequeued(self, request):
+        """Record that a Request is no longer waiting to be processed"""
+        if not self._queued:
+            return
+
+        queued = self._queued.pop(id(request), None)
+
+        if queued:
+            queued_at, pool_name = queued
+
+            metrics.observe_stage("queue", request.command, time.time() - queued_at)
+            metrics.add_gauge(
+                "brewtils_pool_queue_depth", -1, labels={"pool": pool_name}
+            )
+
     def _handle_invoke_success(self, request, output):
+        metrics.increment(
+            "brewtils_requests_succeeded_total", labels={"command": request.command}
+        )
+
         request.status = "SUCCESS"
         request.output = self._format_output(output)
 
     def _handle_invoke_failure(self, request, exc):
+        metrics.increment(
+            "brewtils_requests_failed_total", labels={"command": request.command}
+        )
+
         self.logger.log(
             getattr(exc, "_bg_error_log_level", logging.ERROR),
             "Plugin %s raised an exception while processing request %s: %s",
@@ -172,6 +308,9 @@ class RequestProcessor(object):
     def _parse(self, message):
         """Parse a message using the standard SchemaParser
 
+        If this processor was created with ``fast_parse`` the specialized Request
+        decoder will be used instead.
+
         Args:
             message: The raw (json) message body
 
@@ -181,14 +320,27 @@ class RequestProcessor(object):
         Raises:
             DiscardMessageException: The request failed to parse correctly
         """
+        metrics.increment("brewtils_messages_received_total")
+        start = time.time()
+
         try:
-            return SchemaParser.parse_request(message, from_string=True)
+            if self._fast_parse:
+                request = parse_request(message, from_string=True)
+            else:
+                request = SchemaParser.parse_request(message, from_string=True)
         except Exception as ex:
             self.logger.exception(
                 "Unable to parse message body: {0}. Exception: {1}".format(message, ex)
             )
             raise DiscardMessageException("Error parsing message body")
 
+        metrics.observe_stage("parse", request.command, time.time() - start)
+        metrics.increment(
+            "brewtils_requests_parsed_total", labels={"command": request.command}
+        )
+
+        return request
+
     def _invoke_command(self, target, request, headers):
         """Invoke the function named in request.command
 
@@ -209,23 +361,183 @@ class RequestProcessor(object):
                 "Could not find an implementation of command '%s'" % request.command
             )
 
+        method = getattr(target, request.command)
+        executor = getattr(method, "_executor", None) or self._default_executor
+
+        # Proxies and streaming downloads can't be sent to another process
+        parameters = self._resolve_parameters(
+            request,
+            lazy=self._lazy_resolution,
+            picklable=executor == "process",
+        )
+
+        metrics.increment(
+            "brewtils_requests_invoked_total", labels={"command": request.command}
+        )
+
+        try:
+            with metrics.timed("invoke", request.command), tracing.span(
+                "invoke_command", attributes=_span_attributes(request)
+            ):
+                if executor == "process":
+                    return (
+                        self._get_process_pool()
+                        .submit(
+                            _invoke_in_process, request.command, parameters, request
+                        )
+                        .result()
+                    )
+
+                return method(**parameters)
+        finally:
+            # Stop any background downloads and remove their temporary files
+            _close_parameters(parameters)
+
+    def _get_pool(self, name):
+        """Get the thread pool with the given name, creating it if necessary
+
+        Args:
+            name: The pool name, or None for the default pool
+
+        Returns:
+            The ThreadPoolExecutor
+        """
+        if name is None:
+            return self._pool
+
+        # Pools are only created from one thread (the consumer, or the event loop for
+        # the AsyncRequestProcessor) so there's no need to lock
+        if name not in self._named_pools:
+            self._named_pools[name] = ThreadPoolExecutor(
+                max_workers=self._pool_sizes.get(name, self._max_workers)
+            )
+
+        return self._named_pools[name]
+
+    def _submit_limited(self, pool, limit, func, target, request, headers):
+        """Submit a Request for a command that has a max_concurrent limit
+
+        If the command has a free slot the Request is submitted to the pool right away.
+        Otherwise it waits, without taking a thread, until one of the command's running
+        Requests finishes. The message isn't acknowledged until it's processed, so the
+        consumer is told how many messages are waiting to have its prefetch raised by
+        that much. Otherwise a slow limited command could use up the whole prefetch and
+        starve every other command. Only up to ``limit`` waiting messages per command
+        are excluded, so a flood of Requests for one command still gets backpressure.
+
+        Returns:
+            A future that will complete when processing finishes
+        """
+        with self._command_slots_lock:
+            slots = self._command_slots.setdefault(
+                request.command, _CommandSlots(limit)
+            )
+
+            if slots.running >= slots.limit:
+                future = Future()
+                self._deferred.add(future)
+                future.add_done_callback(self._deferred.discard)
+
+                slots.waiting.append((future, pool, (func, target, request, headers)))
+                self._change_deferred(slots.limit, len(slots.waiting), 1)
+                return future
+
+            slots.running += 1
+
+        return self._start_limited(slots, pool, (func, target, request, headers))
+
+    def _start_limited(self, slots, pool, args):
+        future = pool.submit(*args)
+        future.add_done_callback(partial(self._release_slot, slots))
+        return future
+
+    def _release_slot(self, slots, _):
+        with self._command_slots_lock:
+            if not slots.waiting:
+                slots.running -= 1
+                return
+
+            future, pool, args = slots.waiting.popleft()
+            waiting = len(slots.waiting)
+
+        self._change_deferred(slots.limit, waiting, -1)
+
+        try:
+            _chain_future(self._start_limited(slots, pool, args), future)
+        except Exception as ex:
+            future.set_exception(ex)
+            self._release_slot(slots, None)
+
+    def _change_deferred(self, limit, waiting, change):
+        """Update the consumer after the messages waiting on a command's limit change
+
+        The consumer excludes up to ``limit`` waiting messages per command from its
+        prefetch budget. Any more than that count against it as usual, so the
+        prefetch stays bounded however many messages arrive for one command.
+
+        Args:
+            limit: The command's max_concurrent limit
+            waiting: Number of messages waiting for the command, after the change
+            change: How many messages were added (or removed, if negative)
+        """
+        allowance = min(waiting, limit) - min(waiting - change, limit)
+        if not allowance:
+            return
+
+        with self._deferred_lock:
+            self._deferred_count += allowance
+            self.consumer.set_deferred(self._deferred_count)
+
+    def _get_process_pool(self):
+        """Get the process pool, creating it if necessary
+
+        The pool is created after the consumer and worker threads are running, and
+        forking a process with running threads can deadlock the child. Worker processes
+        are therefore started with the 'spawn' method, which means the target (and the
+        plugin's module) must be picklable and importable. Each worker gets its own
+        copy of the target and the global CONFIG when it starts, so those are only
+        pickled once per process.
+        """
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self._process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize_process,
+                    initargs=(self._target, brewtils.plugin.CONFIG),
+                )
+
+            return self._process_pool
+
+    def _resolve_parameters(self, request, lazy=False, picklable=False):
+        """Resolve the parameters for a request, if necessary
+
+        Args:
+            request: The request to process
+            lazy: Resolve file parameters to proxies instead of downloading them
+            picklable: Resolve file parameters to values that can be sent to another
+                process
+
+        Returns:
+            Dictionary of parameters that can be passed to the command
+        """
         # Get the command to use the parameter definitions when resolving
         command = None
         if self._system:
             command = self._system.get_command_by_name(request.command)
 
-        # Now resolve parameters, if necessary
         if request.is_ephemeral or not command:
-            parameters = request.parameters or {}
-        else:
-            parameters = self._resolver.resolve(
+            return request.parameters or {}
+
+        with metrics.timed("resolve", request.command):
+            return self._resolver.resolve(
                 request.parameters,
                 definitions=command.parameters,
                 upload=False,
+                lazy=lazy,
+                picklable=picklable,
             )
 
-        return getattr(target, request.command)(**parameters)
-
     @staticmethod
     def _format_error_output(request, exc):
         if request.is_json:
@@ -239,11 +551,204 @@ class RequestProcessor(object):
             return output
 
         try:
-            return json.dumps(output)
+            return json_codec.dumps(output)
         except (TypeError, ValueError):
             return str(output)
 
 
+class _CommandSlots(object):
+    """Tracks the running and waiting Requests for a command with a limit"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.running = 0
+        self.waiting = deque()
+
+
+class _PrefetchTuner(object):
+    """Adjusts a consumer's prefetch count to match how fast Requests are processed
+
+    The prefetch is the number of workers plus enough extra messages to keep them busy
+    for ``BUFFER_TIME`` seconds, based on a moving average of processing time. Short
+    commands get a deep buffer so workers aren't left waiting on deliveries, while
+    long commands get almost none so messages stay in the queue where other instances
+    can take them.
+
+    If Requests had to wait for a worker since the last adjustment, the pool was fully
+    occupied. The most Requests that ran at once is then used as the number of workers,
+    since command limits and named pools can keep that below the pool size.
+
+    Args:
+        consumer: The RequestConsumer to adjust
+        workers: Number of Requests that can be processed at once
+        minimum: Minimum prefetch count
+        maximum: Maximum prefetch count
+        interval: Minimum time between adjustments
+    """
+
+    BUFFER_TIME = 0.25
+    SMOOTHING = 0.2
+
+    def __init__(self, consumer, workers, minimum, maximum, interval=1.0):
+        if minimum < 1 or minimum > maximum:
+            raise ValueError(
+                "Invalid prefetch bounds (%s, %s), must have 1 <= minimum <= maximum"
+                % (minimum, maximum)
+            )
+
+        self.workers = workers
+        self.minimum = minimum
+        self.maximum = maximum
+        self.prefetch = None
+
+        self._consumer = consumer
+        self._interval = interval
+        self._lock = threading.Lock()
+
+        self._latency = None
+        self._in_flight = 0
+        self._running = 0
+        self._peak_running = 0
+        self._saturated = False
+        self._last_adjusted = 0
+
+    def start(self):
+        """Set the initial prefetch, one message per worker"""
+        self._set_prefetch(self._clamp(self.workers))
+
+    def received(self):
+        """Record that a Request was received"""
+        with self._lock:
+            self._in_flight += 1
+
+    def started(self):
+        """Record that a Request started processing"""
+        with self._lock:
+            self._running += 1
+            self._peak_running = max(self._peak_running, self._running)
+
+            if self._in_flight > self._running:
+                self._saturated = True
+
+    def finished(self, latency):
+        """Record that a Request finished processing
+
+        Args:
+            latency: Time it took to process the Request, in seconds
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._running -= 1
+            self._in_flight = max(self._in_flight - 1, self._running)
+
+            if self._latency is None:
+                self._latency = latency
+            else:
+                self._latency += self.SMOOTHING * (latency - self._latency)
+
+            now = time.time()
+            if now - self._last_adjusted < self._interval:
+                return
+            self._last_adjusted = now
+
+            workers = self.workers
+            if self._saturated:
+                workers = max(1, min(workers, self._peak_running))
+
+            self._peak_running = self._running
+            self._saturated = False
+
+            buffered = workers * self.BUFFER_TIME / max(self._latency, 1e-6)
+            prefetch = self._clamp(workers + int(math.ceil(buffered)))
+
+            if prefetch == self.prefetch:
+                return
+
+        self._set_prefetch(prefetch)
+
+    def _clamp(self, prefetch):
+        return min(max(prefetch, self.minimum), self.maximum)
+
+    def _set_prefetch(self, prefetch):
+        self.prefetch = prefetch
+        self._consumer.set_prefetch(prefetch)
+
+
+def _span_attributes(request):
+    """Tracing span attributes describing a Request"""
+    if not tracing.is_enabled():
+        return None
+
+    return {
+        "brewtils.request.id": request.id or "",
+        "brewtils.request.command": request.command or "",
+        "brewtils.request.system": request.system or "",
+        "brewtils.request.system_version": request.system_version or "",
+        "brewtils.request.instance_name": request.instance_name or "",
+    }
+
+
+def _command_option(method, name, option_type):
+    """Get an option set on a command method by the @command decorator"""
+    value = getattr(method, name, None)
+
+    return value if isinstance(value, option_type) else None
+
+
+def _chain_future(source, destination):
+    """Complete the destination future with the outcome of the source future"""
+
+    def _copy(_):
+        if source.exception() is not None:
+            destination.set_exception(source.exception())
+        else:
+            destination.set_result(source.result())
+
+    source.add_done_callback(_copy)
+
+
+# The command target in a worker process, set by _initialize_process
+_process_target = None
+
+
+def _close_parameters(value):
+    """Close any file objects in a (possibly nested) parameter value"""
+    if isinstance(value, io.IOBase):
+        try:
+            value.close()
+        except Exception as ex:
+            logging.getLogger(__name__).debug("Unable to close parameter: %s", ex)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _close_parameters(item)
+    elif isinstance(value, list):
+        for item in value:
+            _close_parameters(item)
+
+
+def _initialize_process(target, config):
+    global _process_target
+
+    _process_target = target
+    brewtils.plugin.CONFIG = config
+
+
+def _invoke_in_process(command, parameters, request):
+    """Invoke a command in a worker process
+
+    The request is set as the current request so that requests created by the command
+    will have it as their parent.
+    """
+    brewtils.plugin.request_context.current_request = request
+
+    try:
+        return getattr(_process_target, command)(**parameters)
+    finally:
+        brewtils.plugin.request_context.current_request = None
+
+
 class AdminProcessor(RequestProcessor):
     """RequestProcessor with slightly modified process method"""
 
@@ -262,6 +767,8 @@ class AdminProcessor(RequestProcessor):
         Returns:
             None
         """
+        self._dequeued(request)
+
         try:
             output = self._invoke_command(target, request, headers)
         except Exception as exc:
@@ -300,6 +807,36 @@ class RequestConsumer(threading.Thread):
     def stop(self):
         pass
 
+    def set_prefetch(self, prefetch_count):
+        """Change the number of unacknowledged messages that will be delivered
+
+        Consumers that don't support this will ignore it.
+
+        Args:
+            prefetch_count: The new prefetch count
+
+        Returns:
+            None
+        """
+        pass
+
+    def set_deferred(self, deferred_count):
+        """Set the number of delivered messages that are waiting on a command's limit
+
+        These messages are still unacknowledged, but aren't using a worker. Consumers
+        that support it will add this to their prefetch count so the deferred messages
+        don't stop messages for other commands from being delivered. The
+        RequestProcessor only reports up to each command's limit, so this is bounded.
+
+        Args:
+            deferred_count: The number of deferred messages to exclude from the
+                prefetch
+
+        Returns:
+            None
+        """
+        pass
+
     @property
     def on_message_callback(self):
         return self._on_message_callback
@@ -402,7 +939,8 @@ class HTTPRequestUpdater(RequestUpdater):
         Ephemeral requests do not get updated, so we simply skip them.
 
         If brew-view appears to be down, it will wait for brew-view to come back
-         up before updating.
+         up before updating. Otherwise updates from multiple threads are sent
+         concurrently.
 
         If this is the final attempt to update, we will attempt a known, good
         request to give some information to the user. If this attempt fails
@@ -422,35 +960,49 @@ class HTTPRequestUpdater(RequestUpdater):
             sys.stdout.flush()
             return
 
-        with self.brew_view_error_condition:
-
+        with metrics.timed("update", request.command):
             self._wait_for_brew_view_if_down(request)
 
             try:
-                if not self._should_be_final_attempt(headers):
-                    self._wait_if_not_first_attempt(headers)
-                    self._ez_client.update_request(
-                        request.id,
-                        status=request.status,
-                        output=request.output,
-                        error_class=request.error_class,
-                    )
-                else:
-                    self._ez_client.update_request(
-                        request.id,
-                        status="ERROR",
-                        output="We tried to update the request, but it failed too many "
-                        "times. Please check the plugin logs to figure out why the "
-                        "request update failed. It is possible for this request to "
-                        "have succeeded, but we cannot update beer-garden with that "
-                        "information.",
-                        error_class="BGGivesUpError",
-                    )
+                self._ez_client.update_request(
+                    request.id, **self._prepare_update(request, headers)
+                )
             except Exception as ex:
                 self._handle_request_update_failure(request, headers, ex)
             finally:
                 sys.stdout.flush()
 
+    def _prepare_update(self, request, headers):
+        """Determine the values to send for a Request update
+
+        If this is not the first attempt this will wait before returning.
+
+        Args:
+            request: The request to update
+            headers: A dictionary of headers from the `PikaConsumer`
+
+        Returns:
+            Dictionary of status, output and error_class
+        """
+        if self._should_be_final_attempt(headers):
+            return {
+                "status": "ERROR",
+                "output": "We tried to update the request, but it failed too many "
+                "times. Please check the plugin logs to figure out why the "
+                "request update failed. It is possible for this request to "
+                "have succeeded, but we cannot update beer-garden with that "
+                "information.",
+                "error_class": "BGGivesUpError",
+            }
+
+        self._wait_if_not_first_attempt(headers)
+
+        return {
+            "status": request.status,
+            "output": request.output,
+            "error_class": request.error_class,
+        }
+
     def _wait_if_not_first_attempt(self, headers):
         if headers.get("retry_attempt", 0) > 0:
             time_to_sleep = min(
@@ -529,13 +1081,19 @@ class HTTPRequestUpdater(RequestUpdater):
         return self.max_attempts <= headers.get("retry_attempt", 0)
 
     def _wait_for_brew_view_if_down(self, request):
-        if self.brew_view_down and not self._shutdown_event.is_set():
-            self.logger.warning(
-                "Currently unable to communicate with Brew-view, about to wait "
-                "until connection is reestablished to update request %s",
-                request.id,
-            )
-            self.brew_view_error_condition.wait()
+        # Only take the condition if brew-view looks down - the flag is checked again
+        # once the condition is held, so a concurrent reconnect isn't missed
+        if not self.brew_view_down:
+            return
+
+        with self.brew_view_error_condition:
+            if self.brew_view_down and not self._shutdown_event.is_set():
+                self.logger.warning(
+                    "Currently unable to communicate with Brew-view, about to wait "
+                    "until connection is reestablished to update request %s",
+                    request.id,
+                )
+                self.brew_view_error_condition.wait()
 
     def _create_connection_poll_thread(self):
         connection_poll_thread = threading.Thread(target=self._connection_poll)
@@ -562,3 +1120,157 @@ class HTTPRequestUpdater(RequestUpdater):
                             self.brew_view_error_condition.notify_all()
             except Exception as ex:
                 self.logger.exception("Exception in connection poll thread: %s", ex)
+
+
+class BatchedHTTPRequestUpdater(HTTPRequestUpdater):
+    """HTTPRequestUpdater that queues completed updates and sends them in batches
+
+    IN_PROGRESS updates are sent right away, exactly like the ``HTTPRequestUpdater``
+    does, so a failure is raised before the command runs and the message is
+    republished or discarded.
+
+    Updates to a completed status are queued for a dedicated flush thread, which
+    takes up to ``batch_size`` of them at a time and sends them concurrently from up
+    to ``flush_workers`` threads. The caller blocks until its update has been sent,
+    and failures are handled the same way as the ``HTTPRequestUpdater`` - a
+    ``RepublishRequestException`` or ``DiscardMessageException`` is raised in the
+    calling thread - so a message will not be acknowledged before its final status
+    has been stored.
+
+    Args:
+        ez_client: EasyClient to use for communication
+        shutdown_event: `threading.Event` to allow for timely shutdowns
+
+    Keyword Args:
+        batch_size: Maximum number of updates to send in one batch
+        flush_workers: Maximum number of updates to send at once
+        (plus all HTTPRequestUpdater keyword arguments)
+    """
+
+    def __init__(self, ez_client, shutdown_event, **kwargs):
+        super(BatchedHTTPRequestUpdater, self).__init__(
+            ez_client, shutdown_event, **kwargs
+        )
+
+        self.batch_size = kwargs.get("batch_size", 50)
+        self.flush_workers = kwargs.get("flush_workers", 4)
+
+        # Waiting (future, request_id, update) tuples. The caller waits on the future.
+        self._pending = deque()
+        self._pending_condition = threading.Condition()
+        self._stopped = False
+        self._flush_pool = ThreadPoolExecutor(max_workers=self.flush_workers)
+
+        self.logger.debug("Creating and starting flush thread")
+        self.flush_thread = self._create_flush_thread()
+        self.flush_thread.start()
+
+    def shutdown(self):
+        super(BatchedHTTPRequestUpdater, self).shutdown()
+
+        self.logger.debug("Flushing remaining request updates")
+        with self._pending_condition:
+            self._stopped = True
+            self._pending_condition.notify_all()
+
+        self.flush_thread.join()
+        self._flush_pool.shutdown(wait=True)
+
+    def update_request(self, request, headers):
+        """Send a Request update to beer-garden
+
+        Ephemeral requests do not get updated, so we simply skip them.
+
+        IN_PROGRESS updates are sent immediately. Updates to any other status are
+        queued, and this waits until the update has been sent.
+
+        Args:
+            request: The request to update
+            headers: A dictionary of headers from the `PikaConsumer`
+
+        Returns:
+            None
+
+        Raises:
+            RepublishMessageException: The Request update failed (any reason)
+        """
+        if request.status not in Request.COMPLETED_STATUSES:
+            return super(BatchedHTTPRequestUpdater, self).update_request(
+                request, headers
+            )
+
+        if request.is_ephemeral:
+            sys.stdout.flush()
+            return
+
+        with metrics.timed("update", request.command):
+            self._wait_for_brew_view_if_down(request)
+
+            try:
+                future = Future()
+                self._enqueue(
+                    future, request.id, self._prepare_update(request, headers)
+                )
+                future.result()
+            except Exception as ex:
+                self._handle_request_update_failure(request, headers, ex)
+            finally:
+                sys.stdout.flush()
+
+    def _enqueue(self, future, request_id, update):
+        with self._pending_condition:
+            if self._stopped:
+                raise RestConnectionError("Request updater has been shut down")
+
+            self._pending.append((future, request_id, update))
+            self._pending_condition.notify_all()
+
+    def _next_batch(self):
+        """Wait until at least one update is waiting and remove up to batch_size
+
+        Returns:
+            List of (future, request_id, update) tuples, or None once the updater has
+            been shut down and there is nothing left to send
+        """
+        with self._pending_condition:
+            while not self._pending:
+                if self._stopped:
+                    return None
+
+                self._pending_condition.wait()
+
+            count = min(len(self._pending), max(1, self.batch_size))
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _flush(self, batch):
+        if len(batch) == 1:
+            self._send(*batch[0])
+            return
+
+        # Wait for the whole batch so the next one is only taken once this is sent
+        wait([self._flush_pool.submit(self._send, *item) for item in batch])
+
+    def _send(self, future, request_id, update):
+        try:
+            self._ez_client.update_request(request_id, **update)
+        except Exception as ex:
+            future.set_exception(ex)
+        else:
+            future.set_result(None)
+
+    def _create_flush_thread(self):
+        flush_thread = threading.Thread(target=self._flush_loop)
+        flush_thread.daemon = True
+        return flush_thread
+
+    def _flush_loop(self):
+        """Send queued updates until shut down"""
+        while True:
+            try:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+
+                self._flush(batch)
+            except Exception as ex:
+                self.logger.exception("Exception in flush thread: %s", ex)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import abc
-from typing import Any
+from typing import Any, Callable
 
 import six
 
@@ -27,3 +27,22 @@ class ResolverBase(object):
     def download(self, value, definition):
         # type: (Resolvable, Parameter) -> Any
         pass
+
+    def should_cache(self, value, definition):
+        # type: (Any, Parameter) -> bool
+        """Whether uploads and downloads by this resolver can be reused"""
+        return False
+
+    def load_cached(self, path, definition):
+        # type: (str, Parameter) -> Any
+        pass
+
+    def detach(self, value, definition):
+        # type: (Any, Parameter) -> Any
+        """Convert a downloaded value to one that can be sent to another process"""
+        return value
+
+    def proxy(self, load, definition):
+        # type: (Callable[[], Any], Parameter) -> Any
+        """Create a proxy for a lazily downloaded value, or None if not supported"""
+        return None
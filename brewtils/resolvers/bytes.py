@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from brewtils.resolvers import ResolverBase
+from brewtils.resolvers.lazy import LazyBytes
 
 
 class BytesResolver(ResolverBase):
@@ -20,3 +21,13 @@ class BytesResolver(ResolverBase):
 
     def download(self, value, definition):
         return self.easy_client.download_bytes(value.id)
+
+    def should_cache(self, value, definition):
+        return True
+
+    def load_cached(self, path, definition):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def proxy(self, load, definition):
+        return LazyBytes(load)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""On-disk cache of downloaded file parameters
+
+``FileCache`` keeps the contents of resolved ``Bytes`` and ``Base64`` parameters in a
+directory (by default under the Plugin's ``working_directory``) so Requests that
+reference the same file don't download it again. Entries are keyed by the file's ID
+and, if Beer-garden provided one, its checksum. The least recently used entries are
+evicted once the cache grows past its maximum size.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from brewtils import metrics
+
+__all__ = ["FileCache"]
+
+logger = logging.getLogger(__name__)
+
+_CHECKSUM_KEYS = ("checksum", "sha256", "md5")
+_SIZE_KEYS = ("file_size", "size")
+
+
+class FileCache(object):
+    """Size-bounded LRU cache of files, keyed by Resolvable
+
+    Entries already in the directory are picked up when the cache is created, so the
+    cache survives Plugin restarts.
+
+    Args:
+        directory: Directory to store the cached files in. Will be created if needed.
+        max_size: Maximum total size of the cached files, in bytes
+    """
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self._load()
+
+    @staticmethod
+    def key(resolvable):
+        """Determine the cache key for a Resolvable
+
+        Args:
+            resolvable: The Resolvable
+
+        Returns:
+            The key, or None if the Resolvable has no ID and can't be cached
+        """
+        if not resolvable.id:
+            return None
+
+        checksum = ""
+        for checksum_key in _CHECKSUM_KEYS:
+            if resolvable.details.get(checksum_key):
+                checksum = "%s:%s" % (checksum_key, resolvable.details[checksum_key])
+                break
+
+        key = "%s:%s:%s" % (resolvable.type, resolvable.id, checksum)
+
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def size(resolvable):
+        """Determine the size of a Resolvable's file, if Beer-garden provided it
+
+        Args:
+            resolvable: The Resolvable
+
+        Returns:
+            The size in bytes, or None if it's not known
+        """
+        for size_key in _SIZE_KEYS:
+            try:
+                return int(resolvable.details[size_key])
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        return None
+
+    def accepts(self, resolvable):
+        """Whether a Resolvable's file could be stored
+
+        Files that are known to be larger than the cache's maximum size are not
+        downloaded into the cache at all.
+
+        Args:
+            resolvable: The Resolvable
+
+        Returns:
+            False if the file is too large, otherwise True
+        """
+        size = self.size(resolvable)
+
+        return size is None or size <= self.max_size
+
+    @property
+    def stats(self):
+        """Dictionary of cache statistics"""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "size": self._size,
+            }
+
+    def get(self, key):
+        """Look up a cached file
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Path to the cached file, or None if there's no entry for the key
+        """
+        with self._lock:
+            size = self._entries.pop(key, None)
+
+            if size is not None and not os.path.exists(self._path(key)):
+                self._size -= size
+                size = None
+
+            if size is None:
+                self._misses += 1
+                metrics.increment("brewtils_file_cache_misses_total")
+                return None
+
+            self._entries[key] = size
+            self._hits += 1
+            metrics.increment("brewtils_file_cache_hits_total")
+
+        # Recency is tracked by modification time between restarts
+        try:
+            os.utime(self._path(key), None)
+        except OSError:
+            pass
+
+        return self._path(key)
+
+    def put(self, key, value):
+        """Add a file to the cache
+
+        Values larger than the cache's maximum size are not stored.
+
+        Args:
+            key: The cache key
+            value: The file contents, as bytes or a binary file object. File objects
+                are read from their current position.
+
+        Returns:
+            Path to the cached file, or None if the value was not stored
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(value, bytes):
+                    f.write(value)
+                else:
+                    shutil.copyfileobj(value, f)
+
+            size = os.path.getsize(temp_path)
+            if size > self.max_size:
+                os.remove(temp_path)
+                return None
+
+            os.rename(temp_path, self._path(key))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict()
+
+        return self._path(key)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            for key in self._entries:
+                self._remove(key)
+
+            self._entries.clear()
+            self._size = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _load(self):
+        entries = []
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+
+            if name.endswith(".tmp"):
+                self._remove(name)
+            elif os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name, stat.st_size))
+
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._size += size
+
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_size and self._entries:
+            key, size = self._entries.popitem(last=False)
+
+            self._remove(key)
+            self._size -= size
+            self._evictions += 1
+
+    def _remove(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError as ex:
+            logger.warning("Unable to remove cached file %s: %s", key, ex)
@@ -6,13 +6,24 @@ import sys
 import six
 
 from brewtils.resolvers import ResolverBase
+from brewtils.resolvers.lazy import LazyFile
 
 
 class ChunksResolver(ResolverBase):
-    """Resolver that uses the Beergarden chunks API"""
+    """Resolver that uses the Beergarden chunks API
 
-    def __init__(self, easy_client):
+    Args:
+        easy_client: EasyClient to use for uploads and downloads
+        streaming: Download files in streaming mode, so commands are given a file
+            object backed by a temporary file that is filled in the background
+            instead of an in-memory copy of the whole file
+        working_directory: Directory for the temporary files used in streaming mode
+    """
+
+    def __init__(self, easy_client, streaming=False, working_directory=None):
         self.easy_client = easy_client
+        self.streaming = streaming
+        self.working_directory = working_directory
 
     def should_upload(self, value, definition):
         """
@@ -39,4 +50,29 @@ class ChunksResolver(ResolverBase):
         return definition.type.lower() == "base64"
 
     def download(self, value, definition):
+        if self.streaming:
+            return self.easy_client.download_chunked_file(
+                value.id, streaming=True, spool_dir=self.working_directory
+            )
+
         return self.easy_client.download_chunked_file(value.id)
+
+    def should_cache(self, value, definition):
+        # Caching copies the whole download, so commands would wait for all of it
+        return not self.streaming
+
+    def load_cached(self, path, definition):
+        return open(path, "rb")
+
+    def detach(self, value, definition):
+        # Streaming downloads and cached files are backed by threads or open files
+        if isinstance(value, io.BytesIO):
+            return value
+
+        try:
+            return io.BytesIO(value.read())
+        finally:
+            value.close()
+
+    def proxy(self, load, definition):
+        return LazyFile(load)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""Proxies for lazily resolved parameters
+
+With lazy resolution, file parameters are given to commands as ``LazyBytes`` (for
+Bytes parameters) or ``LazyFile`` (for Base64 parameters) objects instead of their
+downloaded values. Nothing is downloaded until the command first uses the proxy, so
+commands that ignore some of their inputs never pay to fetch them.
+
+Both proxies delegate to the downloaded value once it's loaded, so they can mostly be
+used as if they were that value. They are not instances of ``bytes`` or of the
+downloaded file object's type, however, so commands that check parameter types
+should call ``load()`` to get the real value.
+"""
+
+import io
+import threading
+
+__all__ = ["LazyBytes", "LazyFile", "LazyValue"]
+
+
+class LazyValue(object):
+    """Base for parameter proxies
+
+    Args:
+        load: Callable that downloads and returns the parameter value. It will be
+            called at most once.
+    """
+
+    def __init__(self, load):
+        self._load = load
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded = False
+
+    @property
+    def loaded(self):
+        """Whether the value has been downloaded"""
+        return self._loaded
+
+    def load(self):
+        """Get the parameter value, downloading it if necessary"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self._load()
+                    self._loaded = True
+
+        return self._value
+
+    def __getattr__(self, item):
+        # Only called for attributes not defined on the proxy itself
+        if item.startswith("__") or item in ("_load", "_lock", "_value", "_loaded"):
+            raise AttributeError(item)
+
+        return getattr(self.load(), item)
+
+    def __repr__(self):
+        if not self._loaded:
+            return "<%s: not loaded>" % self.__class__.__name__
+
+        return "<%s: %r>" % (self.__class__.__name__, self._value)
+
+
+class LazyBytes(LazyValue):
+    """Proxy for a Bytes parameter that is downloaded on first use"""
+
+    def __bytes__(self):
+        return self.load()
+
+    def __str__(self):
+        return str(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
+    def __bool__(self):
+        return bool(self.load())
+
+    __nonzero__ = __bool__
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __contains__(self, item):
+        return item in self.load()
+
+    def __getitem__(self, item):
+        return self.load()[item]
+
+    def __eq__(self, other):
+        if isinstance(other, LazyBytes):
+            other = other.load()
+        return self.load() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.load())
+
+    def __add__(self, other):
+        return self.load() + other
+
+    def __radd__(self, other):
+        return other + self.load()
+
+
+class LazyFile(LazyValue, io.IOBase):
+    """Proxy for a Base64 parameter that is downloaded when first read
+
+    Closing the proxy before it's read means the file is never downloaded. If
+    streaming downloads are enabled the loaded file is a ``ChunkedDownload``, so
+    reads only wait for the chunks they need.
+    """
+
+    def __init__(self, load):
+        LazyValue.__init__(self, load)
+        io.IOBase.__init__(self)
+
+    def load(self):
+        """Get the downloaded file object, downloading it if necessary"""
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+
+        return LazyValue.load(self)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self.load().seekable()
+
+    def writable(self):
+        return False
+
+    def read(self, size=-1):
+        return self.load().read(size)
+
+    def readinto(self, b):
+        return self.load().readinto(b)
+
+    def readline(self, size=-1):
+        return self.load().readline(size)
+
+    def readlines(self, hint=-1):
+        return self.load().readlines(hint)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.load().seek(offset, whence)
+
+    def tell(self):
+        return self.load().tell()
+
+    def fileno(self):
+        return self.load().fileno()
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __next__(self):
+        return next(self.load())
+
+    next = __next__
+
+    def close(self):
+        """Close the file, if it was downloaded"""
+        if self.closed:
+            return
+
+        with self._lock:
+            if self._loaded:
+                self._value.close()
+            else:
+                # Make sure a later read can't start a download
+                self._loaded = True
+
+        io.IOBase.close(self)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import logging
+from functools import partial
 from typing import Any, Dict, List, Mapping
 
 try:
@@ -8,6 +9,7 @@ try:
 except ImportError:
     from collections.abc import Mapping as CollectionsMapping
 
+from brewtils import tracing
 from brewtils.models import Parameter, Resolvable
 from brewtils.resolvers.bytes import BytesResolver
 from brewtils.resolvers.chunks import ChunksResolver
@@ -15,13 +17,19 @@ from brewtils.resolvers.identity import IdentityResolver
 from brewtils.schema_parser import SchemaParser
 
 
-def build_resolver_map(easy_client=None):
+def build_resolver_map(
+    easy_client=None, streaming_downloads=False, working_directory=None
+):
     """Builds all resolvers"""
 
     return [
         IdentityResolver(),  # This should always be first
         BytesResolver(easy_client),
-        ChunksResolver(easy_client),
+        ChunksResolver(
+            easy_client,
+            streaming=streaming_downloads,
+            working_directory=working_directory,
+        ),
     ]
 
 
@@ -35,21 +43,41 @@ class ResolutionManager(object):
     dictionary that they don't know how to process. The parameter resolver helps handle
     these scenarios.
 
+    Downloaded files can be kept in a ``FileCache`` so parameters that reference the
+    same file don't download it again. Similarly, an ``UploadIndex`` lets parameters
+    with the same content reuse a previous upload.
+
     This is intended for internal use for the plugin class.
+
+    Args:
+        file_cache: Optional FileCache for downloaded parameters
+        upload_index: Optional UploadIndex for uploaded parameters
+        upload_scope: Identifies where parameters are uploaded to, so the upload
+            index only reuses uploads made to the same place
+        **kwargs: Passed to ``build_resolver_map``
     """
 
-    def __init__(self, **kwargs):
+    def __init__(self, file_cache=None, upload_index=None, upload_scope="", **kwargs):
         self.logger = logging.getLogger(__name__)
         self.resolvers = build_resolver_map(**kwargs)
-
-    def resolve(self, values, definitions=None, upload=True):
-        # type: (Mapping[str, Any], List[Parameter], bool) -> Dict[str, Any]
+        self.file_cache = file_cache
+        self.upload_index = upload_index
+        self.upload_scope = upload_scope
+
+    def resolve(
+        self, values, definitions=None, upload=True, lazy=False, picklable=False
+    ):
+        # type: (Mapping[str, Any], List[Parameter], bool, bool, bool) -> Dict[str, Any]
         """Iterate through parameters, resolving as necessary
 
         Args:
             values: Dictionary of request parameter values
             definitions: Parameter definitions
             upload: Controls which methods will be called on resolvers
+            lazy: When downloading, give parameters as proxies that will be
+                downloaded when first used (for resolvers that support it)
+            picklable: When downloading, make sure values can be pickled so they can
+                be sent to another process. Implies not lazy.
 
         Returns:
             The resolved parameter dict
@@ -67,7 +95,11 @@ class ResolutionManager(object):
             # Check to see if this is a nested parameter
             if isinstance(value, CollectionsMapping) and definition.parameters:
                 resolved = self.resolve(
-                    value, definitions=definition.parameters, upload=upload
+                    value,
+                    definitions=definition.parameters,
+                    upload=upload,
+                    lazy=lazy,
+                    picklable=picklable,
                 )
 
             # See if this is a multi parameter
@@ -78,7 +110,11 @@ class ResolutionManager(object):
 
                 for item in value:
                     resolved_item = self.resolve(
-                        {key: item}, definitions=definitions, upload=upload
+                        {key: item},
+                        definitions=definitions,
+                        upload=upload,
+                        lazy=lazy,
+                        picklable=picklable,
                     )
                     resolved.append(resolved_item[key])
 
@@ -87,16 +123,25 @@ class ResolutionManager(object):
                 # See if this is a parameter that needs to be resolved
                 for resolver in self.resolvers:
                     if upload and resolver.should_upload(value, definition):
-                        resolvable = resolver.upload(value, definition)
-                        resolved = SchemaParser.serialize(resolvable, to_string=False)
+                        resolved = self._upload(resolver, value, definition)
                         break
                     elif (
                         not upload
                         and resolver.should_download(value, definition)
                         and isinstance(value, Mapping)
                     ):
-                        resolvable = Resolvable(**value)
-                        resolved = resolver.download(resolvable, definition)
+                        load = partial(
+                            self._load, key, resolver, Resolvable(**value), definition
+                        )
+
+                        if picklable:
+                            resolved = resolver.detach(load(), definition)
+                        else:
+                            resolved = (
+                                resolver.proxy(load, definition) if lazy else None
+                            )
+                            if resolved is None:
+                                resolved = load()
                         break
 
                 # Just a normal parameter
@@ -106,3 +151,76 @@ class ResolutionManager(object):
             resolved_parameters[key] = resolved
 
         return resolved_parameters
+
+    def _upload(self, resolver, value, definition):
+        """Upload a parameter, reusing a previous upload of the same content"""
+        key = None
+        if self.upload_index is not None and resolver.should_cache(value, definition):
+            try:
+                key = self.upload_index.key(value, definition, scope=self.upload_scope)
+            except (IOError, OSError) as ex:
+                self.logger.warning("Unable to hash %s: %s", value, ex)
+
+        if key is None:
+            resolvable = resolver.upload(value, definition)
+            return SchemaParser.serialize(resolvable, to_string=False)
+
+        with self.upload_index.lock(key):
+            resolved = self.upload_index.get(key)
+
+            if resolved is None:
+                resolvable = resolver.upload(value, definition)
+                resolved = SchemaParser.serialize(resolvable, to_string=False)
+                self.upload_index.set(key, resolved)
+
+        return resolved
+
+    def _load(self, key, resolver, resolvable, definition):
+        """Download a parameter inside a tracing span"""
+        with tracing.span(
+            "download_parameter",
+            attributes={
+                "brewtils.parameter.key": key,
+                "brewtils.parameter.type": resolvable.type or "",
+            },
+        ):
+            return self._download(resolver, resolvable, definition)
+
+    def _download(self, resolver, resolvable, definition):
+        """Download a parameter, going through the file cache if possible"""
+        key = None
+        if (
+            self.file_cache is not None
+            and resolver.should_cache(resolvable, definition)
+            and self.file_cache.accepts(resolvable)
+        ):
+            key = self.file_cache.key(resolvable)
+
+        if key is None:
+            return resolver.download(resolvable, definition)
+
+        path = self.file_cache.get(key)
+        if path is not None:
+            try:
+                return resolver.load_cached(path, definition)
+            except (IOError, OSError) as ex:
+                self.logger.warning("Unable to use cached file %s: %s", path, ex)
+
+        resolved = resolver.download(resolvable, definition)
+
+        try:
+            path = self.file_cache.put(key, resolved)
+        except (IOError, OSError) as ex:
+            self.logger.warning("Unable to cache %s: %s", resolvable, ex)
+            path = None
+
+        if isinstance(resolved, bytes):
+            return resolved
+
+        if path is None:
+            resolved.seek(0)
+            return resolved
+
+        # The download has been copied to the cache, so use that instead
+        resolved.close()
+        return resolver.load_cached(path, definition)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Deduplication of file parameter uploads
+
+``UploadIndex`` remembers the Resolvable returned for each uploaded Bytes or Base64
+parameter, keyed by a hash of its content. When a ``SystemClient`` sends many Requests
+that reference the same file, the ``ResolutionManager`` uses the index to reuse the
+first upload instead of sending the same content again.
+
+An index can be persisted to a JSON file so uploads are also reused across sessions
+(see ``get_upload_index``). Beer-garden may remove files after a while, so persisted
+entries expire after ``PERSISTED_MAX_AGE`` unless another ``max_age`` is given.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import six
+
+__all__ = ["PERSISTED_MAX_AGE", "UploadIndex", "get_upload_index"]
+
+logger = logging.getLogger(__name__)
+
+_BLOCK_SIZE = 1024 * 1024
+
+PERSISTED_MAX_AGE = 24 * 60 * 60
+
+
+class UploadIndex(object):
+    """Thread-safe index of uploaded content
+
+    Args:
+        path: Optional JSON file to load the index from and save it to
+        max_age: Seconds after which an upload will no longer be reused. 'None' means
+            uploads are reused forever.
+    """
+
+    def __init__(self, path=None, max_age=None):
+        self.path = path
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._entries = {}
+
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._entries = json.load(f)
+            except (IOError, OSError, ValueError) as ex:
+                logger.warning("Unable to load upload index %s: %s", path, ex)
+
+    @staticmethod
+    def key(value, definition, scope=""):
+        """Determine the index key for a parameter value
+
+        Values can be bytes, a path to a file or a seekable binary file object. File
+        objects are hashed from their current position, which is restored afterwards.
+
+        Args:
+            value: The parameter value
+            definition: The parameter definition
+            scope: Identifies where the value is uploaded to (for example, the
+                Beer-garden URL and namespace). Uploads are only reused within a scope.
+
+        Returns:
+            The key, or None if the value can't be hashed
+        """
+        digest = hashlib.sha256()
+        name = ""
+
+        if isinstance(value, bytes):
+            digest.update(value)
+        elif isinstance(value, six.string_types):
+            if not os.path.isfile(value):
+                return None
+
+            name = os.path.basename(value)
+            with open(value, "rb") as f:
+                _update(digest, f)
+        elif hasattr(value, "read") and hasattr(value, "seek"):
+            name = os.path.basename(getattr(value, "name", None) or "")
+
+            position = value.tell()
+            try:
+                _update(digest, value)
+            finally:
+                value.seek(position)
+        else:
+            return None
+
+        key = "%s:%s:%s" % ((definition.type or "").lower(), name, digest.hexdigest())
+
+        return "%s|%s" % (scope, key) if scope else key
+
+    @contextmanager
+    def lock(self, key):
+        """Hold the lock for a key, used to avoid uploading the same content concurrently
+
+        The lock is removed once nothing is holding or waiting for it.
+
+        Args:
+            key: The index key
+        """
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def get(self, key):
+        """Look up a previous upload
+
+        Args:
+            key: The index key
+
+        Returns:
+            The serialized Resolvable, or None if there's no usable entry for the key
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        if self.max_age is not None and time.time() - entry["time"] > self.max_age:
+            return None
+
+        return copy.deepcopy(entry["resolvable"])
+
+    def set(self, key, resolvable):
+        """Record an upload
+
+        Args:
+            key: The index key
+            resolvable: The serialized Resolvable
+
+        Returns:
+            None
+        """
+        now = time.time()
+
+        with self._lock:
+            self._entries[key] = {"resolvable": copy.deepcopy(resolvable), "time": now}
+
+            # Drop expired entries so persisted indexes don't grow forever
+            if self.max_age is not None:
+                for expired in [
+                    k
+                    for k, v in self._entries.items()
+                    if now - v["time"] > self.max_age
+                ]:
+                    del self._entries[expired]
+
+            if self.path:
+                self._save()
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+            if self.path:
+                self._save()
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f)
+
+            os.rename(temp_path, self.path)
+        except (IOError, OSError) as ex:
+            logger.warning("Unable to save upload index %s: %s", self.path, ex)
+
+
+def _update(digest, f):
+    while True:
+        block = f.read(_BLOCK_SIZE)
+        if not block:
+            break
+
+        if not isinstance(block, bytes):
+            block = block.encode("utf-8")
+
+        digest.update(block)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_upload_index(path, max_age=PERSISTED_MAX_AGE):
+    """Get the UploadIndex persisted to a path
+
+    Indexes are shared within the process, so clients using the same path don't
+    overwrite each other's entries.
+
+    Args:
+        path: JSON file the index is persisted to
+        max_age: Seconds after which an upload will no longer be reused. Only used
+            when the index is first loaded. 'None' means uploads are reused forever,
+            which should only be used if Beer-garden never removes files.
+
+    Returns:
+        The UploadIndex
+    """
+    path = os.path.abspath(path)
+
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = UploadIndex(path=path, max_age=max_age)
+
+        return _indexes[path]
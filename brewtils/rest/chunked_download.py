@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""Streaming download of chunked files
+
+``ChunkedDownload`` fetches the chunks of a file from several threads at once and
+writes each one at its offset in a spooled temporary file (or a caller-provided
+path). It can be read like any other binary file object while the download is still
+in progress - reads only block until the chunks they cover have arrived. Only the
+chunks currently being fetched are held in memory, so large files can be handed to
+commands without ever being fully resident.
+"""
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+__all__ = ["ChunkedDownload"]
+
+SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class ChunkedDownload(io.RawIOBase):
+    """Read-only file object for a chunked file being downloaded in the background
+
+    The first chunk is fetched before the constructor returns, which establishes the
+    chunk size. All chunks except the last one must be this size.
+
+    Args:
+        fetch: Callable that takes a chunk index and returns the chunk's bytes
+        number_of_chunks: Number of chunks in the file
+        path: Write the file here instead of to a temporary file. The file is kept
+            when this object is closed.
+        max_workers: Maximum number of chunks to fetch concurrently
+        spool_size: Size at which the temporary file will be moved from memory to
+            disk. Not used if ``path`` is given.
+        spool_dir: Directory for the temporary file. Not used if ``path`` is given.
+
+    Raises:
+        Any exception raised by ``fetch`` for the first chunk
+    """
+
+    def __init__(
+        self,
+        fetch,
+        number_of_chunks,
+        path=None,
+        max_workers=4,
+        spool_size=SPOOL_SIZE,
+        spool_dir=None,
+    ):
+        super(ChunkedDownload, self).__init__()
+
+        self.name = path
+        self.mode = "rb"
+
+        self._fetch = fetch
+        self._number_of_chunks = number_of_chunks
+        self._condition = threading.Condition()
+        self._done = [False] * number_of_chunks
+        self._error = None
+        self._chunk_size = 0
+        self._size = 0 if number_of_chunks == 0 else None
+        self._position = 0
+        self._futures = []
+
+        if path:
+            self._file = open(path, "w+b")
+        else:
+            self._file = SpooledTemporaryFile(max_size=spool_size, dir=spool_dir)
+
+        if number_of_chunks:
+            try:
+                self._store(0, fetch(0))
+            except Exception:
+                self._file.close()
+                raise
+
+        if number_of_chunks > 1:
+            executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+            self._futures = [
+                executor.submit(self._download, index)
+                for index in range(1, number_of_chunks)
+            ]
+            executor.shutdown(wait=False)
+
+    @property
+    def size(self):
+        """Size of the file, or None if the last chunk hasn't been downloaded yet"""
+        return self._size
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Change the stream position
+
+        Seeking relative to the end of the file waits for the last chunk.
+        """
+        with self._condition:
+            if whence == io.SEEK_SET:
+                position = offset
+            elif whence == io.SEEK_CUR:
+                position = self._position + offset
+            elif whence == io.SEEK_END:
+                self._wait_for(self._number_of_chunks - 1)
+                position = self._size + offset
+            else:
+                raise ValueError("Invalid whence (%r)" % whence)
+
+            if position < 0:
+                raise ValueError("Negative seek position %d" % position)
+
+            self._position = position
+            return position
+
+    def readinto(self, b):
+        """Read into a buffer, waiting for the chunks it covers to be downloaded"""
+        view = memoryview(b)
+        count = 0
+
+        with self._condition:
+            while count < len(view):
+                index = self._position // self._chunk_size if self._chunk_size else 0
+                if index >= self._number_of_chunks:
+                    break
+
+                self._wait_for(index)
+
+                end = self._size if self._size is not None else 0
+                if index < self._number_of_chunks - 1:
+                    end = (index + 1) * self._chunk_size
+
+                if self._position >= end:
+                    break
+
+                self._file.seek(self._position)
+                data = self._file.read(min(len(view) - count, end - self._position))
+                if not data:
+                    break
+
+                view[count : count + len(data)] = data
+                count += len(data)
+                self._position += len(data)
+
+        return count
+
+    def wait(self):
+        """Wait for the entire file to be downloaded
+
+        Raises:
+            Any exception raised while fetching a chunk
+        """
+        with self._condition:
+            for index in range(self._number_of_chunks):
+                self._wait_for(index)
+
+    def close(self):
+        """Stop downloading and close the underlying file"""
+        with self._condition:
+            if self.closed:
+                return
+
+            for future in self._futures:
+                future.cancel()
+
+            self._file.close()
+            super(ChunkedDownload, self).close()
+            self._condition.notify_all()
+
+    def _wait_for(self, index):
+        while not self._done[index]:
+            if self.closed:
+                raise ValueError("I/O operation on closed file.")
+            if self._error is not None:
+                raise self._error
+
+            self._condition.wait()
+
+    def _download(self, index):
+        if self.closed:
+            return
+
+        try:
+            self._store(index, self._fetch(index))
+        except Exception as ex:
+            with self._condition:
+                if self._error is None:
+                    self._error = ex
+                self._condition.notify_all()
+
+    def _store(self, index, data):
+        last = index == self._number_of_chunks - 1
+
+        if index == 0:
+            if not data and not last:
+                raise ValueError("Chunk 0 is empty")
+            self._chunk_size = len(data)
+        elif not last and len(data) != self._chunk_size:
+            raise ValueError(
+                "Chunk %d is %d bytes, expected %d"
+                % (index, len(data), self._chunk_size)
+            )
+
+        with self._condition:
+            if self.closed:
+                return
+
+            self._file.seek(index * self._chunk_size)
+            self._file.write(data)
+            self._done[index] = True
+
+            if last:
+                self._size = index * self._chunk_size + len(data)
+
+            self._condition.notify_all()
@@ -1,19 +1,24 @@
 # -*- coding: utf-8 -*-
 
 import functools
-import json
+import io
+import threading
 from base64 import b64encode
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, List
 
 import brewtils.plugin
 import requests.exceptions
 import urllib3
+from brewtils import json_codec
 from brewtils.errors import _deprecate
 from brewtils.rest import normalize_url_prefix
 from brewtils.specification import _CONNECTION_SPEC
-from requests import Response, Session
+from requests import Request, Response, Session
 from requests.adapters import HTTPAdapter
 from requests.utils import quote
+from six.moves import queue
 from yapconf import YapconfSpec
 
 
@@ -53,6 +58,140 @@ class TimeoutAdapter(HTTPAdapter):
         return super(TimeoutAdapter, self).send(*args, **kwargs)
 
 
+class _ChunkUploader(object):
+    """Uploads the chunks of a file concurrently
+
+    Chunks are read sequentially into a fixed set of reusable buffers, one for each
+    worker, so no more than ``workers`` chunks are ever held in memory. Each chunk is
+    retried independently.
+    """
+
+    def __init__(self, session, url, workers=4, retries=3, progress=None, total=None):
+        self._session = session
+        self._url = url
+        self._workers = max(1, workers)
+        self._retries = retries
+        self._progress = progress
+        self._total = total
+
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._error = None
+
+    def upload(self, fd, chunk_size):
+        """Upload everything from the current position of a file object
+
+        Raises:
+            RuntimeError: A chunk could not be sent
+        """
+        use_readinto = isinstance(fd, (io.RawIOBase, io.BufferedIOBase))
+
+        free = queue.Queue()
+        for _ in range(self._workers):
+            free.put(bytearray(chunk_size) if use_readinto else None)
+
+        executor = ThreadPoolExecutor(max_workers=self._workers)
+        try:
+            offset = 0
+            while self._error is None:
+                buffer = free.get()
+
+                if use_readinto:
+                    size = _readinto(fd, buffer)
+                    data = memoryview(buffer)[:size]
+                else:
+                    data = fd.read(chunk_size)
+                    if data and not isinstance(data, bytes):
+                        data = data.encode("utf-8")
+                    size = len(data or b"")
+
+                if not size:
+                    break
+
+                executor.submit(self._send, offset, data, size, buffer, free)
+                offset += 1
+        finally:
+            executor.shutdown(wait=True)
+
+        if self._error is not None:
+            raise self._error
+
+    def _send(self, offset, data, size, buffer, free):
+        try:
+            payload = {"data": b64encode(data).decode("ascii"), "offset": offset}
+
+            for _ in range(self._retries + 1):
+                if self._error is not None:
+                    return
+
+                try:
+                    if self._session.post(self._url, json=payload).ok:
+                        self._report(size)
+                        return
+                except requests.exceptions.RequestException:
+                    pass
+
+            self._error = RuntimeError(
+                "Could not send chunk %s, ran out of retries" % offset
+            )
+        except Exception as ex:
+            self._error = ex
+        finally:
+            free.put(buffer)
+
+    def _report(self, size):
+        with self._lock:
+            self._sent += size
+
+            if self._progress:
+                self._progress(self._sent, self._total)
+
+
+def _readinto(fd, buffer):
+    """Fill a buffer from a file object, returning the number of bytes read"""
+    view = memoryview(buffer)
+    size = 0
+
+    while size < len(buffer):
+        count = fd.readinto(view[size:])
+        if not count:
+            break
+        size += count
+
+    return size
+
+
+class _ConditionalCache(object):
+    """Responses with validators, keyed by URL, in least recently used order"""
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._responses = OrderedDict()
+
+    def get(self, url):
+        with self._lock:
+            response = self._responses.pop(url, None)
+
+            if response is not None:
+                self._responses[url] = response
+
+            return response
+
+    def set(self, url, response):
+        with self._lock:
+            self._responses.pop(url, None)
+            self._responses[url] = response
+
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+    def pop(self, url):
+        with self._lock:
+            self._responses.pop(url, None)
+
+
 class RestClient(object):
     """HTTP client for communicating with Beer-garden.
 
@@ -77,6 +216,8 @@ class RestClient(object):
         password (str): Password for Beer-garden authentication
         access_token (str): Access token for Beer-garden authentication
         refresh_token (deprecated): Refresh token for Beer-garden authentication
+        conditional_get (bool): Make conditional requests for Systems, Gardens and
+            configuration, reusing the previous response if the resource is unchanged
     """
 
     # Latest API version currently released
@@ -98,6 +239,10 @@ class RestClient(object):
         self.client_cert = self._config.client_cert
         self.client_key = self._config.client_key
 
+        self._conditional_cache = (
+            _ConditionalCache() if self._config.conditional_get else None
+        )
+
         # Configure the session to use when making requests
         self.session = Session()
 
@@ -269,7 +414,7 @@ class RestClient(object):
                 "removed in a future release."
             )
 
-        return self.session.get(self.config_url)
+        return self._conditional_get(self.config_url)
 
     @enable_auth
     def get_logging_config(self, **kwargs):
@@ -282,7 +427,7 @@ class RestClient(object):
         Returns:
             Requests Response object
         """
-        return self.session.get(self.logging_url, params=kwargs)
+        return self._conditional_get(self.logging_url, params=kwargs)
 
     @enable_auth
     def get_garden(self, garden_name, **kwargs):
@@ -309,7 +454,7 @@ class RestClient(object):
         Returns:
             Requests Response object
         """
-        return self.session.get(self.garden_url, params=kwargs)
+        return self._conditional_get(self.garden_url, params=kwargs)
 
     @enable_auth
     def post_gardens(self, payload):
@@ -369,7 +514,7 @@ class RestClient(object):
         Returns:
             Requests Response object
         """
-        return self.session.get(self.system_url, params=kwargs)
+        return self._conditional_get(self.system_url, params=kwargs)
 
     @enable_auth
     def get_system(self, system_id, **kwargs):
@@ -383,7 +528,7 @@ class RestClient(object):
         Returns:
             Requests Response object
         """
-        return self.session.get(self.system_url + system_id, params=kwargs)
+        return self._conditional_get(self.system_url + system_id, params=kwargs)
 
     @enable_auth
     def post_systems(self, payload):
@@ -798,16 +943,31 @@ class RestClient(object):
         return self.session.delete(self.chunk_url + "?file_id=" + file_id, **kwargs)
 
     @enable_auth
-    def post_chunked_file(self, fd, file_params, current_position=0):
+    def post_chunked_file(
+        self, fd, file_params, current_position=0, max_workers=4, progress=None
+    ):
         """Performs a POST on the file URL.
 
+        The file is read sequentially and its chunks are posted by ``max_workers``
+        threads sharing the session's connection pool. Each chunk is retried up to 3
+        times before giving up.
+
         Args:
             fd: A file descriptor
             file_params: Metadata about the file
             current_position: The current cursor position for the file object
+            max_workers: Maximum number of chunks to post concurrently. Values over
+                10 are limited by the size of the session's connection pool.
+            progress: Optional callable that will be called with the number of bytes
+                sent so far and the file size from ``file_params`` (or None) after
+                each chunk is sent. Calls are serialized but may come from any of
+                the upload threads.
 
         Returns:
             A Requests Response object
+
+        Raises:
+            RuntimeError: Unable to get a file ID or to send a chunk
         """
         # This is here in case we have not authenticated yet. Without this
         # code, it is possible for us to perform the POST, which will call
@@ -822,35 +982,15 @@ class RestClient(object):
             raise RuntimeError("Could not request file ID for file %s" % fd.name)
 
         file_id = result.json()["details"]["file_id"]
-        offset = 0
-        retry = 0
-
-        # Break up the file into chunks and send them
-        while True:
-            current_cursor = fd.tell()
-            data = fd.read(file_params["chunk_size"])
-            if not data:
-                break
-            if type(data) != bytes:
-                data = bytes(data, "utf-8")
-            data = b64encode(data)
-            chunk_result = self.session.post(
-                self.chunk_url + "?file_id=" + file_id,
-                json={"data": data, "offset": offset},
-            )
 
-            # Allow the system to try to resend the chunk a couple of
-            # times before giving up.
-            if chunk_result.ok:
-                offset += 1
-                retry = 0
-            elif retry < 3:
-                fd.seek(current_cursor)
-                retry += 1
-            else:
-                raise RuntimeError(
-                    "Could not send chunk %s, ran out of retries" % offset
-                )
+        uploader = _ChunkUploader(
+            self.session,
+            self.chunk_url + "?file_id=" + file_id,
+            workers=max_workers,
+            progress=progress,
+            total=file_params.get("file_size"),
+        )
+        uploader.upload(fd, file_params["chunk_size"])
 
         return result
 
@@ -898,6 +1038,47 @@ class RestClient(object):
             self.admin_url, data=payload, headers=self.JSON_HEADERS
         )
 
+    def _conditional_get(self, url, params=None):
+        # type: (str, dict) -> Response
+        """Perform a GET, using a conditional request if enabled
+
+        If a previous response for the same URL had an ETag or Last-Modified header
+        they are sent as If-None-Match and If-Modified-Since. A 304 response means the
+        resource hasn't changed, so the previous response is returned.
+
+        Responses returned this way have a ``brewtils_parsed`` dictionary attribute,
+        which lets the EasyClient reuse the models it parsed from them.
+        """
+        if self._conditional_cache is None:
+            if params is None:
+                return self.session.get(url)
+            return self.session.get(url, params=params)
+
+        key = Request("GET", url, params=params).prepare().url
+        cached = self._conditional_cache.get(key)
+
+        headers = {}
+        if cached is not None:
+            if cached.headers.get("ETag"):
+                headers["If-None-Match"] = cached.headers["ETag"]
+            if cached.headers.get("Last-Modified"):
+                headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+
+        response = self.session.get(url, params=params, headers=headers)
+
+        if response.status_code == 304 and cached is not None:
+            return cached
+
+        if response.ok and (
+            response.headers.get("ETag") or response.headers.get("Last-Modified")
+        ):
+            response.brewtils_parsed = {}
+            self._conditional_cache.set(key, response)
+        else:
+            self._conditional_cache.pop(key)
+
+        return response
+
     def get_tokens(self, username=None, password=None):
         # type: (str, str) -> Response
         """Use a username and password to get access and refresh tokens
@@ -912,7 +1093,7 @@ class RestClient(object):
         response = self.session.post(
             self.token_url,
             headers=self.JSON_HEADERS,
-            data=json.dumps(
+            data=json_codec.dumps(
                 {
                     "username": username or self.username,
                     "password": password or self.password,
@@ -0,0 +1,763 @@
+# -*- coding: utf-8 -*-
+"""Notification of Request completion
+
+``CompletionListener`` subscribes to Beer-garden's event websocket
+(``api/v1/socket/events/``) and wakes anything waiting on a Request as soon as the
+``REQUEST_COMPLETED`` or ``REQUEST_CANCELED`` event for it arrives. This lets the
+``SystemClient`` notice completed Requests without polling for them.
+
+The listener requires the ``websocket-client`` package. Listeners are shared between
+all clients talking to the same Beer-garden with the same credentials and SSL
+settings (see ``get_listener``).
+
+``RequestPoller`` resolves Futures for any number of outstanding Requests from a
+single scheduling thread and a small pool of workers, rather than a thread per
+Request. Each tick checks a bounded number of Requests, oldest-checked first.
+Pollers are also shared between clients with the same configuration (see
+``get_poller``). Shared listeners and pollers are stopped when the interpreter exits.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from brewtils import json_codec
+from brewtils.errors import FetchError, RequestFailedError, TimeoutExceededError
+from brewtils.models import Events, Request
+from brewtils.schema_parser import SchemaParser
+
+__all__ = [
+    "CompletionListener",
+    "RequestPoller",
+    "get_listener",
+    "get_poller",
+    "stop_listeners",
+    "stop_pollers",
+]
+
+logger = logging.getLogger(__name__)
+
+_COMPLETION_EVENTS = (Events.REQUEST_COMPLETED.name, Events.REQUEST_CANCELED.name)
+
+_listeners = {}
+_listeners_lock = threading.Lock()
+
+_pollers = {}
+_pollers_lock = threading.Lock()
+
+
+class _Waiter(object):
+    """Handle for a Request being waited on"""
+
+    def __init__(self, request_id, callback=None):
+        self.request_id = request_id
+        self.request = None
+
+        self._callback = callback
+        self._event = threading.Event()
+
+    def wait(self, timeout):
+        """Wait for the Request to complete
+
+        This will also return early if the listener's connection state changes, since
+        any events sent while disconnected are lost.
+
+        Args:
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            The completed Request, or None if it hasn't completed
+        """
+        self._event.wait(timeout)
+
+        if self.request is None:
+            self._event.clear()
+
+        return self.request
+
+    def _complete(self, request):
+        self.request = request
+        self._event.set()
+
+        if self._callback:
+            try:
+                self._callback(request)
+            except Exception as ex:
+                logger.exception("Error in Request completion callback: %s", ex)
+
+    def _wake(self):
+        self._event.set()
+
+
+class CompletionListener(object):
+    """Listens to the Beer-garden event stream for completed Requests
+
+    Args:
+        url: The event websocket URL
+        token_provider: Callable returning the current access token (or None). The
+            token is sent when connecting.
+        sslopt: SSL options for the websocket connection
+        connect: Callable used to open a connection. Defaults to
+            ``websocket.create_connection``.
+        reconnect_delay: Seconds to wait before the first reconnection attempt. This
+            doubles after each failed attempt, up to ``max_reconnect_delay``.
+        max_reconnect_delay: Maximum seconds to wait between reconnection attempts
+        recent_size: Number of recently completed Requests to remember, so that
+            Requests that complete before they are watched are not missed
+    """
+
+    def __init__(
+        self,
+        url,
+        token_provider=None,
+        sslopt=None,
+        connect=None,
+        reconnect_delay=1,
+        max_reconnect_delay=30,
+        recent_size=1000,
+    ):
+        self.url = url
+
+        self._token_provider = token_provider
+        self._sslopt = sslopt
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._recent_size = recent_size
+
+        if connect is None:
+            import websocket
+
+            connect = websocket.create_connection
+        self._connect = connect
+
+        self._lock = threading.Lock()
+        self._waiters = {}
+        self._recent = OrderedDict()
+        self._subscribers = {}
+        self._connection = None
+        self._connected = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def connected(self):
+        """Whether completion events are currently being received"""
+        return self._connected
+
+    def start(self):
+        """Start listening in a daemon thread. Does nothing if already started."""
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(target=self._run, name="CompletionListener")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stop listening and close the connection"""
+        self._stop_event.set()
+        self._close()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def watch(self, request_id, callback=None):
+        """Start waiting for a Request to complete
+
+        Must be paired with a call to ``unwatch``.
+
+        Args:
+            request_id: The Request ID
+            callback: Called with the completed Request when it completes. This will
+                usually happen on the listener's thread.
+
+        Returns:
+            A waiter whose ``wait`` method blocks until the Request completes
+        """
+        waiter = _Waiter(request_id, callback=callback)
+
+        with self._lock:
+            recent = self._recent.get(request_id)
+
+            if recent is None:
+                self._waiters.setdefault(request_id, []).append(waiter)
+
+        if recent is not None:
+            waiter._complete(recent)
+
+        return waiter
+
+    def unwatch(self, waiter):
+        """Stop waiting for a Request
+
+        Args:
+            waiter: The waiter returned by ``watch``
+        """
+        with self._lock:
+            waiters = self._waiters.get(waiter.request_id, [])
+
+            if waiter in waiters:
+                waiters.remove(waiter)
+
+            if not waiters:
+                self._waiters.pop(waiter.request_id, None)
+
+    def subscribe(self, event_names, callback):
+        """Get other events from the event stream
+
+        Args:
+            event_names: Names of the events to receive
+            callback: Called with the dictionary representation of each event. This
+                will happen on the listener's thread.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            for name in event_names:
+                self._subscribers.setdefault(name, []).append(callback)
+
+    def handle_message(self, message):
+        """Process a message received from the event stream
+
+        Args:
+            message: The raw message
+
+        Returns:
+            None
+        """
+        try:
+            event = json_codec.loads(message)
+        except ValueError:
+            logger.debug("Ignoring non-JSON event message: %r", message)
+            return
+
+        if not isinstance(event, dict):
+            return
+
+        with self._lock:
+            callbacks = list(self._subscribers.get(event.get("name"), []))
+
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as ex:
+                logger.exception("Error in event callback: %s", ex)
+
+        if event.get("name") not in _COMPLETION_EVENTS:
+            return
+
+        payload = event.get("payload")
+        if event.get("payload_type") != "Request" or not payload:
+            return
+
+        request = SchemaParser.parse_request(payload)
+        if request.id is None:
+            return
+
+        with self._lock:
+            self._recent[request.id] = request
+            while len(self._recent) > self._recent_size:
+                self._recent.popitem(last=False)
+
+            waiters = self._waiters.pop(request.id, [])
+
+        for waiter in waiters:
+            waiter._complete(request)
+
+    def _run(self):
+        delay = self._reconnect_delay
+
+        while not self._stop_event.is_set():
+            try:
+                self._open()
+                delay = self._reconnect_delay
+
+                while not self._stop_event.is_set():
+                    self.handle_message(self._connection.recv())
+            except Exception as ex:
+                if not self._stop_event.is_set():
+                    logger.debug("Event stream connection %s failed: %s", self.url, ex)
+            finally:
+                self._close()
+
+            self._stop_event.wait(delay)
+            delay = min(delay * 2, self._max_reconnect_delay)
+
+    def _open(self):
+        token = self._token_provider() if self._token_provider else None
+
+        kwargs = {}
+        if token:
+            kwargs["header"] = ["Authorization: Bearer " + token]
+        if self._sslopt:
+            kwargs["sslopt"] = self._sslopt
+
+        self._connection = self._connect(self.url, **kwargs)
+
+        if token:
+            self._connection.send(
+                json_codec.dumps({"name": "UPDATE_TOKEN", "payload": token})
+            )
+
+        logger.debug("Listening for Request completion events from %s", self.url)
+        self._set_connected(True)
+
+    def _close(self):
+        connection, self._connection = self._connection, None
+
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+        self._set_connected(False)
+
+    def _set_connected(self, connected):
+        if connected == self._connected:
+            return
+
+        self._connected = connected
+
+        # Events sent while the state was changing may have been missed, so get the
+        # waiters to check their Requests
+        with self._lock:
+            waiters = [w for waiters in self._waiters.values() for w in waiters]
+
+        for waiter in waiters:
+            waiter._wake()
+
+
+class _Pending(object):
+    def __init__(self, raise_on_error, deadline):
+        self.future = Future()
+        self.raise_on_error = raise_on_error
+        self.deadline = deadline
+        self.waiter = None
+
+        self.future.set_running_or_notify_cancel()
+
+
+class RequestPoller(object):
+    """Resolves Futures for outstanding Requests by polling for them together
+
+    A single thread schedules the checks for every pending Request. Beer-garden can't
+    look up a list of Requests by ID, so each Request is fetched individually, by up
+    to ``workers`` threads at once. At most ``batch_size`` Requests are checked per
+    tick, starting with the ones that were checked longest ago, so the load on
+    Beer-garden stays bounded however many Requests are outstanding.
+
+    Like ``SystemClient`` polling, the time between checks starts at ``interval`` and
+    doubles each time nothing completes, up to ``max_interval``. Submitting a new
+    Request resets it. If a ``CompletionListener`` is given, Requests are also
+    resolved as soon as their completion events arrive, and while it's connected
+    polling only happens every ``max_interval`` seconds.
+
+    Args:
+        easy_client: The EasyClient used to query Requests
+        listener: Optional CompletionListener
+        interval: Initial seconds between checks
+        max_interval: Maximum seconds between checks
+        batch_size: Maximum number of Requests to check per tick
+        workers: Maximum number of Requests to check concurrently
+    """
+
+    def __init__(
+        self,
+        easy_client,
+        listener=None,
+        interval=0.5,
+        max_interval=30,
+        batch_size=100,
+        workers=4,
+    ):
+        self._easy_client = easy_client
+        self._listener = listener
+        self._interval = interval
+        self._max_interval = max_interval
+        self._batch_size = batch_size
+        self._workers = workers
+
+        self._condition = threading.Condition()
+        self._pending = OrderedDict()
+        self._executor = None
+        self._current_interval = interval
+        self._next_poll = None
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def pending(self):
+        """Number of Requests waiting to complete"""
+        with self._condition:
+            return sum(len(entries) for entries in self._pending.values())
+
+    def start(self):
+        """Start polling in a daemon thread. Does nothing if already started."""
+        with self._condition:
+            if self._thread is not None:
+                return
+
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="RequestPoller")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stop polling. Pending Futures are resolved with a ``FetchError``."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+            pending, self._pending = self._pending, OrderedDict()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        for request_id, entries in pending.items():
+            for entry in entries:
+                self._fail(
+                    entry,
+                    FetchError(
+                        "Stopped waiting for request '%s' to complete" % request_id
+                    ),
+                )
+
+    def submit(self, request, raise_on_error=False, timeout=None):
+        """Get a Future that will be resolved when a Request completes
+
+        Args:
+            request: The Request, as returned when it was created
+            raise_on_error: Resolve the Future with a ``RequestFailedError`` if the
+                Request completes with an ERROR status
+            timeout: Seconds to wait for the Request to complete before resolving the
+                Future with a ``TimeoutExceededError``. None or <= 0 means wait
+                forever.
+
+        Returns:
+            The Future
+        """
+        deadline = time.time() + timeout if timeout and timeout > 0 else None
+        entry = _Pending(raise_on_error, deadline)
+
+        if request.status in Request.COMPLETED_STATUSES:
+            self._resolve(entry, request)
+            return entry.future
+
+        with self._condition:
+            self._pending.setdefault(request.id, []).append(entry)
+
+            # Check new Requests after the initial interval, like SystemClient does
+            self._current_interval = self._interval
+            next_poll = time.time() + self._interval
+            if self._next_poll is None or next_poll < self._next_poll:
+                self._next_poll = next_poll
+
+            self._condition.notify_all()
+
+        if self._listener:
+            entry.waiter = self._listener.watch(request.id, callback=self.complete)
+
+            # The Request may have completed before the waiter was added
+            with self._condition:
+                still_pending = entry in self._pending.get(request.id, [])
+
+            if not still_pending:
+                self._listener.unwatch(entry.waiter)
+
+        return entry.future
+
+    def complete(self, request):
+        """Resolve the Futures for a completed Request
+
+        Args:
+            request: The completed Request
+
+        Returns:
+            None
+        """
+        with self._condition:
+            entries = self._pending.pop(request.id, [])
+
+        for entry in entries:
+            self._resolve(entry, request)
+
+    def poll(self):
+        """Check the status of all pending Requests
+
+        Returns:
+            The number of Requests that completed
+        """
+        self._expire()
+
+        with self._condition:
+            batch = list(self._pending)[: self._batch_size]
+
+            # Move this batch to the back so the rest are checked next time
+            for request_id in batch:
+                self._pending[request_id] = self._pending.pop(request_id)
+
+            if batch and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._workers)
+
+        if not batch:
+            return 0
+
+        completed = 0
+        for request in self._executor.map(self._find, batch):
+            if request is not None and request.status in Request.COMPLETED_STATUSES:
+                self.complete(request)
+                completed += 1
+
+        return completed
+
+    def _find(self, request_id):
+        try:
+            request = self._easy_client.find_unique_request(id=request_id)
+        except Exception as ex:
+            logger.warning("Error checking status of Request %s: %s", request_id, ex)
+            return None
+
+        if request is None:
+            with self._condition:
+                entries = self._pending.pop(request_id, [])
+
+            for entry in entries:
+                self._fail(entry, FetchError("Request %s not found" % request_id))
+
+        return request
+
+    def _expire(self):
+        now = time.time()
+        expired = []
+
+        with self._condition:
+            for request_id, entries in list(self._pending.items()):
+                for entry in list(entries):
+                    if entry.deadline is not None and entry.deadline <= now:
+                        entries.remove(entry)
+                        expired.append((request_id, entry))
+
+                if not entries:
+                    del self._pending[request_id]
+
+        for request_id, entry in expired:
+            self._fail(
+                entry,
+                TimeoutExceededError(
+                    "Timeout waiting for request '%s' to complete" % request_id
+                ),
+            )
+
+    def _resolve(self, entry, request):
+        if entry.raise_on_error and request.status == "ERROR":
+            self._fail(entry, RequestFailedError(request))
+        else:
+            self._unwatch(entry)
+            entry.future.set_result(request)
+
+    def _fail(self, entry, exc):
+        self._unwatch(entry)
+        entry.future.set_exception(exc)
+
+    def _unwatch(self, entry):
+        if self._listener and entry.waiter is not None:
+            self._listener.unwatch(entry.waiter)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    delay = self._delay()
+                    if delay is not None and delay <= 0:
+                        break
+
+                    self._condition.wait(delay)
+
+                if self._stopped:
+                    return
+
+            completed = self.poll()
+
+            with self._condition:
+                if completed:
+                    self._current_interval = self._interval
+                else:
+                    self._current_interval = min(
+                        self._current_interval * 2, self._max_interval
+                    )
+
+                if self._listener and self._listener.connected:
+                    self._next_poll = time.time() + self._max_interval
+                else:
+                    self._next_poll = time.time() + self._current_interval
+
+    def _delay(self):
+        """Seconds until the next poll or deadline, or None if nothing is pending"""
+        if not self._pending:
+            self._next_poll = None
+            return None
+
+        wake_at = self._next_poll
+        for entries in self._pending.values():
+            for entry in entries:
+                if entry.deadline is not None and entry.deadline < wake_at:
+                    wake_at = entry.deadline
+
+        return wake_at - time.time()
+
+
+def get_listener(rest_client):
+    """Get a started CompletionListener for a Beer-garden
+
+    Listeners are shared between all clients that connect to the same Beer-garden
+    with the same credentials and SSL settings.
+
+    Args:
+        rest_client: A RestClient for the Beer-garden
+
+    Returns:
+        The listener, or None if the ``websocket-client`` package isn't installed
+    """
+    url = _websocket_url(rest_client.base_url)
+    key = _client_key(rest_client)
+
+    with _listeners_lock:
+        listener = _listeners.get(key)
+
+        if listener is None:
+            try:
+                listener = CompletionListener(
+                    url,
+                    token_provider=lambda: rest_client.access_token,
+                    sslopt=_sslopt(rest_client),
+                )
+            except ImportError:
+                logger.warning(
+                    "Request completion events require the websocket-client package, "
+                    "falling back to polling"
+                )
+                return None
+
+            _listeners[key] = listener
+
+    listener.start()
+
+    return listener
+
+
+def stop_listeners():
+    """Stop all listeners created by ``get_listener``"""
+    with _listeners_lock:
+        listeners = list(_listeners.values())
+        _listeners.clear()
+
+    for listener in listeners:
+        listener.stop()
+
+
+def get_poller(easy_client, listener=None, max_interval=30):
+    """Get a started RequestPoller for a Beer-garden
+
+    Pollers are shared between all clients that connect to the same Beer-garden with
+    the same credentials, SSL settings, listener and max_interval.
+
+    Args:
+        easy_client: An EasyClient for the Beer-garden
+        listener: Optional CompletionListener for the Beer-garden
+        max_interval: Maximum seconds between checks
+
+    Returns:
+        The poller
+    """
+    key = _client_key(easy_client.client) + (listener, max_interval)
+
+    with _pollers_lock:
+        poller = _pollers.get(key)
+
+        if poller is None:
+            poller = RequestPoller(
+                easy_client, listener=listener, max_interval=max_interval
+            )
+            _pollers[key] = poller
+
+    poller.start()
+
+    return poller
+
+
+def stop_pollers():
+    """Stop all pollers created by ``get_poller``"""
+    with _pollers_lock:
+        pollers = list(_pollers.values())
+        _pollers.clear()
+
+    for poller in pollers:
+        poller.stop()
+
+
+def _stop_all():
+    # Pollers watch Requests with the listeners, so stop them first
+    stop_pollers()
+    stop_listeners()
+
+
+atexit.register(_stop_all)
+
+
+def _client_key(rest_client):
+    """Everything about a RestClient that affects how it connects to Beer-garden"""
+    if rest_client.username:
+        auth = (rest_client.username, rest_client.password)
+    else:
+        auth = (rest_client.refresh_token, rest_client.access_token)
+
+    return (
+        rest_client.base_url,
+        auth,
+        rest_client.session.verify,
+        rest_client.session.cert,
+    )
+
+
+def _websocket_url(base_url):
+    scheme, rest = base_url.split("://", 1)
+
+    return "%s://%sapi/v1/socket/events/" % (
+        "wss" if scheme == "https" else "ws",
+        rest,
+    )
+
+
+def _sslopt(rest_client):
+    if not rest_client.base_url.startswith("https"):
+        return None
+
+    import ssl
+
+    sslopt = {}
+
+    verify = rest_client.session.verify
+    if verify is False:
+        sslopt["cert_reqs"] = ssl.CERT_NONE
+    elif verify and verify is not True:
+        sslopt["ca_certs"] = verify
+
+    cert = rest_client.session.cert
+    if isinstance(cert, tuple):
+        sslopt["certfile"], sslopt["keyfile"] = cert
+    elif cert:
+        sslopt["certfile"] = cert
+
+    return sslopt
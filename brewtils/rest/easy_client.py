@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-import json
+import logging
 from base64 import b64decode
 from io import BytesIO
 from pathlib import Path
@@ -7,6 +7,7 @@ from typing import Any, Callable, List, NoReturn, Optional, Type, Union
 
 import six
 import wrapt
+from brewtils import json_codec
 from brewtils.config import get_connection_info
 from brewtils.errors import (
     BrewtilsException,
@@ -22,11 +23,26 @@ from brewtils.errors import (
     WaitExceededError,
     _deprecate,
 )
-from brewtils.models import BaseModel, Event, Job, PatchOperation
+from brewtils.models import BaseModel, Event, Job, PatchOperation, Request
+from brewtils.rest.chunked_download import ChunkedDownload
 from brewtils.rest.client import RestClient
 from brewtils.schema_parser import SchemaParser
 from requests import Response  # noqa # not in requirements file
 
+logger = logging.getLogger(__name__)
+
+# Responses to a batch of Requests that mean none were created, and that they should
+# be posted individually instead
+_BATCH_REJECTED_STATUSES = (400, 404, 405, 415)
+
+# Responses that mean the server doesn't accept a list of Requests at all
+_BATCH_UNSUPPORTED_STATUSES = (404, 405, 415)
+
+# Parts of a 400 response message that mean the list itself was rejected, rather than
+# one of the Requests in it. Servers that only accept a single Request fail to load a
+# list with marshmallow's "Invalid input type" error.
+_BATCH_UNSUPPORTED_MESSAGES = ("invalid input type", "list is not", "lists are not")
+
 
 def get_easy_client(**kwargs):
     # type: (**Any) -> EasyClient
@@ -131,6 +147,18 @@ def wrap_response(
             if parse_method is None:
                 return response.json()
 
+            # Responses reused by a conditional GET keep what was parsed from them
+            parsed = getattr(response, "brewtils_parsed", None)
+            if isinstance(parsed, dict):
+                key = (parse_method, parse_many)
+
+                if key not in parsed:
+                    parsed[key] = getattr(SchemaParser, parse_method)(
+                        response.json(), many=parse_many
+                    )
+
+                return parsed[key]
+
             return getattr(SchemaParser, parse_method)(response.json(), many=parse_many)
         else:
             handle_response_failure(
@@ -177,6 +205,9 @@ class EasyClient(object):
 
         self.client = RestClient(*args, **kwargs)
 
+        # Whether the server accepts a list of Requests. None means unknown.
+        self._bulk_requests_supported = None
+
     def can_connect(self, **kwargs):
         # type: (**Any) -> bool
         """Determine if the Beergarden server is responding.
@@ -294,7 +325,7 @@ class EasyClient(object):
     def update_garden(self, garden):
         garden_as_dict = SchemaParser.serialize_garden(garden, to_string=False)
 
-        patches = json.dumps(
+        patches = json_codec.dumps(
             [
                 {
                     "operation": "config",
@@ -672,6 +703,126 @@ class EasyClient(object):
             SchemaParser.serialize_request(request), **kwargs
         )
 
+    def create_requests(self, requests, batch_size=100, **kwargs):
+        # type: (List[Request], int, **Any) -> List[Union[Request, Exception]]
+        """Create many new Requests
+
+        Requests are serialized and posted ``batch_size`` at a time. If a batch is
+        rejected as invalid or unsupported (a 400, 404, 405 or 415 response) its
+        Requests are posted individually so that one bad Request doesn't fail the
+        whole batch. If the server rejected the list itself (a 404, 405 or 415
+        response, or a 400 response saying a list is not accepted) it is assumed not
+        to support creating Requests in bulk, and the rest of the Requests are posted
+        individually.
+
+        Any other failure, or an unexpected successful response, is reported for each
+        Request in the batch without posting them again, as the server may have
+        created some of them.
+
+        Args:
+            requests: New request definitions
+            batch_size: Maximum number of Requests to post at once
+            **kwargs: Extra request parameters, as for ``create_request``
+
+        Returns:
+            A list with an entry for each of the given Requests, in the same order.
+            Each entry is either the newly-created Request or the exception raised
+            when creating it.
+
+        Raises:
+            ValueError: batch_size is less than 1
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        results = []
+
+        for start in range(0, len(requests), batch_size):
+            batch = requests[start : start + batch_size]
+
+            created = None
+            if len(batch) > 1 and self._bulk_requests_supported is not False:
+                created = self._post_request_batch(batch, **kwargs)
+
+            if created is None:
+                created = [self._create_request_or_error(r, **kwargs) for r in batch]
+
+            results.extend(created)
+
+        return results
+
+    def _post_request_batch(self, batch, **kwargs):
+        """Post a batch of Requests
+
+        Returns:
+            A list with the created Request or an exception for each Request in the
+            batch, or None if the batch was rejected and should be posted individually
+        """
+        try:
+            response = self.client.post_requests(
+                SchemaParser.serialize_request(batch, many=True), **kwargs
+            )
+        except Exception as ex:
+            return [ex] * len(batch)
+
+        if response.status_code in _BATCH_REJECTED_STATUSES:
+            logger.debug(
+                "Batch of Requests was rejected (%s), posting them individually",
+                response.status_code,
+            )
+
+            if self._bulk_requests_supported is None and self._batch_unsupported(
+                response
+            ):
+                self._bulk_requests_supported = False
+
+            return None
+
+        if not response.ok:
+            try:
+                handle_response_failure(response, default_exc=SaveError)
+            except Exception as ex:
+                return [ex] * len(batch)
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+
+        if not isinstance(body, list) or len(body) != len(batch):
+            return [
+                SaveError(
+                    "Unexpected response to a batch of Requests, some of them may "
+                    "have been created"
+                )
+            ] * len(batch)
+
+        self._bulk_requests_supported = True
+        return SchemaParser.parse_request(body, many=True)
+
+    @staticmethod
+    def _batch_unsupported(response):
+        """Determine if a rejected batch means the server doesn't accept lists"""
+        if response.status_code in _BATCH_UNSUPPORTED_STATUSES:
+            return True
+
+        try:
+            body = response.json()
+        except ValueError:
+            return False
+
+        if isinstance(body, dict):
+            body = body.get("message")
+
+        message = str(body).lower()
+        return any(phrase in message for phrase in _BATCH_UNSUPPORTED_MESSAGES)
+
+    def _create_request_or_error(self, request, **kwargs):
+        try:
+            return self.create_request(request, **kwargs)
+        except Exception as ex:
+            return ex
+
     @wrap_response(
         parse_method="parse_request", parse_many=False, default_exc=SaveError
     )
@@ -945,7 +1096,12 @@ class EasyClient(object):
 
     @wrap_response(parse_method="parse_resolvable")
     def upload_chunked_file(
-        self, file_to_upload, desired_filename=None, file_params=None
+        self,
+        file_to_upload,
+        desired_filename=None,
+        file_params=None,
+        max_workers=4,
+        progress=None,
     ):
         """Upload a given file to the Beer Garden server.
 
@@ -955,6 +1111,9 @@ class EasyClient(object):
             will use the basename of the file_to_upload
             file_params: The metadata surrounding the file.
                 Valid Keys: See brewtils File model
+            max_workers: Maximum number of chunks to upload concurrently
+            progress: Optional callable that will be called with the number of
+                bytes uploaded so far and the total file size
 
         Returns:
             A BG file ID.
@@ -991,7 +1150,11 @@ class EasyClient(object):
         )
         try:
             response = self.client.post_chunked_file(
-                fd, file_params, current_position=cur_cursor
+                fd,
+                file_params,
+                current_position=cur_cursor,
+                max_workers=max_workers,
+                progress=progress,
             )
             fd.seek(cur_cursor)
         finally:
@@ -1016,28 +1179,52 @@ class EasyClient(object):
 
         return response
 
-    def download_chunked_file(self, file_id):
+    def download_chunked_file(
+        self, file_id, streaming=False, path=None, max_workers=4, spool_dir=None
+    ):
         """Download a chunked file from the Beer Garden server.
 
+        By default the chunks are fetched one after another into an in-memory file
+        object. In streaming mode they are fetched ``max_workers`` at a time and
+        written to a spooled temporary file (or ``path``), and a ``ChunkedDownload``
+        is returned as soon as the first chunk arrives. Reading from it blocks until
+        the requested bytes have been downloaded.
+
         Args:
             file_id: The beer garden-assigned file id.
+            streaming: Download in streaming mode
+            path: Write the file to this path. Implies streaming mode.
+            max_workers: Maximum number of chunks to fetch concurrently in streaming
+                mode
+            spool_dir: Directory for the temporary file used in streaming mode
 
         Returns:
             A file object
         """
         (valid, meta) = self._check_chunked_file_validity(file_id)
-        file_obj = BytesIO()
-        if valid:
-            for x in range(meta["number_of_chunks"]):
-                resp = self.client.get_chunked_file(file_id, params={"chunk": x})
-                if resp.ok:
-                    data = resp.json()["data"]
-                    file_obj.write(b64decode(data))
-                else:
-                    raise ValueError("Could not fetch chunk %d" % x)
-        else:
+        if not valid:
             raise ValidationError("Requested file %s is incomplete." % file_id)
 
+        def fetch(chunk):
+            resp = self.client.get_chunked_file(file_id, params={"chunk": chunk})
+            if not resp.ok:
+                raise ValueError("Could not fetch chunk %d" % chunk)
+
+            return b64decode(resp.json()["data"])
+
+        if streaming or path is not None:
+            return ChunkedDownload(
+                fetch,
+                meta["number_of_chunks"],
+                path=path,
+                max_workers=max_workers,
+                spool_dir=spool_dir,
+            )
+
+        file_obj = BytesIO()
+        for x in range(meta["number_of_chunks"]):
+            file_obj.write(fetch(x))
+
         file_obj.seek(0)
 
         return file_obj
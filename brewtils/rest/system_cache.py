@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Process-wide cache of System definitions
+
+``SystemClient`` instances created with a ``system_cache_ttl`` share the System
+definitions they load through this cache, so creating many short-lived clients (or
+using ``always_update``) doesn't mean downloading and parsing the same Systems over
+and over.
+
+Entries are keyed by the Beer-garden URL and the namespace, name and version
+constraint used to find the System. They are invalidated when a Request fails
+validation and, if the client is listening to Beer-garden's event stream, when a
+``SYSTEM_CREATED``, ``SYSTEM_UPDATED`` or ``SYSTEM_REMOVED`` event arrives.
+"""
+
+import threading
+import time
+
+from brewtils.models import Events
+
+__all__ = ["SYSTEM_EVENTS", "SystemCache", "get_system_cache"]
+
+SYSTEM_EVENTS = (
+    Events.SYSTEM_CREATED.name,
+    Events.SYSTEM_UPDATED.name,
+    Events.SYSTEM_REMOVED.name,
+)
+
+
+class SystemCache(object):
+    """Thread-safe cache of System definitions with per-lookup expiry"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._listeners = set()
+
+    def get(self, key, ttl):
+        """Get a cached System
+
+        Args:
+            key: Tuple of (url, namespace, name, version constraint)
+            ttl: Maximum age in seconds of a usable entry
+
+        Returns:
+            The System, or None if there's no entry younger than ``ttl``
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None or time.time() - entry[0] > ttl:
+            return None
+
+        return entry[1]
+
+    def set(self, key, system):
+        """Cache a System
+
+        Args:
+            key: Tuple of (url, namespace, name, version constraint)
+            system: The System
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._entries[key] = (time.time(), system)
+
+    def invalidate(self, key=None, namespace=None, name=None):
+        """Remove entries from the cache
+
+        Args:
+            key: Remove the entry with this key
+            namespace: Remove entries for Systems in this namespace
+            name: Remove entries for Systems with this name. When given with
+                ``namespace`` only entries matching both are removed.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if key is not None:
+                self._entries.pop(key, None)
+
+            if namespace is not None or name is not None:
+                for entry_key in list(self._entries):
+                    _, entry_namespace, entry_name, _ = entry_key
+
+                    if (namespace is None or namespace == entry_namespace) and (
+                        name is None or name == entry_name
+                    ):
+                        del self._entries[entry_key]
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def handle_event(self, event):
+        """Invalidate entries for the System in a system event
+
+        Args:
+            event: Dictionary representation of the event
+
+        Returns:
+            None
+        """
+        payload = event.get("payload") or {}
+
+        if payload.get("name"):
+            self.invalidate(name=payload["name"])
+        else:
+            self.clear()
+
+    def subscribe(self, listener):
+        """Invalidate entries when a CompletionListener receives system events
+
+        Subscribing to the same listener more than once has no effect.
+
+        Args:
+            listener: The CompletionListener
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if listener in self._listeners:
+                return
+
+            self._listeners.add(listener)
+
+        listener.subscribe(SYSTEM_EVENTS, self.handle_event)
+
+
+_cache = SystemCache()
+
+
+def get_system_cache():
+    """Get the process-wide SystemCache"""
+    return _cache
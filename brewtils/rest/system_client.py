@@ -1,14 +1,15 @@
 # -*- coding: utf-8 -*-
 import logging
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from functools import partial
 from multiprocessing import cpu_count
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
 
 from packaging.version import parse
 
 import brewtils.plugin
+from brewtils import tracing
 from brewtils.errors import (
     FetchError,
     RequestFailedError,
@@ -19,7 +20,14 @@ from brewtils.errors import (
 )
 from brewtils.models import Request, System
 from brewtils.resolvers.manager import ResolutionManager
+from brewtils.resolvers.uploads import (
+    PERSISTED_MAX_AGE,
+    UploadIndex,
+    get_upload_index,
+)
+from brewtils.rest import completion
 from brewtils.rest.easy_client import EasyClient
+from brewtils.rest.system_cache import get_system_cache
 
 
 class SystemClient(object):
@@ -60,6 +68,13 @@ class SystemClient(object):
                 If not set the System definition will be loaded when making the first
                 request and will only be reloaded if a Request fails.
 
+            system_cache_ttl:
+                If set, System definitions are shared with other SystemClients through
+                a process-wide cache and reused for this many seconds instead of being
+                loaded from Beer-garden again. Cached definitions are dropped when a
+                Request fails validation and, with ``completion_events``, when
+                Beer-garden reports that the System changed.
+
     Loading the System:
         The System definition is lazily loaded, so nothing happens until the first
         attempt to send a Request. At that point the SystemClient will query Beer-garden
@@ -79,12 +94,24 @@ class SystemClient(object):
         specified and the Request has not completed within that time a
         ``ConnectionTimeoutError`` will be raised.
 
+        Passing ``completion_events=True`` will instead listen to Beer-garden's event
+        stream and return as soon as the Request's completion event arrives (this
+        requires the ``websocket-client`` package). While the event stream is
+        connected Beer-garden is only polled every max_delay seconds in case an event
+        is missed, and if the event stream is unavailable the SystemClient falls back
+        to polling as described above.
+
         It is also possible to create the SystemClient in non-blocking mode by
         specifying blocking=False. In this case the request creation will immediately
         return a Future and will spawn a separate thread to poll for Request completion.
         The max_concurrent parameter is used to control the maximum threads available
         for polling.
 
+        When sending many requests with blocking=False, passing ``bulk_polling=True``
+        will instead track every outstanding Request in a single shared poller, which
+        checks a bounded number of them per tick from a small pool of threads rather
+        than a thread per Request. This also works with ``completion_events``.
+
         .. code-block:: python
 
             # Create a SystemClient with blocking=False
@@ -160,10 +187,23 @@ class SystemClient(object):
         default_instance (str): Name of the Instance to make Requests on
         always_update (bool): Whether to check if a newer version of the System exists
             before making each Request. Only relevant if ``version_constraint='latest'``
+        system_cache_ttl (int): Seconds to reuse System definitions from the
+            process-wide cache. 'None' means don't use the cache.
         timeout (int): Seconds to wait for a request to complete. 'None' means wait
             forever.
         max_delay (int): Maximum number of seconds to wait between status checks for a
             created request
+        completion_events (bool): Listen for Request completion events instead of
+            polling Beer-garden
+        bulk_polling (bool): Use a shared poller instead of a thread per Request to
+            wait for Requests when blocking=False
+        dedupe_uploads (bool): Reuse the first upload of a file parameter for later
+            Requests with the same parameter content
+        upload_index (str): Path to a file used to remember uploads across sessions.
+            Implies dedupe_uploads.
+        upload_index_max_age (int): Seconds after which an upload will no longer be
+            reused. 'None' means forever. Defaults to a day for persisted indexes and
+            forever otherwise.
         blocking (bool): Flag indicating whether creation will block until the Request
             is complete or return a Future that will complete when the Request does
         max_concurrent (int): Maximum number of concurrent requests allowed.
@@ -246,14 +286,37 @@ class SystemClient(object):
 
         # This is for Python 3.4 compatibility - max_workers MUST be non-None
         # in that version. This logic is what was added in Python 3.5
-        max_concurrent = kwargs.get("max_concurrent", (cpu_count() or 1) * 5)
-        self._thread_pool = ThreadPoolExecutor(max_workers=max_concurrent)
+        self._max_concurrent = kwargs.get("max_concurrent", (cpu_count() or 1) * 5)
+        self._thread_pool = ThreadPoolExecutor(max_workers=self._max_concurrent)
 
         # This points DeprecationWarnings at the right line
         kwargs.setdefault("stacklevel", 5)
 
         self._easy_client = EasyClient(*args, **kwargs)
-        self._resolver = ResolutionManager(easy_client=self._easy_client)
+        self._resolver = ResolutionManager(
+            easy_client=self._easy_client,
+            upload_index=self._upload_index(kwargs),
+            upload_scope="%s %s"
+            % (self._easy_client.client.base_url, self._system_namespace),
+        )
+
+        self._listener = None
+        if kwargs.get("completion_events", False):
+            self._listener = completion.get_listener(self._easy_client.client)
+
+        self._system_cache = None
+        self._system_cache_ttl = kwargs.get("system_cache_ttl")
+        if self._system_cache_ttl:
+            self._system_cache = get_system_cache()
+
+            if self._listener:
+                self._system_cache.subscribe(self._listener)
+
+        self._poller = None
+        if kwargs.get("bulk_polling", False):
+            self._poller = completion.get_poller(
+                self._easy_client, listener=self._listener, max_interval=self._max_delay
+            )
 
     def __getattr__(self, item):
         # type: (str) -> partial
@@ -326,6 +389,121 @@ class SystemClient(object):
                 "System '%s' has no command named '%s'" % (self._system, command_name)
             )
 
+    def map(
+        self,
+        command_name,
+        iterable,
+        concurrency=None,
+        ordered=True,
+        return_exceptions=False,
+        **kwargs
+    ):
+        # type: (str, Iterable[Dict[str, Any]], int, bool, bool, **Any) -> Iterator
+        """Send a Request for each set of parameters and yield the results
+
+        Requests are created lazily as the results are consumed, and no more than
+        ``concurrency`` Requests will be outstanding at once.
+
+        Example::
+
+            client = SystemClient(host, port, 'system')
+
+            params = ({'number': n} for n in range(1000))
+
+            for request in client.map('double', params, concurrency=20):
+                print(request.output)
+
+        Closing the generator (or breaking out of the loop) stops any more Requests
+        from being sent and stops waiting for the outstanding ones. Requests that have
+        already been created will still run.
+
+        Args:
+            command_name (str): Name of the Command to send
+            iterable: Iterable of parameter dictionaries, one per Request
+            concurrency (int): Maximum number of outstanding Requests. Defaults to
+                max_concurrent.
+            ordered (bool): Yield results in the same order as ``iterable``. If False
+                results are yielded as soon as they complete.
+            return_exceptions (bool): Yield the exception raised for a Request (e.g.
+                a ``ValidationError`` or, when raising on errors, a
+                ``RequestFailedError``) instead of raising it. If False the first
+                exception is raised and the remaining Requests are abandoned.
+            kwargs: Will be passed when creating every Request. This can include
+                Beer-garden internal parameters like ``_timeout`` or
+                ``_raise_on_error``.
+
+        Returns:
+            Generator of completed Requests (or exceptions)
+
+        Raises:
+            AttributeError: System does not have a Command with the given command_name
+            ValueError: concurrency is less than 1
+        """
+        concurrency = concurrency or self._max_concurrent
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        # Checked here so a bad command name raises immediately
+        send = self.create_bg_request(command_name, **kwargs)
+
+        return self._map(send, iter(iterable), concurrency, ordered, return_exceptions)
+
+    def _map(self, send, items, concurrency, ordered, return_exceptions):
+        pending = {}
+        completed = {}
+        sent = 0
+        next_index = 0
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < concurrency:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+
+                    pending[self._map_send(send, item)] = sent
+                    sent += 1
+
+                if not pending:
+                    return
+
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+
+                for future in sorted(done, key=pending.get):
+                    completed[pending.pop(future)] = future
+
+                if ordered:
+                    while next_index in completed:
+                        future = completed.pop(next_index)
+                        next_index += 1
+
+                        yield self._map_result(future, return_exceptions)
+                else:
+                    for index in sorted(completed):
+                        yield self._map_result(completed.pop(index), return_exceptions)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _map_send(send, item):
+        try:
+            return send(_blocking=False, **item)
+        except Exception as ex:
+            future = Future()
+            future.set_exception(ex)
+            return future
+
+    @staticmethod
+    def _map_result(future, return_exceptions):
+        if return_exceptions:
+            return future.exception() or future.result()
+
+        return future.result()
+
     def send_bg_request(self, *args, **kwargs):
         """Actually create a Request and send it to Beer-garden
 
@@ -362,6 +540,17 @@ class SystemClient(object):
         blocking = kwargs.pop("_blocking", self._blocking)
         timeout = kwargs.pop("_timeout", self._timeout)
 
+        with tracing.span(
+            "send_bg_request",
+            attributes={
+                "brewtils.request.command": kwargs.get("_command") or "",
+                "brewtils.request.system": kwargs.get("_system_name") or "",
+                "brewtils.request.blocking": bool(blocking),
+            },
+        ):
+            return self._send_bg_request(raise_on_error, blocking, timeout, **kwargs)
+
+    def _send_bg_request(self, raise_on_error, blocking, timeout, **kwargs):
         # If the request fails validation and the version constraint allows,
         # check for a new version and retry
         try:
@@ -370,6 +559,10 @@ class SystemClient(object):
                 request, blocking=blocking, timeout=timeout
             )
         except ValidationError:
+            # The System definition may be out of date
+            if self._system_cache:
+                self._system_cache.invalidate(key=self._system_cache_key())
+
             if self._system and self._version_constraint == "latest":
                 old_version = self._system.version
 
@@ -377,11 +570,16 @@ class SystemClient(object):
 
                 if old_version != self._system.version:
                     kwargs["_system_version"] = self._system.version
-                    return self.send_bg_request(**kwargs)
+                    return self._send_bg_request(
+                        raise_on_error, blocking, timeout, **kwargs
+                    )
             raise
 
         # If not blocking just return the future
         if not blocking:
+            if self._poller:
+                return self._poller.submit(request, raise_on_error, timeout)
+
             return self._thread_pool.submit(
                 self._wait_for_request, request, raise_on_error, timeout
             )
@@ -406,20 +604,32 @@ class SystemClient(object):
         Raises:
             FetchError: Unable to find a matching System
         """
+        system = None
 
-        if self._version_constraint == "latest":
-            self._system = self._determine_latest(
-                self._easy_client.find_systems(
-                    name=self._system_name, namespace=self._system_namespace
-                )
-            )
-        else:
-            self._system = self._easy_client.find_unique_system(
-                name=self._system_name,
-                version=self._version_constraint,
-                namespace=self._system_namespace,
+        if self._system_cache:
+            system = self._system_cache.get(
+                self._system_cache_key(), self._system_cache_ttl
             )
 
+        if system is None:
+            if self._version_constraint == "latest":
+                system = self._determine_latest(
+                    self._easy_client.find_systems(
+                        name=self._system_name, namespace=self._system_namespace
+                    )
+                )
+            else:
+                system = self._easy_client.find_unique_system(
+                    name=self._system_name,
+                    version=self._version_constraint,
+                    namespace=self._system_namespace,
+                )
+
+            if system is not None and self._system_cache:
+                self._system_cache.set(self._system_cache_key(), system)
+
+        self._system = system
+
         if self._system is None:
             raise FetchError(
                 "Beer-garden has no system named '%s' with a version matching '%s' in "
@@ -436,24 +646,68 @@ class SystemClient(object):
         self._commands = {command.name: command for command in self._system.commands}
         self._loaded = True
 
-    def _wait_for_request(self, request, raise_on_error, timeout):
-        # type: (Request, bool, int) -> Request
-        """Poll the server until the request is completed or errors"""
+    def _system_cache_key(self):
+        return (
+            self._easy_client.client.base_url,
+            self._system_namespace,
+            self._system_name,
+            self._version_constraint,
+        )
 
-        delay_time = 0.5
-        total_wait_time = 0
-        while request.status not in Request.COMPLETED_STATUSES:
+    @staticmethod
+    def _upload_index(kwargs):
+        """Create the index used to deduplicate uploads, if requested"""
+        if kwargs.get("upload_index"):
+            return get_upload_index(
+                kwargs["upload_index"],
+                max_age=kwargs.get("upload_index_max_age", PERSISTED_MAX_AGE),
+            )
 
-            if timeout and 0 < timeout < total_wait_time:
-                raise TimeoutExceededError(
-                    "Timeout waiting for request '%s' to complete" % str(request)
-                )
+        if kwargs.get("dedupe_uploads", False):
+            return UploadIndex(max_age=kwargs.get("upload_index_max_age"))
+
+        return None
 
-            time.sleep(delay_time)
-            total_wait_time += delay_time
-            delay_time = min(delay_time * 2, self._max_delay)
+    def _wait_for_request(self, request, raise_on_error, timeout):
+        # type: (Request, bool, int) -> Request
+        """Wait for a completion event or poll the server until the request completes"""
 
-            request = self._easy_client.find_unique_request(id=request.id)
+        waiter = None
+        if self._listener and request.status not in Request.COMPLETED_STATUSES:
+            waiter = self._listener.watch(request.id)
+
+        try:
+            delay_time = 0.5
+            total_wait_time = 0
+            while request.status not in Request.COMPLETED_STATUSES:
+
+                if timeout and 0 < timeout < total_wait_time:
+                    raise TimeoutExceededError(
+                        "Timeout waiting for request '%s' to complete" % str(request)
+                    )
+
+                if waiter and self._listener.connected:
+                    # Only poll occasionally, in case the event was missed
+                    wait_time = self._max_delay
+                    if timeout and timeout > 0:
+                        wait_time = min(wait_time, max(timeout - total_wait_time, 0))
+
+                    start = time.time()
+                    completed = waiter.wait(wait_time)
+                    total_wait_time += time.time() - start
+
+                    if completed is not None:
+                        request = completed
+                        continue
+                else:
+                    time.sleep(delay_time)
+                    total_wait_time += delay_time
+                    delay_time = min(delay_time * 2, self._max_delay)
+
+                request = self._easy_client.find_unique_request(id=request.id)
+        finally:
+            if waiter:
+                self._listener.unwatch(waiter)
 
         if raise_on_error and request.status == "ERROR":
             raise RequestFailedError(request)
@@ -499,6 +753,9 @@ class SystemClient(object):
         if system_display:
             metadata["system_display_name"] = system_display
 
+        # Lets the Request's processing be traced as a child of the current span
+        tracing.inject_context(metadata)
+
         # Don't check namespace - https://github.com/beer-garden/beer-garden/issues/827
         if command is None:
             raise ValidationError("Unable to send a request with no command")
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
-import json
 import logging
+import threading
 import typing
 from typing import Any, Dict, Optional, Union
 
@@ -8,6 +8,7 @@ import brewtils.models
 import brewtils.schemas
 import six  # type: ignore
 from box import Box  # type: ignore
+from brewtils import json_codec
 from brewtils.models import BaseModel
 
 try:
@@ -52,6 +53,10 @@ class SchemaParser(object):
 
     logger = logging.getLogger(__name__)
 
+    # Schema instances are expensive to construct, so they're cached and reused
+    _schema_cache = {}
+    _schema_cache_lock = threading.Lock()
+
     # Deserialization methods
     @classmethod
     def parse_system(cls, system, from_string=False, **kwargs):
@@ -314,7 +319,7 @@ class SchemaParser(object):
         Returns:
             A dictionary containing a list of job ids
         """
-        schema = brewtils.schemas.JobExportInputSchema(**kwargs)
+        schema = cls._get_schema("JobExportInputSchema", **kwargs)
 
         if from_string:
             return schema.loads(job_id_json).data
@@ -421,9 +426,7 @@ class SchemaParser(object):
                 )
             kwargs["many"] = True
 
-        schema = getattr(brewtils.schemas, model_class.schema)(**kwargs)
-
-        schema.context["models"] = cls._models
+        schema = cls._get_schema(model_class.schema, **kwargs)
 
         return schema.loads(data).data if from_string else schema.load(data).data
 
@@ -870,7 +873,7 @@ class SchemaParser(object):
         if cls._single_item(model):
             kwargs["many"] = False
 
-            schema = getattr(brewtils.schemas, schema_name)(**kwargs)
+            schema = cls._get_schema(schema_name, **kwargs)
 
             return schema.dumps(model).data if to_string else schema.dump(model).data
 
@@ -880,7 +883,73 @@ class SchemaParser(object):
             for x in model
         ]
 
-        return json.dumps(multiple) if to_string else multiple
+        return json_codec.dumps(multiple) if to_string else multiple
+
+    @classmethod
+    def _get_schema(cls, schema_name, **kwargs):
+        # type: (str, **Any) -> brewtils.schemas.BaseSchema
+        """Get a schema instance, reusing a cached one if possible
+
+        Schemas are keyed on the schema name and the keyword arguments used to
+        construct them, so two calls with the same name and arguments will share the
+        same schema instance. Schemas are only used for loading and dumping, both of
+        which are safe to do concurrently, so sharing them between threads is fine.
+
+        If the keyword arguments can't be used as a cache key (e.g. a ``context``
+        dictionary was given) a new schema will be constructed every time.
+
+        Args:
+            schema_name: Name of the schema class in ``brewtils.schemas``
+            **kwargs: Additional parameters to be passed to the Schema
+
+        Returns:
+            A schema instance
+        """
+        try:
+            key = (schema_name, cls._freeze(kwargs))
+            schema = cls._schema_cache.get(key)
+        except TypeError:
+            return cls._build_schema(schema_name, **kwargs)
+
+        if schema is None:
+            with cls._schema_cache_lock:
+                schema = cls._schema_cache.get(key)
+
+                if schema is None:
+                    schema = cls._build_schema(schema_name, **kwargs)
+                    cls._schema_cache[key] = schema
+
+        return schema
+
+    @classmethod
+    def _build_schema(cls, schema_name, **kwargs):
+        # type: (str, **Any) -> brewtils.schemas.BaseSchema
+        """Construct a new schema instance with the model context set"""
+        schema = getattr(brewtils.schemas, schema_name)(**kwargs)
+
+        # Needs to be set before the first load so nested schemas inherit it
+        schema.context["models"] = cls._models
+
+        return schema
+
+    @classmethod
+    def _freeze(cls, kwargs):
+        # type: (Dict[str, Any]) -> typing.Tuple
+        """Convert schema kwargs into a hashable representation
+
+        Raises:
+            TypeError: A kwarg value is not hashable
+        """
+        frozen = []
+
+        for key, value in sorted(kwargs.items()):
+            if isinstance(value, (list, tuple, set, frozenset)):
+                value = tuple(value)
+
+            hash(value)
+            frozen.append((key, value))
+
+        return tuple(frozen)
 
     @classmethod
     def _get_schema_name(cls, obj):
@@ -5,11 +5,12 @@ import datetime
 from functools import partial
 
 import marshmallow
-import simplejson
 from marshmallow import Schema, fields, post_load, pre_load
 from marshmallow.utils import UTC
 from marshmallow_polyfield import PolyField
 
+from brewtils import json_codec
+
 __all__ = [
     "SystemSchema",
     "InstanceSchema",
@@ -158,9 +159,9 @@ class BaseSchema(Schema):
     class Meta:
         version_nums = marshmallow.__version__.split(".")
         if int(version_nums[0]) <= 2 and int(version_nums[1]) < 17:  # pragma: no cover
-            json_module = simplejson
+            json_module = json_codec
         else:
-            render_module = simplejson
+            render_module = json_codec
 
     def __init__(self, strict=True, **kwargs):
         super(BaseSchema, self).__init__(strict=strict, **kwargs)
@@ -10,6 +10,20 @@ def _is_json_dict(s):
         return False
 
 
+def _is_pool_sizes(s):
+    import json
+
+    try:
+        sizes = json.loads(s)
+    except json.decoder.JSONDecodeError:
+        return False
+
+    return isinstance(sizes, dict) and all(
+        isinstance(size, int) and not isinstance(size, bool) and size > 0
+        for size in sizes.values()
+    )
+
+
 _CONNECTION_SPEC = {
     "bg_host": {
         "type": "str",
@@ -76,6 +90,17 @@ _CONNECTION_SPEC = {
         "the Requests documentation).",
         "default": -1,
     },
+    "conditional_get": {
+        "type": "bool",
+        "description": "Use conditional requests when fetching configuration",
+        "long_description": "When enabled the RestClient remembers the ETag and "
+        "Last-Modified headers of System, Garden and configuration responses and "
+        "sends them with the next request for the same resource. If the resource "
+        "hasn't changed the previous response (and anything parsed from it) is "
+        "reused instead of being transferred and parsed again. Models parsed from "
+        "a reused response are shared between calls, so shouldn't be modified.",
+        "default": False,
+    },
     "username": {
         "type": "str",
         "description": "Username for authentication",
@@ -194,11 +219,85 @@ _PLUGIN_SPEC = {
         "description": "Initial amount of time to wait before request update retry",
         "default": 5,
     },
+    "batch_updates": {
+        "type": "bool",
+        "description": "Queue completed request updates and send them in batches",
+        "default": False,
+    },
+    "update_batch_size": {
+        "type": "int",
+        "description": "Maximum number of queued request updates to send at once",
+        "default": 50,
+    },
+    "command_executor": {
+        "type": "str",
+        "description": "Where to run commands that don't specify an executor",
+        "default": "thread",
+        "choices": ["thread", "process"],
+    },
+    "process_workers": {
+        "type": "int",
+        "description": "Maximum number of processes to use for process commands",
+        "required": False,
+    },
+    "command_pools": {
+        "type": "str",
+        "description": "Sizes of named command thread pools, in JSON string form. "
+        "Something like '{\"reports\": 2}'",
+        "default": "{}",
+        "validator": _is_pool_sizes,
+    },
+    "async_processing": {
+        "type": "bool",
+        "description": "Process requests on an asyncio event loop",
+        "default": False,
+    },
+    "fast_parse": {
+        "type": "bool",
+        "description": "Parse incoming requests without using marshmallow schemas",
+        "default": False,
+    },
+    "json_backend": {
+        "type": "str",
+        "description": "JSON library to use for (de)serialization",
+        "default": "simplejson",
+        "choices": ["auto", "orjson", "ujson", "simplejson", "json"],
+    },
+    "tracing": {
+        "type": "bool",
+        "description": "Create OpenTelemetry spans for request processing",
+        "default": False,
+    },
+    "metrics_port": {
+        "type": "int",
+        "description": "Port to serve request processing metrics on",
+        "required": False,
+    },
+    "metrics_host": {
+        "type": "str",
+        "description": "Address to serve request processing metrics on",
+        "default": "127.0.0.1",
+    },
     "working_directory": {
         "type": "str",
         "description": "Working directory to use as a staging area for file parameters",
         "required": False,
     },
+    "streaming_downloads": {
+        "type": "bool",
+        "description": "Download chunked file parameters into temporary files",
+        "default": False,
+    },
+    "file_cache_size": {
+        "type": "int",
+        "description": "Maximum size (in MB) of the downloaded file parameter cache",
+        "required": False,
+    },
+    "lazy_resolution": {
+        "type": "bool",
+        "description": "Download file parameters when commands first use them",
+        "default": False,
+    },
 }
 
 _MQ_SPEC = {
@@ -220,6 +319,34 @@ _MQ_SPEC = {
             "description": "Initial amount of time to wait before reconnect try",
             "default": 5,
         },
+        "ack_batch_size": {
+            "type": "int",
+            "description": "Number of finished requests that will trigger an ack "
+            "(1 acks every request immediately)",
+            "default": 1,
+        },
+        "ack_interval": {
+            "type": "float",
+            "description": "Maximum amount of time to hold a finished request before "
+            "acking it",
+            "default": 0.05,
+        },
+        "adaptive_prefetch": {
+            "type": "bool",
+            "description": "Adjust the prefetch count based on how fast requests "
+            "are processed",
+            "default": False,
+        },
+        "min_prefetch": {
+            "type": "int",
+            "description": "Minimum prefetch count when using adaptive prefetch",
+            "default": 1,
+        },
+        "max_prefetch": {
+            "type": "int",
+            "description": "Maximum prefetch count when using adaptive prefetch",
+            "default": 100,
+        },
     },
 }
 
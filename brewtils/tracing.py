@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""Optional tracing of request processing
+
+When enabled, spans are created around:
+
+- ``process_message``: Processing a Request, from the IN_PROGRESS update to the final
+  update
+- ``invoke_command``: Running the command itself
+- ``download_parameter``: Downloading a file parameter during parameter resolution
+- ``send_bg_request``: Creating a Request with a ``SystemClient`` and waiting for it
+
+The trace context of the current span is added to the metadata of Requests created
+with a ``SystemClient`` (under ``trace_context``). When that Request is processed its
+``process_message`` span becomes a child of the span that created it, so a whole tree
+of parent / child Requests ends up in one trace. Context found in the message's AMQP
+headers is used in preference to the metadata.
+
+Tracing is disabled by default, in which case a ``NoopTracer`` is used and nothing is
+recorded. To send spans to OpenTelemetry (requires the ``opentelemetry-api`` package
+and a configured SDK / exporter) set the ``tracing`` plugin option or::
+
+    from brewtils import tracing
+
+    tracing.set_tracer(tracing.OpenTelemetryTracer())
+"""
+
+import abc
+import logging
+
+import six
+
+__all__ = [
+    "METADATA_KEY",
+    "NoopTracer",
+    "OpenTelemetryTracer",
+    "Tracer",
+    "enable",
+    "extract_context",
+    "get_tracer",
+    "inject_context",
+    "is_enabled",
+    "set_tracer",
+    "span",
+]
+
+logger = logging.getLogger(__name__)
+
+# Request metadata key used to propagate trace context
+METADATA_KEY = "trace_context"
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Tracer(object):
+    """Creates spans and propagates trace context"""
+
+    @abc.abstractmethod
+    def span(self, name, context=None, attributes=None):
+        """Create a span and make it current
+
+        Args:
+            name: The span name
+            context: Parent context from ``extract``. If None the current span (if
+                any) will be the parent.
+            attributes: Dictionary of span attributes
+
+        Returns:
+            A context manager. Exceptions raised in the block should be recorded on the
+            span and re-raised.
+        """
+
+    @abc.abstractmethod
+    def inject(self):
+        """Get the current trace context
+
+        Returns:
+            Dictionary of string keys and values representing the current context
+        """
+
+    @abc.abstractmethod
+    def extract(self, carrier):
+        """Build a context from a carrier dictionary
+
+        Args:
+            carrier: Dictionary created by ``inject``
+
+        Returns:
+            A context that can be passed to ``span``
+        """
+
+
+class _NoopSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class NoopTracer(Tracer):
+    """Tracer that doesn't record anything"""
+
+    def span(self, name, context=None, attributes=None):
+        return _NOOP_SPAN
+
+    def inject(self):
+        return {}
+
+    def extract(self, carrier):
+        return None
+
+
+class OpenTelemetryTracer(Tracer):
+    """Tracer that creates OpenTelemetry spans
+
+    Context is propagated using the globally configured OpenTelemetry propagator,
+    which by default uses the W3C ``traceparent`` and ``tracestate`` keys.
+
+    Args:
+        tracer_provider: The OpenTelemetry TracerProvider to use. Defaults to the
+            global TracerProvider.
+
+    Raises:
+        ImportError: The opentelemetry-api package is not installed
+    """
+
+    def __init__(self, tracer_provider=None):
+        from opentelemetry import propagate, trace
+
+        self._propagate = propagate
+        self._tracer = trace.get_tracer("brewtils", tracer_provider=tracer_provider)
+
+    def span(self, name, context=None, attributes=None):
+        return self._tracer.start_as_current_span(
+            name, context=context, attributes=attributes
+        )
+
+    def inject(self):
+        carrier = {}
+        self._propagate.inject(carrier)
+
+        return carrier
+
+    def extract(self, carrier):
+        return self._propagate.extract(carrier)
+
+
+_tracer = NoopTracer()
+_enabled = False
+
+
+def get_tracer():
+    """Get the current Tracer"""
+    return _tracer
+
+
+def is_enabled():
+    """Determine if tracing is enabled (the Tracer isn't a NoopTracer)"""
+    return _enabled
+
+
+def set_tracer(tracer=None):
+    """Set the Tracer
+
+    Args:
+        tracer: The new Tracer. Passing None will install a NoopTracer.
+
+    Returns:
+        The new Tracer
+    """
+    global _tracer, _enabled
+
+    _tracer = tracer or NoopTracer()
+    _enabled = not isinstance(_tracer, NoopTracer)
+
+    return _tracer
+
+
+def enable(enabled=True):
+    """Enable or disable OpenTelemetry tracing
+
+    If the opentelemetry-api package isn't installed a warning will be logged and
+    tracing will stay disabled.
+
+    Args:
+        enabled: Whether tracing should be enabled
+
+    Returns:
+        True if tracing is now enabled, False otherwise
+    """
+    if not enabled:
+        set_tracer()
+        return False
+
+    try:
+        set_tracer(OpenTelemetryTracer())
+    except ImportError:
+        logger.warning(
+            "Tracing was requested but opentelemetry-api is not installed, so it will "
+            "be disabled"
+        )
+        set_tracer()
+
+    return _enabled
+
+
+def span(name, context=None, attributes=None):
+    """Create a span using the current Tracer
+
+    See ``Tracer.span`` for details.
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+
+    return _tracer.span(name, context=context, attributes=attributes)
+
+
+def inject_context(metadata):
+    """Add the current trace context to Request metadata
+
+    Args:
+        metadata: The metadata dictionary, which will be modified
+
+    Returns:
+        The metadata dictionary
+    """
+    if _enabled:
+        carrier = _tracer.inject()
+
+        if carrier:
+            metadata[METADATA_KEY] = carrier
+
+    return metadata
+
+
+def extract_context(headers=None, metadata=None):
+    """Get the parent trace context for a Request
+
+    Args:
+        headers: AMQP headers of the message the Request was received in
+        metadata: The Request metadata
+
+    Returns:
+        A context that can be passed to ``span``, or None if there's no trace context
+    """
+    if not _enabled:
+        return None
+
+    headers = headers or {}
+
+    # Context can either be nested like in the metadata or be top-level headers
+    carriers = (
+        headers.get(METADATA_KEY),
+        headers if "traceparent" in headers else None,
+        (metadata or {}).get(METADATA_KEY),
+    )
+
+    for carrier in carriers:
+        if carrier:
+            return _tracer.extract(carrier)
+
+    return None
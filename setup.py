@@ -47,6 +47,8 @@ setup(
         ':python_version=="2.7"': ["futures", "funcsigs", "pathlib"],
         ':python_version<"3.4"': ["enum34"],
         ':python_version<"3.5"': ["typing"],
+        "events": ["websocket-client"],
+        "tracing": ["opentelemetry-api"],
     },
     classifiers=[
         "Intended Audience :: Developers",
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+
+import pytest
+from mock import Mock
+
+import brewtils.plugin
+from brewtils.async_request_handling import AsyncRequestProcessor
+from brewtils.decorators import command
+from brewtils.models import Request
+from brewtils.schema_parser import SchemaParser
+
+
+class Target(object):
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def echo(self, message):
+        return message
+
+    async def sleep(self, seconds):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+
+        await asyncio.sleep(seconds)
+
+        self.running -= 1
+        return brewtils.plugin.request_context.current_request.id
+
+    @command(max_concurrent=2)
+    async def limited(self, seconds):
+        return await self.sleep(seconds)
+
+    async def fail(self):
+        raise ValueError("Oh no")
+
+    def sync_echo(self, message):
+        return {
+            "message": message,
+            "thread": threading.current_thread().name,
+            "request": brewtils.plugin.request_context.current_request.id,
+        }
+
+
+@pytest.fixture
+def target():
+    return Target()
+
+
+@pytest.fixture
+def updater():
+    updates = []
+
+    updater = Mock()
+    updater.update_request.side_effect = lambda request, headers: updates.append(
+        (request.id, request.status)
+    )
+    updater.updates = updates
+
+    return updater
+
+
+@pytest.fixture
+def processor(target, updater):
+    processor = AsyncRequestProcessor(
+        target, updater, Mock(), max_concurrent=10, max_workers=2
+    )
+    processor.startup()
+
+    yield processor
+
+    processor.shutdown()
+
+
+def _message(command, request_id="1", status="CREATED", **parameters):
+    return SchemaParser.serialize_request(
+        Request(
+            id=request_id,
+            system="system",
+            command=command,
+            parameters=parameters,
+            status=status,
+            output_type="STRING",
+        ),
+        to_string=True,
+    )
+
+
+class TestProcessing(object):
+    def test_async_command(self, processor, updater):
+        processor.on_message_received(_message("echo", message="hi"), {}).result(5)
+
+        assert updater.updates == [("1", "IN_PROGRESS"), ("1", "SUCCESS")]
+        assert updater.update_request.call_args[0][0].output == "hi"
+
+    def test_async_command_error(self, processor, updater):
+        processor.on_message_received(_message("fail"), {}).result(5)
+
+        request = updater.update_request.call_args[0][0]
+        assert request.status == "ERROR"
+        assert request.error_class == "ValueError"
+
+    def test_sync_command(self, processor, updater):
+        future = processor.on_message_received(_message("sync_echo", message="hi"), {})
+        future.result(5)
+
+        request = updater.update_request.call_args[0][0]
+        assert request.status == "SUCCESS"
+        assert '"request": "1"' in request.output
+        assert "AsyncRequestProcessor" not in request.output
+
+    def test_missing_command(self, processor, updater):
+        processor.on_message_received(_message("not_a_command"), {}).result(5)
+
+        request = updater.update_request.call_args[0][0]
+        assert request.status == "ERROR"
+        assert request.error_class == "RequestProcessingError"
+
+    def test_completed(self, processor, updater):
+        processor.on_message_received(_message("echo", status="SUCCESS"), {}).result(5)
+
+        assert updater.updates == [("1", "SUCCESS")]
+
+    def test_update_error(self, processor, updater):
+        updater.update_request.side_effect = ValueError
+
+        future = processor.on_message_received(_message("echo", message="hi"), {})
+        with pytest.raises(ValueError):
+            future.result(5)
+
+
+class TestConcurrency(object):
+    def test_many_requests(self, processor, target):
+        processor._max_concurrent = 200
+
+        start = time.time()
+        futures = [
+            processor.on_message_received(
+                _message("sleep", request_id=str(i), seconds=0.2), {}
+            )
+            for i in range(200)
+        ]
+        for future in futures:
+            future.result(5)
+
+        # Far more concurrent requests than threads
+        assert target.max_running == 200
+        assert time.time() - start < 2
+
+    def test_max_concurrent(self, processor, target):
+        futures = [
+            processor.on_message_received(
+                _message("sleep", request_id=str(i), seconds=0.01), {}
+            )
+            for i in range(30)
+        ]
+        for future in futures:
+            future.result(5)
+
+        assert target.max_running == 10
+
+    def test_command_max_concurrent(self, processor, target):
+        futures = [
+            processor.on_message_received(
+                _message("limited", request_id=str(i), seconds=0.01), {}
+            )
+            for i in range(10)
+        ]
+        for future in futures:
+            future.result(5)
+
+        assert target.max_running == 2
+
+    def test_command_max_concurrent_deferred(self, processor):
+        futures = [
+            processor.on_message_received(
+                _message("limited", request_id=str(i), seconds=0.01), {}
+            )
+            for i in range(50)
+        ]
+        for future in futures:
+            future.result(5)
+
+        # Bounded by the command's limit, however many messages are waiting
+        counts = [c[0][0] for c in processor.consumer.set_deferred.call_args_list]
+        assert max(counts) == 2
+        assert counts[-1] == 0
+        assert processor._command_waiting["limited"] == 0
+
+    def test_request_context(self, processor, updater):
+        futures = [
+            processor.on_message_received(
+                _message("sleep", request_id=str(i), seconds=0.05), {}
+            )
+            for i in range(20)
+        ]
+        for future in futures:
+            future.result(5)
+
+        for args, _ in updater.update_request.call_args_list:
+            request = args[0]
+            if request.status == "SUCCESS":
+                assert request.output == request.id
+
+
+def test_adaptive_prefetch(target, updater):
+    processor = AsyncRequestProcessor(
+        target, updater, Mock(), max_concurrent=50, prefetch_bounds=(1, 20)
+    )
+    processor.startup()
+
+    try:
+        processor.consumer.set_prefetch.assert_called_once_with(20)
+
+        processor._prefetch_tuner._interval = 0
+        processor.on_message_received(_message("sleep", seconds=0.2), {}).result(5)
+
+        # 50 slots and a fairly slow command, so the prefetch stays at the maximum
+        assert processor.consumer.set_prefetch.call_count == 1
+        assert processor._prefetch_tuner._in_flight == 0
+    finally:
+        processor.shutdown()
+
+
+def test_shutdown_waits(target, updater):
+    processor = AsyncRequestProcessor(target, updater, Mock())
+    processor.startup()
+
+    future = processor.on_message_received(_message("sleep", seconds=0.2), {})
+    processor.shutdown()
+
+    assert future.done()
+    assert not processor._loop_thread.is_alive()
@@ -7,6 +7,7 @@ import warnings
 
 import pytest
 from mock import Mock
+from yapconf.exceptions import YapconfValueError
 
 from brewtils.config import (
     _translate_kwargs,
@@ -34,6 +35,7 @@ def params():
         "access_token": None,
         "refresh_token": None,
         "client_timeout": -1.0,
+        "conditional_get": False,
         "proxy": "",
     }
 
@@ -159,6 +161,22 @@ class TestLoadConfig(object):
 
             assert load_config(cli_args=cli_args).metadata == '{"foo": "bar"}'
 
+    class TestCommandPools(object):
+        @pytest.fixture(autouse=True)
+        def host_env(self):
+            os.environ["BG_HOST"] = "the_host"
+
+        def test_valid(self):
+            config = load_config(command_pools='{"reports": 2}')
+            assert config.command_pools == '{"reports": 2}'
+
+        @pytest.mark.parametrize(
+            "pools", ['{"reports": 0}', '{"reports": true}', '{"reports": "2"}', "[]"]
+        )
+        def test_invalid(self, pools):
+            with pytest.raises(YapconfValueError):
+                load_config(command_pools=pools)
+
 
 class TestTranslateKwargs(object):
     def test_no_translation(self, params):
@@ -27,7 +27,7 @@ from brewtils.decorators import (
     register,
     system,
 )
-from brewtils.errors import PluginParamError
+from brewtils.errors import PluginParamError, PluginValidationError
 from brewtils.models import Command, Parameter
 from brewtils.test.comparable import assert_command_equal, assert_parameter_equal
 
@@ -439,6 +439,37 @@ class TestCommand(object):
         assert cmd._command.description == "desc2"
         assert cmd._command.output_type == "STRING"  # This is the default
 
+    @pytest.mark.parametrize("executor", [None, "thread", "process"])
+    def test_executor(self, executor):
+        @command(executor=executor)
+        def cmd(foo):
+            return foo
+
+        assert cmd._executor == executor
+
+    def test_limits(self):
+        @command(max_concurrent=2, pool="reports")
+        def cmd(foo):
+            return foo
+
+        assert cmd._max_concurrent == 2
+        assert cmd._pool == "reports"
+
+    @pytest.mark.parametrize("max_concurrent", [0, -1, "2", True])
+    def test_bad_max_concurrent(self, max_concurrent):
+        with pytest.raises(PluginValidationError):
+
+            @command(max_concurrent=max_concurrent)
+            def cmd(foo):
+                return foo
+
+    def test_bad_executor(self):
+        with pytest.raises(PluginValidationError):
+
+            @command(executor="fiber")
+            def cmd(foo):
+                return foo
+
     def test_parameter_equivalence(self, basic_param, param):
         @parameter(**basic_param)
         def expected_method(foo):
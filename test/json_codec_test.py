@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import importlib
+import json
+import logging
+import sys
+
+import pytest
+from mock import Mock
+
+from brewtils import json_codec
+from brewtils.schema_parser import SchemaParser
+from brewtils.test.comparable import assert_request_equal
+
+
+def _installed(name):
+    try:
+        importlib.import_module(name)
+        return True
+    except ImportError:
+        return False
+
+
+INSTALLED = [name for name in json_codec.BACKENDS if _installed(name)]
+
+
+@pytest.fixture(autouse=True)
+def reset_backend():
+    yield
+    json_codec.set_backend()
+
+
+class TestSetBackend(object):
+    def test_default(self):
+        assert json_codec.get_backend() == json_codec.DEFAULT_BACKEND
+
+    @pytest.mark.parametrize("name", INSTALLED)
+    def test_installed(self, name):
+        assert json_codec.set_backend(name) == name
+        assert json_codec.get_backend() == name
+
+    def test_auto(self):
+        assert json_codec.set_backend("auto") == INSTALLED[0]
+
+    def test_not_installed(self, monkeypatch, caplog):
+        def _missing():
+            raise ImportError
+
+        monkeypatch.setitem(json_codec._loaders, "orjson", _missing)
+
+        with caplog.at_level(logging.WARNING):
+            assert json_codec.set_backend("orjson") == "json"
+
+        assert json_codec.get_backend() == "json"
+        assert len(caplog.records) == 1
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            json_codec.set_backend("not_a_backend")
+
+        assert json_codec.get_backend() == json_codec.DEFAULT_BACKEND
+
+
+@pytest.mark.parametrize("name", INSTALLED)
+class TestCodec(object):
+    def test_round_trip(self, name):
+        json_codec.set_backend(name)
+
+        data = {"a": [1, 2.5, None, True], "b": {"c": "d/e"}, "f": "ü"}
+        assert json_codec.loads(json_codec.dumps(data)) == data
+
+    def test_invalid(self, name):
+        json_codec.set_backend(name)
+
+        with pytest.raises(ValueError):
+            json_codec.loads("{not json")
+
+    @pytest.mark.parametrize("obj", [object(), {"a": {1, 2}}])
+    def test_dumps_unserializable(self, name, obj):
+        json_codec.set_backend(name)
+
+        with pytest.raises((TypeError, ValueError)):
+            json_codec.dumps(obj)
+
+    def test_extra_args(self, name):
+        json_codec.set_backend(name)
+
+        assert json_codec.dumps({"b": 1, "a": 2}, sort_keys=True) == json.dumps(
+            {"a": 2, "b": 1}
+        )
+
+    def test_schema_round_trip(self, name, bg_request):
+        json_codec.set_backend(name)
+
+        serialized = SchemaParser.serialize_request(bg_request, to_string=True)
+        assert_request_equal(
+            SchemaParser.parse_request(serialized, from_string=True), bg_request
+        )
+
+
+class TestEncodeErrors(object):
+    def test_overflow(self, monkeypatch):
+        # ujson raises OverflowError for integers larger than 64 bits
+        ujson = Mock(dumps=Mock(side_effect=OverflowError("int too big to convert")))
+        monkeypatch.setitem(sys.modules, "ujson", ujson)
+        json_codec.set_backend("ujson")
+
+        with pytest.raises(ValueError):
+            json_codec.dumps({"a": 2**70})
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import requests
+
+from brewtils import metrics
+
+
+@pytest.fixture
+def sink():
+    sink = metrics.set_sink(metrics.InMemoryMetricsSink(buckets=(0.1, 1)))
+    yield sink
+    metrics.set_sink()
+
+
+class TestSetSink(object):
+    def test_default(self):
+        assert isinstance(metrics.get_sink(), metrics.NoopMetricsSink)
+
+    def test_set(self, sink):
+        assert metrics.get_sink() is sink
+
+    def test_reset(self, sink):
+        metrics.set_sink()
+        assert isinstance(metrics.get_sink(), metrics.NoopMetricsSink)
+
+    def test_noop(self):
+        # Nothing to check, just make sure nothing blows up
+        metrics.increment("counter", labels={"a": "b"})
+        metrics.observe("histogram", 1.0)
+        metrics.set_gauge("gauge", 1)
+        metrics.add_gauge("gauge", 1)
+
+        with metrics.timed("stage", "command"):
+            pass
+
+
+class TestInMemoryMetricsSink(object):
+    def test_counter(self, sink):
+        metrics.increment("counter", labels={"command": "a"})
+        metrics.increment("counter", amount=2, labels={"command": "a"})
+        metrics.increment("counter", labels={"command": "b"})
+
+        assert sink.get("counter", labels={"command": "a"}) == 3
+        assert sink.get("counter", labels={"command": "b"}) == 1
+        assert sink.get("counter") == 0
+
+    def test_gauge(self, sink):
+        metrics.set_gauge("gauge", 5)
+        metrics.add_gauge("gauge", -2)
+
+        assert sink.get("gauge") == 3
+
+    def test_histogram(self, sink):
+        metrics.observe("histogram", 0.05)
+        metrics.observe("histogram", 0.5)
+
+        assert sink.get_histogram("histogram") == (2, 0.55)
+        assert sink.get_histogram("missing") == (0, 0.0)
+
+    def test_timed(self, sink):
+        with pytest.raises(ValueError):
+            with metrics.timed("invoke", "command"):
+                raise ValueError()
+
+        labels = {"stage": "invoke", "command": "command"}
+        assert sink.get_histogram("brewtils_request_stage_seconds", labels)[0] == 1
+
+    def test_render_none_label(self, sink):
+        metrics.increment("requests_total", labels={"command": None})
+        metrics.increment("requests_total", labels={"command": "say"})
+        metrics.observe("seconds", 0.1, labels={"command": None})
+        metrics.observe("seconds", 0.1, labels={"command": "say"})
+
+        rendered = sink.render()
+
+        assert 'requests_total{command=""} 1' in rendered
+        assert 'requests_total{command="say"} 1' in rendered
+        assert sink.get("requests_total", labels={"command": None}) == 1
+
+    def test_render(self, sink):
+        metrics.increment("requests_total", labels={"command": 'say "hi"'})
+        metrics.set_gauge("depth", 2)
+        metrics.observe("seconds", 0.1)
+        metrics.observe("seconds", 0.5)
+        metrics.observe("seconds", 5)
+
+        assert sink.render() == "\n".join(
+            [
+                "# TYPE requests_total counter",
+                'requests_total{command="say \\"hi\\""} 1',
+                "# TYPE depth gauge",
+                "depth 2",
+                "# TYPE seconds histogram",
+                'seconds_bucket{le="0.1"} 1',
+                'seconds_bucket{le="1"} 2',
+                'seconds_bucket{le="+Inf"} 3',
+                "seconds_sum 5.6",
+                "seconds_count 3",
+                "",
+            ]
+        )
+
+
+class TestMetricsServer(object):
+    @pytest.fixture
+    def server(self, sink):
+        server = metrics.MetricsServer(sink)
+        server.start()
+        yield server
+        server.stop()
+
+    def test_metrics(self, server, sink):
+        metrics.increment("requests_total")
+
+        response = requests.get("http://127.0.0.1:%d/metrics" % server.port)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert "requests_total 1" in response.text
+
+    def test_not_found(self, server):
+        response = requests.get("http://127.0.0.1:%d/other" % server.port)
+        assert response.status_code == 404
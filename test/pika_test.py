@@ -1,17 +1,36 @@
 # -*- coding: utf-8 -*-
 import ssl
+import threading
 import warnings
 from concurrent.futures import Future
 
 import pika.spec
 import pytest
 from mock import ANY, MagicMock, Mock, PropertyMock, call
-from pika.exceptions import AMQPError, ChannelClosedByBroker, ConnectionClosedByBroker
+from pika.exceptions import (
+    AMQPError,
+    ChannelClosedByBroker,
+    ConnectionClosedByBroker,
+    NackError,
+    StreamLostError,
+    UnroutableError,
+)
 from pytest_lazyfixture import lazy_fixture
 
 import brewtils.pika
-from brewtils.errors import DiscardMessageException, RepublishRequestException
-from brewtils.pika import PikaClient, PikaConsumer, TransientPikaClient
+from brewtils import metrics
+from brewtils.errors import (
+    DiscardMessageException,
+    RepublishRequestException,
+    RequestPublishException,
+)
+from brewtils.pika import (
+    PikaClient,
+    PikaConsumer,
+    PooledPikaClient,
+    TransientPikaClient,
+    _AckBatcher,
+)
 
 host = "localhost"
 port = 5672
@@ -206,6 +225,252 @@ class TestTransientPikaClient(object):
         )
 
 
+class FakeBroker(object):
+    """Stands in for BlockingConnection, confirming publishes when events are processed"""
+
+    def __init__(self):
+        self.connections = []
+        self.nack = False
+        self.confirm = True
+        self.unroutable = False
+
+    def __call__(self, params):
+        connection = Mock(name="connection", is_open=True)
+        channel = Mock(name="channel", is_open=True)
+        connection.channel.return_value = channel
+
+        state = {"ack_nack": None, "published": 0, "returns": None, "mandatory": []}
+
+        def confirm_delivery(ack_nack_callback, callback):
+            state["ack_nack"] = ack_nack_callback
+            callback(None)
+
+        def basic_publish(**kwargs):
+            state["published"] += 1
+            if kwargs.get("mandatory"):
+                state["mandatory"].append(kwargs["body"])
+
+        def process_data_events(time_limit=None):
+            # Like RabbitMQ, returns are sent before the confirmations
+            mandatory, state["mandatory"] = state["mandatory"], []
+            if self.unroutable:
+                for body in mandatory:
+                    state["returns"](channel, Mock(), Mock(), body)
+
+            if self.confirm and state["published"]:
+                method_class = (
+                    pika.spec.Basic.Nack if self.nack else pika.spec.Basic.Ack
+                )
+                state["ack_nack"](
+                    Mock(method=method_class(state["published"], multiple=True))
+                )
+
+        channel._impl.confirm_delivery.side_effect = confirm_delivery
+        channel.add_on_return_callback.side_effect = lambda cb: state.update(returns=cb)
+        channel.basic_publish.side_effect = basic_publish
+        connection.process_data_events.side_effect = process_data_events
+        connection.state = state
+
+        self.connections.append(connection)
+        return connection
+
+
+class TestPooledPikaClient(object):
+    @pytest.fixture
+    def broker(self, monkeypatch):
+        broker = FakeBroker()
+        monkeypatch.setattr(brewtils.pika, "BlockingConnection", broker)
+        return broker
+
+    @pytest.fixture
+    def client(self, broker):
+        return PooledPikaClient(
+            host=host, port=port, user=user, password=password, confirm_timeout=0.1
+        )
+
+    def test_is_alive(self, client, broker):
+        assert client.is_alive() is True
+
+    def test_is_alive_exception(self, client, monkeypatch):
+        monkeypatch.setattr(
+            brewtils.pika, "BlockingConnection", Mock(side_effect=AMQPError)
+        )
+
+        assert client.is_alive() is False
+        assert client._size == 0
+
+    def test_declare_exchange(self, client, broker):
+        client.declare_exchange()
+        assert broker.connections[0].channel().exchange_declare.called is True
+
+    def test_setup_queue(self, client, broker):
+        queue_args = {"test": "args"}
+
+        assert client.setup_queue("queue", queue_args, ["key1", "key2"]) == {
+            "name": "queue",
+            "args": queue_args,
+        }
+        channel = broker.connections[0].channel()
+        channel.queue_declare.assert_called_once_with("queue", **queue_args)
+        assert channel.queue_bind.call_count == 2
+
+    def test_reuse(self, client, broker):
+        for _ in range(5):
+            client.publish("message", routing_key="key")
+        client.setup_queue("queue", {}, ["key"])
+
+        assert len(broker.connections) == 1
+        assert broker.connections[0].channel().basic_publish.call_count == 5
+
+    def test_publish(self, client, broker):
+        client.publish("message", routing_key="key", mandatory=True, priority=1)
+
+        broker.connections[0].channel().basic_publish.assert_called_once_with(
+            exchange="beer_garden",
+            routing_key="key",
+            body="message",
+            properties=ANY,
+            mandatory=True,
+        )
+
+    def test_publish_confirm(self, client, broker):
+        client.publish("message", routing_key="key", confirm=True)
+        assert broker.connections[0].process_data_events.called is True
+
+    def test_publish_batch(self, client, broker):
+        client.publish_batch([("message", {"routing_key": "key"})] * 10)
+
+        connection = broker.connections[0]
+        assert connection.channel().basic_publish.call_count == 10
+        assert connection.process_data_events.call_count == 1
+
+    def test_nack(self, client, broker):
+        broker.nack = True
+
+        with pytest.raises(NackError) as ex:
+            client.publish_batch([("message", {"routing_key": "key"})] * 2)
+
+        assert sorted(ex.value.messages) == [1, 2]
+
+    def test_unroutable(self, client, broker):
+        broker.unroutable = True
+
+        with pytest.raises(UnroutableError) as ex:
+            client.publish("message", routing_key="key", confirm=True, mandatory=True)
+
+        assert [m.body for m in ex.value.messages] == ["message"]
+
+    def test_untracked_return(self, client, broker):
+        broker.unroutable = True
+        client.publish("untracked", routing_key="key", mandatory=True)
+
+        broker.unroutable = False
+        client.publish("message", routing_key="key", confirm=True, mandatory=True)
+
+        pooled = client._acquire()
+        assert pooled._returned == []
+        assert pooled._untracked == set()
+
+    def test_untracked_return_not_stored(self, client, broker):
+        broker.unroutable = True
+        for _ in range(5):
+            client.publish("untracked", routing_key="key", mandatory=True)
+
+        pooled = client._acquire()
+        pooled.connection.process_data_events()
+        assert pooled._returned == []
+
+    def test_confirm_timeout(self, client, broker):
+        broker.confirm = False
+
+        with pytest.raises(RequestPublishException):
+            client.publish("message", routing_key="key", confirm=True)
+
+        # The connection is still usable afterwards
+        broker.confirm = True
+        client.publish("message", routing_key="key", confirm=True)
+        assert len(broker.connections) == 1
+
+    def test_confirm_timeout_resets(self, client, broker):
+        client.is_alive()
+        pooled = client._acquire()
+        pooled.publish("message", "beer_garden", None, "key", False, track=True)
+        pooled._nacked.append(1)
+        pooled._returned.append(Mock())
+        broker.confirm = False
+
+        with pytest.raises(RequestPublishException):
+            pooled.wait_for_confirms(0.01)
+
+        assert pooled._pending == set()
+        assert pooled._nacked == []
+        assert pooled._returned == []
+
+    def test_reconnect(self, client, broker):
+        client.is_alive()
+        broker.connections[0].channel().basic_publish.side_effect = StreamLostError
+
+        client.publish("message", routing_key="key")
+
+        assert len(broker.connections) == 2
+        assert broker.connections[0].close.called is True
+        assert broker.connections[1].channel().basic_publish.call_count == 1
+        assert client._size == 1
+
+    def test_reconnect_fails(self, client, monkeypatch):
+        monkeypatch.setattr(
+            brewtils.pika, "BlockingConnection", Mock(side_effect=StreamLostError)
+        )
+
+        with pytest.raises(StreamLostError):
+            client.publish("message", routing_key="key")
+        assert client._size == 0
+
+    def test_closed_connection_replaced(self, client, broker):
+        client.is_alive()
+        broker.connections[0].is_open = False
+
+        client.publish("message", routing_key="key")
+        assert len(broker.connections) == 2
+
+    def test_channel_error(self, client, broker):
+        client.is_alive()
+        channel = broker.connections[0].channel()
+
+        def _declare(*args, **kwargs):
+            channel.is_open = False
+            raise ChannelClosedByBroker(406, "PRECONDITION_FAILED")
+
+        channel.queue_declare.side_effect = _declare
+
+        with pytest.raises(ChannelClosedByBroker):
+            client.setup_queue("queue", {}, [])
+
+        assert client._size == 0
+        assert len(broker.connections) == 1
+
+    def test_pool_size(self, client, broker):
+        client._pool_size = 2
+        acquired = [client._acquire(), client._acquire()]
+
+        thread = threading.Thread(target=client.is_alive)
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+
+        client._release(acquired[0])
+        thread.join(1)
+        assert not thread.is_alive()
+        assert len(broker.connections) == 2
+
+    def test_close(self, client, broker):
+        client.is_alive()
+        client.close()
+
+        assert broker.connections[0].close.called is True
+        assert client._size == 0
+
+
 class TestPikaConsumer:
     @pytest.fixture
     def callback_future(self):
@@ -306,6 +571,36 @@ class TestPikaConsumer:
             basic_deliver.delivery_tag, requeue=requeue
         )
 
+    def test_set_prefetch(self, consumer, connection, channel):
+        consumer._connection = connection
+
+        consumer.set_prefetch(10)
+        assert consumer._max_concurrent == 10
+
+        connection.ioloop.add_callback_threadsafe.call_args[0][0]()
+        channel.basic_qos.assert_called_once_with(prefetch_count=10)
+
+    def test_set_prefetch_not_connected(self, consumer, channel):
+        consumer.set_prefetch(10)
+        consumer.start_consuming()
+
+        channel.basic_qos.assert_called_once_with(prefetch_count=10)
+
+    def test_set_deferred(self, consumer, connection, channel):
+        consumer._connection = connection
+        consumer.set_prefetch(10)
+
+        consumer.set_deferred(3)
+        connection.ioloop.add_callback_threadsafe.call_args[0][0]()
+        channel.basic_qos.assert_called_once_with(prefetch_count=13)
+
+    def test_set_deferred_not_connected(self, consumer, channel):
+        consumer.set_prefetch(10)
+        consumer.set_deferred(2)
+        consumer.start_consuming()
+
+        channel.basic_qos.assert_called_once_with(prefetch_count=12)
+
     def test_on_message_callback_complete(self, consumer, connection):
         consumer._connection = connection
 
@@ -329,25 +624,28 @@ class TestPikaConsumer:
             channel.basic_ack.assert_called_once_with(basic_deliver.delivery_tag)
             assert panic_event.set.called is True
 
+        @pytest.fixture
+        def publish_channel(self, consumer):
+            publish_channel = Mock()
+            consumer._publish_channel = publish_channel
+            return publish_channel
+
+        @staticmethod
+        def _confirm(consumer, method, delivery_tag, multiple=False):
+            consumer.on_republish_confirmed(
+                Mock(method=method(delivery_tag=delivery_tag, multiple=multiple))
+            )
+
         def test_republish(
-            self, monkeypatch, consumer, channel, callback_future, bg_request
+            self, consumer, channel, publish_channel, callback_future, bg_request
         ):
             basic_deliver = Mock()
 
-            blocking_connection = MagicMock()
-            publish_channel = Mock()
-            publish_connection = MagicMock()
-            publish_connection.channel.return_value = publish_channel
-            blocking_connection.return_value.__enter__.return_value = publish_connection
-            monkeypatch.setattr(
-                brewtils.pika, "BlockingConnection", blocking_connection
-            )
-
             callback_future.set_exception(RepublishRequestException(bg_request, {}))
 
             consumer.finish_message(basic_deliver, callback_future)
-            channel.basic_ack.assert_called_once_with(basic_deliver.delivery_tag)
             assert publish_channel.basic_publish.called is True
+            assert channel.basic_ack.called is False
 
             publish_args = publish_channel.basic_publish.call_args[1]
             assert publish_args["exchange"] == basic_deliver.exchange
@@ -360,12 +658,63 @@ class TestPikaConsumer:
             assert publish_props.priority == 1
             assert publish_props.headers["request_id"] == bg_request.id
 
+            self._confirm(consumer, pika.spec.Basic.Ack, 1)
+            channel.basic_ack.assert_called_once_with(basic_deliver.delivery_tag)
+            assert not consumer._republishing
+
+        def test_republish_multiple(
+            self, consumer, channel, publish_channel, bg_request
+        ):
+            for tag in range(1, 4):
+                future = Future()
+                future.set_exception(RepublishRequestException(bg_request, {}))
+                consumer.finish_message(Mock(delivery_tag=tag * 10), future)
+
+            self._confirm(consumer, pika.spec.Basic.Ack, 2, multiple=True)
+            assert channel.basic_ack.call_args_list == [call(10), call(20)]
+
+            self._confirm(consumer, pika.spec.Basic.Ack, 3)
+            assert channel.basic_ack.call_args_list == [call(10), call(20), call(30)]
+
+        def test_republish_nack(
+            self, consumer, channel, publish_channel, panic_event, callback_future
+        ):
+            callback_future.set_exception(RepublishRequestException(Mock(), {}))
+            consumer.finish_message(Mock(), callback_future)
+
+            self._confirm(consumer, pika.spec.Basic.Nack, 1)
+            assert channel.basic_ack.called is False
+            assert panic_event.set.called is True
+
+        def test_republish_no_publish_channel(
+            self, consumer, channel, callback_future, bg_request
+        ):
+            basic_deliver = Mock()
+
+            callback_future.set_exception(RepublishRequestException(bg_request, {}))
+            consumer.finish_message(basic_deliver, callback_future)
+
+            assert channel.basic_publish.called is True
+            channel.basic_ack.assert_called_once_with(basic_deliver.delivery_tag)
+
+        def test_republish_metrics(
+            self, consumer, publish_channel, callback_future, bg_request
+        ):
+            sink = metrics.set_sink(metrics.InMemoryMetricsSink())
+
+            try:
+                callback_future.set_exception(RepublishRequestException(bg_request, {}))
+                consumer.finish_message(Mock(), callback_future)
+
+                labels = {"command": bg_request.command}
+                assert sink.get("brewtils_requests_republished_total", labels) == 1
+            finally:
+                metrics.set_sink()
+
         def test_republish_failure(
-            self, monkeypatch, consumer, callback_future, panic_event
+            self, consumer, publish_channel, callback_future, panic_event
         ):
-            monkeypatch.setattr(
-                brewtils.pika, "BlockingConnection", Mock(side_effect=ValueError)
-            )
+            publish_channel.basic_publish.side_effect = ValueError
 
             callback_future.set_exception(RepublishRequestException(Mock(), {}))
             consumer.finish_message(Mock(), callback_future)
@@ -392,6 +741,19 @@ class TestPikaConsumer:
         consumer.on_connection_open(connection)
         assert connection.channel.called is True
 
+    def test_on_publish_channel_open(self, consumer):
+        fake_channel = Mock()
+
+        consumer.on_publish_channel_open(fake_channel)
+        assert consumer._publish_channel is None
+        fake_channel.add_on_close_callback.assert_called_with(
+            consumer.on_channel_closed
+        )
+
+        # Only used once the broker has confirmed the channel is in confirm mode
+        fake_channel.confirm_delivery.call_args[1]["callback"](Mock())
+        assert consumer._publish_channel == fake_channel
+
     @pytest.mark.parametrize(
         "code,text", [(200, "normal shutdown"), (320, "broker initiated")]
     )
@@ -400,6 +762,17 @@ class TestPikaConsumer:
         consumer.on_connection_closed(connection, ConnectionClosedByBroker(code, text))
         assert connection.ioloop.stop.called is True
 
+    def test_on_connection_closed_resets_publish(self, consumer, connection):
+        consumer._connection = connection
+        consumer._publish_channel = Mock()
+        consumer._publish_tag = 1
+        consumer._republishing[1] = 10
+
+        consumer.on_connection_closed(connection)
+        assert consumer._publish_channel is None
+        assert consumer._publish_tag == 0
+        assert not consumer._republishing
+
     def test_open_channel(self, consumer, connection):
         consumer._connection = connection
         consumer.open_channel()
@@ -444,6 +817,142 @@ class TestPikaConsumer:
         consumer.on_consumer_cancelled(Mock())
         assert connection.close.called is True
 
+    class TestAckBatching(object):
+        @pytest.fixture
+        def batching(self, consumer, connection):
+            consumer._connection = connection
+            consumer._ack_batch_size = 3
+            return consumer
+
+        @staticmethod
+        def _finish(consumer, delivery_tag, exception=None):
+            future = Future()
+            if exception:
+                future.set_exception(exception)
+            else:
+                future.set_result(None)
+
+            consumer.finish_message(Mock(delivery_tag=delivery_tag), future)
+
+        @staticmethod
+        def _deliver(consumer, *delivery_tags):
+            for delivery_tag in delivery_tags:
+                consumer.on_message(
+                    Mock(), Mock(delivery_tag=delivery_tag), Mock(), "message"
+                )
+
+        def test_count_threshold(self, batching, channel, connection):
+            self._deliver(batching, 1, 2, 3)
+
+            self._finish(batching, 1)
+            self._finish(batching, 2)
+            assert channel.basic_ack.called is False
+            assert connection.ioloop.call_later.call_count == 1
+
+            self._finish(batching, 3)
+            channel.basic_ack.assert_called_once_with(3, multiple=True)
+            assert connection.ioloop.remove_timeout.called is True
+
+        def test_timer(self, batching, channel, connection):
+            self._deliver(batching, 1, 2)
+            self._finish(batching, 1)
+            self._finish(batching, 2)
+
+            timer_callback = connection.ioloop.call_later.call_args[0][1]
+            timer_callback()
+            channel.basic_ack.assert_called_once_with(2, multiple=True)
+            assert batching._ack_timer is None
+
+        def test_timer_error(self, batching, channel, connection, panic_event):
+            channel.basic_ack.side_effect = ValueError
+
+            self._deliver(batching, 1)
+            self._finish(batching, 1)
+
+            connection.ioloop.call_later.call_args[0][1]()
+            assert panic_event.set.called is True
+
+        def test_out_of_order(self, batching, channel):
+            self._deliver(batching, 1, 2, 3, 4)
+
+            # 1 is still being processed, so 2 and 3 can't be acked with a multiple ack
+            self._finish(batching, 2)
+            self._finish(batching, 3)
+            batching.flush_acks()
+            assert channel.basic_ack.call_args_list == [call(2), call(3)]
+
+            self._finish(batching, 4)
+            self._finish(batching, 1)
+            batching.flush_acks()
+            assert channel.basic_ack.call_args_list[2:] == [call(4, multiple=True)]
+
+        def test_count_threshold_gap(self, batching, channel, connection):
+            self._deliver(batching, 1, 2, 3, 4)
+
+            # Can't ack 2-4 together while 1 is in flight, so wait for the timer
+            for delivery_tag in (2, 3, 4):
+                self._finish(batching, delivery_tag)
+            assert channel.basic_ack.called is False
+            assert batching._ack_timer is not None
+
+            self._finish(batching, 1)
+            channel.basic_ack.assert_called_once_with(4, multiple=True)
+            assert batching._ack_timer is None
+
+        def test_nack(self, batching, channel):
+            self._deliver(batching, 1, 2, 3)
+
+            self._finish(batching, 2, exception=DiscardMessageException())
+            channel.basic_nack.assert_called_once_with(2, requeue=False)
+
+            self._finish(batching, 1)
+            self._finish(batching, 3)
+            batching.flush_acks()
+            channel.basic_ack.assert_called_once_with(3, multiple=True)
+
+        def test_schedule_failure(self, batching, channel, callback):
+            callback.side_effect = ValueError
+            self._deliver(batching, 1)
+            channel.basic_nack.assert_called_once_with(1, requeue=True)
+
+            callback.side_effect = None
+            self._deliver(batching, 2)
+            self._finish(batching, 2)
+            batching.flush_acks()
+            channel.basic_ack.assert_called_once_with(2, multiple=True)
+
+        def test_callback_complete(self, batching, connection, channel):
+            self._deliver(batching, 1, 2)
+
+            for delivery_tag in (1, 2):
+                future = Future()
+                future.set_result(None)
+                batching.on_message_callback_complete(
+                    Mock(delivery_tag=delivery_tag), future
+                )
+
+            # Both messages are finished in a single ioloop callback
+            assert connection.ioloop.add_callback_threadsafe.call_count == 1
+
+            connection.ioloop.add_callback_threadsafe.call_args[0][0]()
+            batching.flush_acks()
+            channel.basic_ack.assert_called_once_with(2, multiple=True)
+
+        def test_stop_flushes(self, batching, connection, channel):
+            self._deliver(batching, 1)
+            self._finish(batching, 1)
+
+            batching.stop()
+            connection.ioloop.add_callback_threadsafe.call_args[0][0]()
+            channel.basic_ack.assert_called_once_with(1, multiple=True)
+            assert connection.close.called is True
+
+        def test_channel_reset(self, batching):
+            self._deliver(batching, 1)
+
+            batching.on_channel_open(Mock())
+            assert len(batching._acks._outstanding) == 0
+
     class TestConnectionFailure(object):
         """Test that reconnect logic works correctly"""
 
@@ -472,3 +981,48 @@ class TestPikaConsumer:
             consumer.run()
             panic_event.wait.assert_has_calls([call(1), call(2)])
             assert consumer._reconnect_attempt == 2
+
+
+class TestAckBatcher(object):
+    @pytest.fixture
+    def batcher(self):
+        batcher = _AckBatcher()
+        for tag in range(1, 6):
+            batcher.delivered(tag)
+        return batcher
+
+    def test_contiguous(self, batcher):
+        channel = Mock()
+        for tag in (3, 1, 2):
+            batcher.ready(tag)
+
+        batcher.flush(channel)
+        assert channel.basic_ack.call_args_list == [call(3, multiple=True)]
+        assert len(batcher) == 0
+
+    def test_gap(self, batcher):
+        channel = Mock()
+        for tag in (1, 2, 4):
+            batcher.ready(tag)
+
+        batcher.flush(channel)
+        assert channel.basic_ack.call_args_list == [call(2, multiple=True), call(4)]
+
+        # 4 was already acked, so finishing 3 lets the multiple ack jump to 5
+        batcher.ready(3)
+        batcher.ready(5)
+        batcher.flush(channel)
+        assert channel.basic_ack.call_args_list[2:] == [call(5, multiple=True)]
+
+    def test_settled(self, batcher):
+        channel = Mock()
+        batcher.settled(1)
+        batcher.ready(2)
+
+        batcher.flush(channel)
+        assert channel.basic_ack.call_args_list == [call(2, multiple=True)]
+
+    def test_empty(self, batcher):
+        channel = Mock()
+        batcher.flush(channel)
+        assert channel.basic_ack.called is False
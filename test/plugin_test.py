@@ -9,7 +9,8 @@ from mock import ANY, MagicMock, Mock
 from requests import ConnectionError as RequestsConnectionError
 
 import brewtils.plugin
-from brewtils import get_connection_info
+from brewtils import get_connection_info, metrics
+from brewtils.async_request_handling import AsyncRequestProcessor
 from brewtils.errors import (
     ConflictError,
     DiscardMessageException,
@@ -21,6 +22,7 @@ from brewtils.errors import (
 from brewtils.log import default_config
 from brewtils.models import Command, Instance, System
 from brewtils.plugin import Plugin, PluginBase, RemotePlugin
+from brewtils.request_handling import BatchedHTTPRequestUpdater, HTTPRequestUpdater
 
 
 @pytest.fixture(autouse=True)
@@ -340,6 +342,34 @@ class TestStartup(object):
         )
         assert work_dir_base in plugin._config.working_directory
 
+    def test_metrics_server(self, plugin, admin_processor, request_processor):
+        plugin._ez_client.update_system = Mock(return_value=plugin._system)
+        plugin._initialize_processors = Mock(
+            return_value=(admin_processor, request_processor)
+        )
+        plugin._config.metrics_port = 0
+
+        try:
+            plugin._startup()
+            assert isinstance(metrics.get_sink(), metrics.InMemoryMetricsSink)
+
+            server = plugin._metrics_server
+            assert server.port != 0
+
+            plugin._shutdown()
+            assert plugin._metrics_server is None
+        finally:
+            metrics.set_sink()
+
+    def test_file_cache(self, plugin, tmpdir):
+        plugin._config.working_directory = str(tmpdir)
+        assert plugin._file_cache() is None
+
+        plugin._config.file_cache_size = 2
+        cache = plugin._file_cache()
+        assert cache.directory == os.path.join(str(tmpdir), "file_cache")
+        assert cache.max_size == 2 * 1024 * 1024
+
     def test_connect_fail(self, plugin, admin_processor, request_processor):
         plugin._ez_client.can_connect.return_value = False
 
@@ -559,6 +589,36 @@ class TestInitializeProcessors(object):
         assert admin.consumer._queue_name == admin_queue
         assert request.consumer._queue_name == request_queue
 
+    @pytest.mark.parametrize(
+        "batch_updates,updater_class",
+        [(False, HTTPRequestUpdater), (True, BatchedHTTPRequestUpdater)],
+    )
+    def test_updater(self, plugin, batch_updates, updater_class):
+        plugin._config.batch_updates = batch_updates
+
+        admin, request = plugin._initialize_processors()
+        assert type(request._updater) is updater_class
+        assert admin._updater is request._updater
+
+        request._updater.shutdown()
+
+    def test_async_processing(self, plugin):
+        plugin._config.async_processing = True
+
+        _, request = plugin._initialize_processors()
+        assert type(request) is AsyncRequestProcessor
+        assert request._max_concurrent == plugin._config.max_concurrent
+
+    def test_adaptive_prefetch(self, plugin):
+        plugin._config.mq.adaptive_prefetch = True
+        plugin._config.mq.min_prefetch = 2
+        plugin._config.mq.max_prefetch = 30
+
+        admin, request = plugin._initialize_processors()
+        assert admin._prefetch_tuner is None
+        assert request._prefetch_tuner.minimum == 2
+        assert request._prefetch_tuner.maximum == 30
+
 
 class TestAdminMethods(object):
     def test_start(self, plugin, ez_client, bg_instance):
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import copy
+import datetime
+import json
+
+import pytest
+from marshmallow.exceptions import MarshmallowError
+from pytest_lazyfixture import lazy_fixture
+
+from brewtils.models import BaseModel
+from brewtils.request_decoder import (
+    _BOOLEAN_FIELDS,
+    _DATETIME_FIELDS,
+    _DICT_FIELDS,
+    _NESTED_FIELDS,
+    _STRING_FIELDS,
+    parse_request,
+)
+from brewtils.schema_parser import SchemaParser
+from brewtils.schemas import RequestSchema
+
+
+def _model_state(value):
+    """Reduce a model (and anything it contains) to plain data for comparison"""
+    if isinstance(value, BaseModel):
+        return (type(value), _model_state(vars(value)))
+    if isinstance(value, dict):
+        return {k: _model_state(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_model_state(v) for v in value]
+    return value
+
+
+def assert_conforms(data, from_string=False):
+    expected = SchemaParser.parse_request(copy.deepcopy(data), from_string=from_string)
+    actual = parse_request(copy.deepcopy(data), from_string=from_string)
+
+    assert _model_state(actual) == _model_state(expected)
+
+
+def assert_both_raise(data, from_string=False):
+    with pytest.raises(Exception) as schema_ex:
+        SchemaParser.parse_request(copy.deepcopy(data), from_string=from_string)
+
+    with pytest.raises(Exception) as decoder_ex:
+        parse_request(copy.deepcopy(data), from_string=from_string)
+
+    assert type(decoder_ex.value) is type(schema_ex.value)
+
+
+def test_covers_schema():
+    """Every RequestSchema field must be handled by the decoder"""
+    handled = (
+        _STRING_FIELDS + _DICT_FIELDS + _BOOLEAN_FIELDS + _DATETIME_FIELDS
+    ) + _NESTED_FIELDS
+
+    assert sorted(handled) == sorted(RequestSchema.get_attribute_names())
+
+
+class TestConformance(object):
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {},
+            lazy_fixture("request_dict"),
+            lazy_fixture("parent_request_dict"),
+            lazy_fixture("child_request_dict"),
+        ],
+    )
+    def test_fixtures(self, data):
+        assert_conforms(data)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            lazy_fixture("request_dict"),
+            lazy_fixture("parent_request_dict"),
+            lazy_fixture("child_request_dict"),
+        ],
+    )
+    def test_fixtures_from_string(self, data):
+        assert_conforms(json.dumps(data), from_string=True)
+
+    def test_serialized_model(self, bg_request):
+        assert_conforms(SchemaParser.serialize_request(bg_request), from_string=True)
+
+    def test_nested_exclusions(self, request_dict, parent_request_dict):
+        """Parents don't get children and children don't get parents or children"""
+        request_dict["parent"]["children"] = [copy.deepcopy(parent_request_dict)]
+        request_dict["children"][0]["parent"] = copy.deepcopy(parent_request_dict)
+        request_dict["children"][0]["children"] = [copy.deepcopy(parent_request_dict)]
+
+        assert_conforms(request_dict)
+
+    def test_grandparent(self, request_dict, parent_request_dict):
+        request_dict["parent"]["parent"] = copy.deepcopy(parent_request_dict)
+
+        assert_conforms(request_dict)
+
+    @pytest.mark.parametrize("key", _STRING_FIELDS + _DICT_FIELDS + _NESTED_FIELDS)
+    def test_none(self, request_dict, key):
+        request_dict[key] = None
+        assert_conforms(request_dict)
+
+    @pytest.mark.parametrize(
+        "value", [True, False, 1, 0, "true", "False", "t", "0", 1.0]
+    )
+    def test_boolean_values(self, request_dict, value):
+        request_dict["hidden"] = value
+        assert_conforms(request_dict)
+
+    def test_unknown_field(self, request_dict):
+        request_dict["not_a_field"] = "ignored"
+        assert_conforms(request_dict)
+
+    def test_datetime(self, request_dict, ts_epoch):
+        request_dict["created_at"] = ts_epoch + 123
+        assert_conforms(request_dict)
+
+        result = parse_request(request_dict)
+        assert isinstance(result.created_at, datetime.datetime)
+        assert result.created_at.microsecond == 123000
+
+
+class TestErrors(object):
+    @pytest.mark.parametrize(
+        "data,kwargs,error",
+        [
+            (None, {"from_string": True}, TypeError),
+            (None, {"from_string": False}, TypeError),
+            ("", {"from_string": True}, ValueError),
+            ("bad bad bad", {"from_string": True}, ValueError),
+            (["list", "is", "bad"], {"from_string": True}, TypeError),
+            ({"bad": "bad bad"}, {"from_string": True}, TypeError),
+            ("bad bad bad", {}, MarshmallowError),
+            ("[]", {"from_string": True}, MarshmallowError),
+        ],
+    )
+    def test_input(self, data, kwargs, error):
+        with pytest.raises(error):
+            parse_request(data, **kwargs)
+
+        with pytest.raises(error):
+            SchemaParser.parse_request(data, **kwargs)
+
+    @pytest.mark.parametrize(
+        "key,value",
+        [
+            ("command", 1),
+            ("system", ["list"]),
+            ("parameters", "not a dict"),
+            ("metadata", []),
+            ("hidden", "maybe"),
+            ("hidden", 2),
+            ("hidden", []),
+            ("created_at", 0),
+            ("created_at", "yesterday"),
+            ("created_at", 1.5),
+            ("parent", "not a dict"),
+            ("children", "not a list"),
+            ("children", ["not a dict"]),
+        ],
+    )
+    def test_invalid_values(self, request_dict, key, value):
+        request_dict[key] = value
+        assert_both_raise(request_dict)
+
+    def test_invalid_nested_value(self, request_dict):
+        request_dict["parent"]["command"] = 1
+        assert_both_raise(request_dict)
@@ -1,13 +1,20 @@
 # -*- coding: utf-8 -*-
+import io
 import json
 import logging
+import os
 import sys
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import pytest
 from mock import ANY, MagicMock, Mock
 from requests import ConnectionError as RequestsConnectionError
 
+import brewtils.plugin
+from brewtils import metrics
+from brewtils.decorators import command
 from brewtils.errors import (
     DiscardMessageException,
     ErrorLogLevelCritical,
@@ -22,7 +29,12 @@ from brewtils.errors import (
     TooLargeError,
 )
 from brewtils.models import Request
-from brewtils.request_handling import HTTPRequestUpdater, RequestProcessor
+from brewtils.request_handling import (
+    BatchedHTTPRequestUpdater,
+    HTTPRequestUpdater,
+    RequestProcessor,
+    _PrefetchTuner,
+)
 from brewtils.schema_parser import SchemaParser
 from brewtils.test.comparable import assert_request_equal
 
@@ -303,6 +315,18 @@ class TestRequestProcessor(object):
             with pytest.raises(DiscardMessageException):
                 processor._parse("Not a Request")
 
+        def test_fast_parse(self, processor, bg_request):
+            processor._fast_parse = True
+
+            serialized = SchemaParser.serialize_request(bg_request)
+            assert_request_equal(processor._parse(serialized), bg_request)
+
+        def test_fast_parse_error(self, processor):
+            processor._fast_parse = True
+
+            with pytest.raises(DiscardMessageException):
+                processor._parse("Not a Request")
+
     class TestInvokeCommand(object):
         @pytest.fixture(autouse=True)
         def clean_tmpdir(self, tmpdir):
@@ -355,12 +379,429 @@ class TestRequestProcessor(object):
 
             processor._invoke_command(target_mock, request, {})
             processor._resolver.resolve.assert_called_once_with(
-                request.parameters, definitions=bg_command.parameters, upload=False
+                request.parameters,
+                definitions=bg_command.parameters,
+                upload=False,
+                lazy=False,
+                picklable=False,
             )
             getattr(target_mock, bg_command.name).assert_called_once_with(
                 message="test"
             )
 
+        def test_call_resolve_lazy(self, processor, target_mock, bg_command):
+            processor._lazy_resolution = True
+            request = Request(command=bg_command.name, parameters={"message": "test"})
+
+            processor._invoke_command(target_mock, request, {})
+            assert processor._resolver.resolve.call_args[1]["lazy"] is True
+
+        def test_call_resolve_lazy_process(self, processor, target_mock, bg_command):
+            processor._lazy_resolution = True
+            processor._get_process_pool = Mock()
+            getattr(target_mock, bg_command.name)._executor = "process"
+            request = Request(command=bg_command.name, parameters={"message": "test"})
+
+            processor._invoke_command(target_mock, request, {})
+            assert processor._resolver.resolve.call_args[1]["picklable"] is True
+
+        def test_close_file_parameters(self, processor, target_mock, bg_command):
+            files = [io.BytesIO(b"1"), io.BytesIO(b"2")]
+            processor._resolver.resolve.side_effect = None
+            processor._resolver.resolve.return_value = {
+                "message": files[0],
+                "nested": {"multi": [files[1], "text"]},
+            }
+            request = Request(command=bg_command.name, parameters={"message": "test"})
+
+            processor._invoke_command(target_mock, request, {})
+            assert all(f.closed for f in files)
+
+        def test_close_file_parameters_error(self, processor, target_mock, bg_command):
+            file_param = io.BytesIO(b"1")
+            processor._resolver.resolve.side_effect = None
+            processor._resolver.resolve.return_value = {"message": file_param}
+            getattr(target_mock, bg_command.name).side_effect = ValueError
+            request = Request(command=bg_command.name, parameters={"message": "test"})
+
+            with pytest.raises(ValueError):
+                processor._invoke_command(target_mock, request, {})
+            assert file_param.closed
+
+    class TestProcessExecutor(object):
+        @pytest.fixture
+        def target(self):
+            return ProcessTarget()
+
+        @pytest.fixture
+        def processor(self, target, updater_mock, consumer_mock):
+            processor = RequestProcessor(
+                target, updater_mock, consumer_mock, process_workers=1
+            )
+            yield processor
+
+            if processor._process_pool:
+                processor._process_pool.shutdown()
+
+        def test_thread(self, processor, target):
+            request = Request(command="pid", parameters={})
+
+            assert processor._invoke_command(target, request, {}) == os.getpid()
+            assert processor._process_pool is None
+
+        def test_process(self, processor, target):
+            request = Request(id="1", command="process_pid", parameters={})
+
+            output = processor._invoke_command(target, request, {})
+            assert output != os.getpid()
+
+        def test_spawned(self, processor):
+            # Forking after the consumer's threads have started can deadlock
+            pool = processor._get_process_pool()
+            assert pool._mp_context.get_start_method() == "spawn"
+
+        def test_default_executor(self, processor, target):
+            processor._default_executor = "process"
+            request = Request(command="pid", parameters={})
+
+            assert processor._invoke_command(target, request, {}) != os.getpid()
+
+        def test_parameters_and_context(self, processor, target):
+            brewtils.plugin.request_context.current_request = None
+            request = Request(id="1", command="context", parameters={"message": "hi"})
+
+            output = processor._invoke_command(target, request, {})
+            assert output == ("hi", "1")
+
+            # Context is only changed in the worker
+            assert brewtils.plugin.request_context.current_request is None
+
+        def test_unpicklable_output(self, processor, target):
+            request = Request(command="unpicklable", parameters={})
+
+            with pytest.raises(Exception):
+                processor._invoke_command(target, request, {})
+
+        def test_shutdown(self, processor, target):
+            request = Request(command="process_pid", parameters={})
+            processor._invoke_command(target, request, {})
+
+            pool = processor._process_pool
+            processor.shutdown()
+            with pytest.raises(RuntimeError):
+                pool.submit(os.getpid)
+
+
+class LimitTarget(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    @command(max_concurrent=2)
+    def limited(self, seconds=0.05):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(seconds)
+
+        with self.lock:
+            self.running -= 1
+
+    def unlimited(self):
+        return threading.current_thread().name
+
+    @command(pool="other")
+    def pooled(self):
+        return threading.current_thread().name
+
+
+class TestCommandLimits(object):
+    @pytest.fixture
+    def target(self):
+        return LimitTarget()
+
+    @pytest.fixture
+    def processor(self, target):
+        return RequestProcessor(
+            target, Mock(), Mock(), max_workers=3, pool_sizes={"other": 1}
+        )
+
+    @staticmethod
+    def _receive(processor, command, **parameters):
+        return processor.on_message_received(
+            SchemaParser.serialize_request(
+                Request(id="1", command=command, parameters=parameters),
+                to_string=True,
+            ),
+            {},
+        )
+
+    def test_limit(self, processor, target):
+        futures = [self._receive(processor, "limited") for _ in range(6)]
+        wait(futures, timeout=5)
+
+        assert all(f.done() and f.exception() is None for f in futures)
+        assert target.max_running == 2
+        assert len(processor._deferred) == 0
+        assert processor._command_slots["limited"].running == 0
+
+    def test_deferred_prefetch(self, processor, target):
+        futures = [self._receive(processor, "limited", seconds=0.2) for _ in range(3)]
+        wait(futures, timeout=5)
+
+        # The deferred message raises the prefetch until it's started
+        counts = [c[0][0] for c in processor.consumer.set_deferred.call_args_list]
+        assert counts == [1, 0]
+        assert processor._deferred_count == 0
+
+    def test_deferred_prefetch_bounded(self, processor, target):
+        futures = [self._receive(processor, "limited", seconds=0.01) for _ in range(50)]
+        wait(futures, timeout=5)
+
+        # No more than the command's limit is added to the prefetch, however many
+        # messages are waiting
+        counts = [c[0][0] for c in processor.consumer.set_deferred.call_args_list]
+        assert max(counts) == 2
+        assert counts[-1] == 0
+        assert all(f.done() for f in futures)
+
+    def test_waiting_does_not_take_threads(self, processor, target):
+        limited = [self._receive(processor, "limited", seconds=0.2) for _ in range(6)]
+        unlimited = self._receive(processor, "unlimited")
+
+        unlimited.result(timeout=0.15)
+        assert not all(f.done() for f in limited)
+
+        wait(limited, timeout=5)
+
+    def test_error(self, processor):
+        processor._updater.update_request.side_effect = ValueError
+
+        futures = [self._receive(processor, "limited") for _ in range(3)]
+        wait(futures, timeout=5)
+
+        assert all(isinstance(f.exception(), ValueError) for f in futures)
+        assert processor._command_slots["limited"].running == 0
+
+    def test_named_pool(self, processor, target):
+        self._receive(processor, "pooled").result(timeout=5)
+        self._receive(processor, "unlimited").result(timeout=5)
+
+        pooled, unlimited = [
+            args[0].output
+            for args, _ in processor._updater.update_request.call_args_list
+        ][1::2]
+        assert pooled != unlimited
+        assert processor._named_pools["other"]._max_workers == 1
+
+    def test_shutdown_waits(self, processor, target):
+        futures = [self._receive(processor, "limited") for _ in range(6)]
+
+        processor.shutdown()
+        assert all(f.done() for f in futures)
+
+
+class TestPrefetchTuner(object):
+    @pytest.fixture
+    def consumer(self):
+        return Mock()
+
+    @pytest.fixture
+    def tuner(self, consumer):
+        return _PrefetchTuner(consumer, 4, 2, 50, interval=0)
+
+    @staticmethod
+    def _process(tuner, latency, count=1):
+        for _ in range(count):
+            tuner.received()
+            tuner.started()
+            tuner.finished(latency)
+
+    @pytest.mark.parametrize("bounds", [(0, 10), (5, 4)])
+    def test_invalid_bounds(self, consumer, bounds):
+        with pytest.raises(ValueError):
+            _PrefetchTuner(consumer, 4, *bounds)
+
+    def test_start(self, tuner, consumer):
+        tuner.start()
+        consumer.set_prefetch.assert_called_once_with(4)
+
+    def test_start_clamped(self, consumer):
+        _PrefetchTuner(consumer, 100, 1, 10).start()
+        consumer.set_prefetch.assert_called_once_with(10)
+
+    def test_short_commands(self, tuner, consumer):
+        self._process(tuner, 0.001)
+        consumer.set_prefetch.assert_called_once_with(50)
+
+    def test_long_commands(self, tuner, consumer):
+        self._process(tuner, 10)
+
+        # The workers, plus one message so the next Request is ready
+        consumer.set_prefetch.assert_called_once_with(5)
+
+    def test_moderate_commands(self, tuner, consumer):
+        self._process(tuner, 0.1)
+        consumer.set_prefetch.assert_called_once_with(14)
+
+    def test_unchanged(self, tuner, consumer):
+        self._process(tuner, 10, count=5)
+        assert consumer.set_prefetch.call_count == 1
+
+    def test_interval(self, consumer):
+        tuner = _PrefetchTuner(consumer, 4, 2, 50, interval=60)
+
+        self._process(tuner, 0.001)
+        self._process(tuner, 10)
+        consumer.set_prefetch.assert_called_once_with(50)
+
+    def test_saturated(self, tuner, consumer):
+        # Only 2 Requests ever run at once, with 3 more waiting
+        for _ in range(5):
+            tuner.received()
+        tuner.started()
+        tuner.started()
+
+        tuner.finished(10)
+        consumer.set_prefetch.assert_called_once_with(3)
+
+    def test_minimum(self, consumer):
+        tuner = _PrefetchTuner(consumer, 1, 5, 50, interval=0)
+
+        self._process(tuner, 10)
+        consumer.set_prefetch.assert_called_once_with(5)
+
+
+class TestAdaptivePrefetch(object):
+    @pytest.fixture
+    def processor(self):
+        return RequestProcessor(
+            LimitTarget(), Mock(), Mock(), max_workers=2, prefetch_bounds=(1, 20)
+        )
+
+    def test_startup(self, processor):
+        processor.startup()
+        processor.consumer.set_prefetch.assert_called_once_with(2)
+
+    def test_adjusts(self, processor):
+        processor._prefetch_tuner._interval = 0
+
+        processor.on_message_received(
+            SchemaParser.serialize_request(
+                Request(id="1", command="unlimited"), to_string=True
+            ),
+            {},
+        ).result(timeout=5)
+
+        processor.consumer.set_prefetch.assert_called_once_with(20)
+        assert processor._prefetch_tuner._in_flight == 0
+
+    def test_disabled(self):
+        processor = RequestProcessor(LimitTarget(), Mock(), Mock(), max_workers=2)
+        processor.startup()
+
+        assert processor._prefetch_tuner is None
+        assert processor.consumer.set_prefetch.called is False
+
+
+class TestMetrics(object):
+    @pytest.fixture
+    def sink(self):
+        sink = metrics.set_sink(metrics.InMemoryMetricsSink())
+        yield sink
+        metrics.set_sink()
+
+    @pytest.fixture
+    def processor(self):
+        return RequestProcessor(LimitTarget(), Mock(), Mock(), max_workers=1)
+
+    @staticmethod
+    def _stage_count(sink, stage, command):
+        return sink.get_histogram(
+            "brewtils_request_stage_seconds", {"stage": stage, "command": command}
+        )[0]
+
+    def test_success(self, processor, sink):
+        processor.on_message_received(
+            SchemaParser.serialize_request(
+                Request(id="1", command="unlimited"), to_string=True
+            ),
+            {},
+        ).result(timeout=5)
+
+        labels = {"command": "unlimited"}
+        assert sink.get("brewtils_messages_received_total") == 1
+        assert sink.get("brewtils_requests_parsed_total", labels) == 1
+        assert sink.get("brewtils_requests_invoked_total", labels) == 1
+        assert sink.get("brewtils_requests_succeeded_total", labels) == 1
+        assert sink.get("brewtils_requests_failed_total", labels) == 0
+
+        for stage in ("parse", "queue", "invoke"):
+            assert self._stage_count(sink, stage, "unlimited") == 1
+
+        assert sink.get("brewtils_pool_queue_depth", {"pool": "default"}) == 0
+        assert processor._queued == {}
+
+    def test_failure(self, processor, sink):
+        processor.on_message_received(
+            SchemaParser.serialize_request(
+                Request(id="1", command="not_a_command"), to_string=True
+            ),
+            {},
+        ).result(timeout=5)
+
+        labels = {"command": "not_a_command"}
+        assert sink.get("brewtils_requests_failed_total", labels) == 1
+        assert sink.get("brewtils_requests_invoked_total", labels) == 0
+
+    def test_parse_failure(self, processor, sink):
+        with pytest.raises(DiscardMessageException):
+            processor.on_message_received("not a request", {})
+
+        assert sink.get("brewtils_messages_received_total") == 1
+        assert self._stage_count(sink, "parse", None) == 0
+
+    def test_queue_depth(self, processor, sink):
+        processor.on_message_received(
+            SchemaParser.serialize_request(
+                Request(id="1", command="pooled"), to_string=True
+            ),
+            {},
+        ).result(timeout=5)
+
+        assert self._stage_count(sink, "queue", "pooled") == 1
+        assert sink.get("brewtils_pool_queue_depth", {"pool": "other"}) == 0
+
+    def test_update(self, sink, monkeypatch):
+        monkeypatch.setattr(
+            HTTPRequestUpdater, "_create_connection_poll_thread", Mock()
+        )
+        updater = HTTPRequestUpdater(Mock(), Mock())
+
+        updater.update_request(Request(id="1", command="command"), {})
+        assert self._stage_count(sink, "update", "command") == 1
+
+
+class ProcessTarget(object):
+    """Command target for process executor tests, must be picklable"""
+
+    def pid(self):
+        return os.getpid()
+
+    @command(executor="process")
+    def process_pid(self):
+        return os.getpid()
+
+    @command(executor="process")
+    def context(self, message):
+        return message, brewtils.plugin.request_context.current_request.id
+
+    @command(executor="process")
+    def unpicklable(self):
+        return threading.Lock()
+
 
 class TestHTTPRequestUpdater(object):
     @pytest.fixture
@@ -448,6 +889,28 @@ class TestHTTPRequestUpdater(object):
             with pytest.raises(DiscardMessageException):
                 updater.update_request(bg_request, {"retry_attempt": 1})
 
+        def test_concurrent_updates(self, updater, client):
+            """Healthy-path updates should not be serialized"""
+
+            def slow_update(*args, **kwargs):
+                time.sleep(0.02)
+
+            client.update_request.side_effect = slow_update
+
+            def run(workers, count=40):
+                requests = [Request(id=str(i), status="SUCCESS") for i in range(count)]
+
+                start = time.time()
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    list(pool.map(lambda r: updater.update_request(r, {}), requests))
+                return count / (time.time() - start)
+
+            single = run(1)
+            multiple = run(8)
+
+            assert client.update_request.call_count == 80
+            assert multiple > 4 * single
+
     class TestConnectionPoll(object):
         def test_shut_down(self, updater, client, shutdown_event):
             shutdown_event.wait.return_value = True
@@ -496,3 +959,143 @@ class TestHTTPRequestUpdater(object):
         shutdown_event.set()
         updater.connection_poll_thread.join()
         assert not updater.connection_poll_thread.is_alive()
+
+
+class TestBatchedHTTPRequestUpdater(object):
+    @pytest.fixture
+    def client(self):
+        return Mock()
+
+    @pytest.fixture
+    def shutdown_event(self):
+        return threading.Event()
+
+    @pytest.fixture
+    def updater(self, monkeypatch, client, shutdown_event):
+        monkeypatch.setattr(
+            BatchedHTTPRequestUpdater,
+            "_create_connection_poll_thread",
+            Mock(return_value=Mock()),
+        )
+        updater = BatchedHTTPRequestUpdater(client, shutdown_event, batch_size=3)
+        yield updater
+
+        shutdown_event.set()
+        updater.shutdown()
+
+    @staticmethod
+    def _request(status, request_id="id"):
+        return Request(id=request_id, status=status, output="out")
+
+    def test_ephemeral(self, updater, client):
+        updater.update_request(Mock(is_ephemeral=True), {})
+        updater.shutdown()
+
+        assert client.update_request.called is False
+
+    def test_final_blocks(self, updater, client):
+        updater.update_request(self._request("SUCCESS"), {})
+
+        client.update_request.assert_called_once_with(
+            "id", status="SUCCESS", output="out", error_class=None
+        )
+
+    def test_in_progress_sent_immediately(self, updater, client):
+        updater.update_request(self._request("IN_PROGRESS"), {})
+
+        client.update_request.assert_called_once_with(
+            "id", status="IN_PROGRESS", output="out", error_class=None
+        )
+
+    def test_concurrent_sends(self, updater, client):
+        running = []
+        max_running = []
+
+        def update_request(*args, **kwargs):
+            running.append(True)
+            max_running.append(len(running))
+            time.sleep(0.05)
+            running.pop()
+
+        client.update_request.side_effect = update_request
+
+        threads = [
+            threading.Thread(
+                target=updater.update_request,
+                args=(self._request("SUCCESS", str(i)), {}),
+            )
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert client.update_request.call_count == 4
+        assert max(max_running) > 1
+
+    def test_after_shutdown(self, updater, client):
+        updater.shutdown()
+
+        with pytest.raises(RepublishRequestException):
+            updater.update_request(self._request("SUCCESS"), {})
+
+        assert client.update_request.called is False
+
+    @pytest.mark.parametrize(
+        "ex,raised,bv_down",
+        [
+            (RestClientError, DiscardMessageException, False),
+            (RequestsConnectionError, RepublishRequestException, True),
+            (ValueError, RepublishRequestException, False),
+            (TooLargeError, RepublishRequestException, False),
+        ],
+    )
+    @pytest.mark.parametrize("status", ["IN_PROGRESS", "SUCCESS"])
+    def test_errors(self, updater, client, ex, raised, bv_down, status):
+        client.update_request.side_effect = ex
+
+        with pytest.raises(raised):
+            updater.update_request(self._request(status), {})
+        assert updater.brew_view_down is bv_down
+
+    def test_final_retry_headers(self, updater, client):
+        client.update_request.side_effect = ValueError
+        headers = {"retry_attempt": 1, "time_to_wait": 0}
+
+        with pytest.raises(RepublishRequestException) as ex:
+            updater.update_request(self._request("SUCCESS"), headers)
+        assert ex.value.headers["retry_attempt"] == 2
+
+    def test_final_attempt(self, updater, client):
+        updater.max_attempts = 1
+
+        updater.update_request(self._request("SUCCESS"), {"retry_attempt": 1})
+        client.update_request.assert_called_once_with(
+            "id", status="ERROR", output=ANY, error_class="BGGivesUpError"
+        )
+
+    def test_in_progress_brew_view_down(self, updater, client):
+        client.update_request.side_effect = RequestsConnectionError
+
+        with pytest.raises(RepublishRequestException):
+            updater.update_request(self._request("IN_PROGRESS"), {})
+        assert updater.brew_view_down is True
+
+        # The next update waits until brew-view is back instead of being dropped
+        client.update_request.side_effect = None
+        thread = threading.Thread(
+            target=updater.update_request, args=(self._request("IN_PROGRESS"), {})
+        )
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+        assert client.update_request.call_count == 1
+
+        with updater.brew_view_error_condition:
+            updater.brew_view_down = False
+            updater.brew_view_error_condition.notify_all()
+
+        thread.join(5)
+        assert not thread.is_alive()
+        assert client.update_request.call_count == 2
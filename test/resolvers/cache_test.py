@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+
+import pytest
+
+from brewtils.models import Resolvable
+from brewtils.resolvers.cache import FileCache
+
+
+@pytest.fixture
+def directory(tmpdir):
+    return os.path.join(str(tmpdir), "cache")
+
+
+@pytest.fixture
+def cache(directory):
+    return FileCache(directory, 10)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class TestKey(object):
+    def test_id(self):
+        assert FileCache.key(Resolvable(id="1", type="bytes")) == FileCache.key(
+            Resolvable(id="1", type="bytes")
+        )
+        assert FileCache.key(Resolvable(id="1", type="bytes")) != FileCache.key(
+            Resolvable(id="2", type="bytes")
+        )
+
+    def test_checksum(self):
+        assert FileCache.key(
+            Resolvable(id="1", type="bytes", details={"md5": "a"})
+        ) != FileCache.key(Resolvable(id="1", type="bytes", details={"md5": "b"}))
+
+    def test_no_id(self):
+        assert FileCache.key(Resolvable(type="bytes")) is None
+
+
+class TestSize(object):
+    @pytest.mark.parametrize(
+        "details,size",
+        [({}, None), ({"file_size": 5}, 5), ({"size": "5"}, 5), ({"size": "x"}, None)],
+    )
+    def test_size(self, details, size):
+        assert FileCache.size(Resolvable(id="1", details=details)) == size
+
+    @pytest.mark.parametrize("details,accepted", [({}, True), ({"size": 10}, True)])
+    def test_accepts(self, cache, details, accepted):
+        assert cache.accepts(Resolvable(id="1", details=details)) is accepted
+
+    def test_accepts_too_large(self, cache):
+        assert cache.accepts(Resolvable(id="1", details={"size": 11})) is False
+
+
+class TestFileCache(object):
+    def test_miss(self, cache):
+        assert cache.get("key") is None
+        assert cache.stats["misses"] == 1
+
+    def test_put_bytes(self, cache):
+        path = cache.put("key", b"12345")
+
+        assert read(path) == b"12345"
+        assert cache.get("key") == path
+        assert cache.stats == {
+            "hits": 1,
+            "misses": 0,
+            "evictions": 0,
+            "entries": 1,
+            "size": 5,
+        }
+
+    def test_put_file(self, cache):
+        path = cache.put("key", io.BytesIO(b"12345"))
+        assert read(path) == b"12345"
+
+    def test_too_large(self, cache, directory):
+        assert cache.put("key", b"12345678901") is None
+        assert os.listdir(directory) == []
+
+    def test_evict(self, cache):
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        cache.get("a")
+        cache.put("c", b"1234")
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.stats["evictions"] == 1
+        assert cache.stats["size"] == 8
+
+    def test_replace(self, cache):
+        cache.put("key", b"1234")
+        cache.put("key", b"12345")
+
+        assert cache.stats["size"] == 5
+        assert read(cache.get("key")) == b"12345"
+
+    def test_removed_file(self, cache):
+        os.remove(cache.put("key", b"1234"))
+
+        assert cache.get("key") is None
+        assert cache.stats["size"] == 0
+
+    def test_clear(self, cache, directory):
+        cache.put("key", b"1234")
+        cache.clear()
+
+        assert cache.get("key") is None
+        assert os.listdir(directory) == []
+
+    def test_reload(self, cache, directory):
+        cache.put("key", b"1234")
+        with open(os.path.join(directory, "partial.tmp"), "wb") as f:
+            f.write(b"12")
+
+        reloaded = FileCache(directory, 10)
+        assert read(reloaded.get("key")) == b"1234"
+        assert reloaded.stats["size"] == 4
+        assert not os.path.exists(os.path.join(directory, "partial.tmp"))
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import io
 import os
 
 import pytest
@@ -7,6 +8,7 @@ from mock import Mock
 
 from brewtils.models import Parameter
 from brewtils.resolvers.chunks import ChunksResolver
+from brewtils.resolvers.lazy import LazyFile
 
 
 @pytest.fixture
@@ -60,3 +62,37 @@ class TestShouldDownload(object):
 def test_download(resolver, ez_client, definition, bg_resolvable_chunk):
     resolver.download(bg_resolvable_chunk, definition)
     ez_client.download_chunked_file.assert_called_once_with(bg_resolvable_chunk.id)
+
+
+def test_download_streaming(ez_client, definition, bg_resolvable_chunk):
+    resolver = ChunksResolver(ez_client, streaming=True, working_directory="/tmp/work")
+    resolver.download(bg_resolvable_chunk, definition)
+
+    ez_client.download_chunked_file.assert_called_once_with(
+        bg_resolvable_chunk.id, streaming=True, spool_dir="/tmp/work"
+    )
+
+
+def test_should_cache(resolver, ez_client, definition, bg_resolvable_chunk):
+    assert resolver.should_cache(bg_resolvable_chunk, definition) is True
+
+    resolver = ChunksResolver(ez_client, streaming=True)
+    assert resolver.should_cache(bg_resolvable_chunk, definition) is False
+
+
+class TestDetach(object):
+    def test_bytes_io(self, resolver, definition):
+        value = io.BytesIO(b"data")
+        assert resolver.detach(value, definition) is value
+
+    def test_file(self, resolver, definition, example_file):
+        value = open(example_file, "rb")
+
+        detached = resolver.detach(value, definition)
+        assert isinstance(detached, io.BytesIO)
+        assert detached.read() == open(example_file, "rb").read()
+        assert value.closed
+
+
+def test_proxy(resolver, definition):
+    assert isinstance(resolver.proxy(Mock(), definition), LazyFile)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import io
+import threading
+
+import pytest
+from mock import Mock
+
+from brewtils.resolvers.lazy import LazyBytes, LazyFile
+
+
+class TestLazyBytes(object):
+    @pytest.fixture
+    def load(self):
+        return Mock(return_value=b"content")
+
+    def test_not_loaded(self, load):
+        value = LazyBytes(load)
+
+        assert value.loaded is False
+        assert repr(value) == "<LazyBytes: not loaded>"
+        assert load.called is False
+
+    def test_operations(self, load):
+        value = LazyBytes(load)
+
+        assert value == b"content"
+        assert value == LazyBytes(load)
+        assert bytes(value) == b"content"
+        assert len(value) == 7
+        assert value[:3] == b"con"
+        assert b"tent" in value
+        assert value + b"!" == b"content!"
+        assert b"!" + value == b"!content"
+        assert value.decode() == "content"
+        assert load.call_count == 2
+
+    def test_load_once(self, load):
+        value = LazyBytes(load)
+        threads = [threading.Thread(target=value.load) for _ in range(5)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert load.call_count == 1
+
+
+class TestLazyFile(object):
+    @pytest.fixture
+    def load(self):
+        return Mock(side_effect=lambda: io.BytesIO(b"line 1\nline 2\n"))
+
+    def test_read(self, load):
+        with LazyFile(load) as value:
+            assert load.called is False
+
+            assert value.readline() == b"line 1\n"
+            assert value.tell() == 7
+            assert value.read() == b"line 2\n"
+
+            value.seek(0)
+            assert list(value) == [b"line 1\n", b"line 2\n"]
+            assert value.getvalue() == b"line 1\nline 2\n"
+
+        assert load.call_count == 1
+
+    def test_readinto(self, load):
+        buffer = bytearray(4)
+
+        assert LazyFile(load).readinto(buffer) == 4
+        assert buffer == b"line"
+
+    def test_close_loaded(self, load):
+        value = LazyFile(load)
+        underlying = value.load()
+        value.close()
+
+        assert value.closed is True
+        assert underlying.closed is True
+
+    def test_close_not_loaded(self, load):
+        value = LazyFile(load)
+        value.close()
+
+        with pytest.raises(ValueError):
+            value.read()
+
+        assert load.called is False
@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import io
+import os
+
 import pytest
-from mock import Mock
+from mock import ANY, MagicMock, Mock
 
+from brewtils import tracing
+from brewtils.resolvers.cache import FileCache
+from brewtils.resolvers.lazy import LazyBytes
 from brewtils.resolvers.manager import ResolutionManager
+from brewtils.resolvers.uploads import UploadIndex
 
 
 @pytest.fixture
@@ -99,6 +106,29 @@ class TestSimpleResolve(object):
 
         assert resolved == {"message": "hi"}
 
+    def test_download_span(
+        self, manager, resolver_mock, bg_command, resolvable_dict, bg_resolvable
+    ):
+        resolver_mock.should_download.return_value = True
+        tracer = tracing.set_tracer(MagicMock(spec=tracing.Tracer))
+
+        for param in bg_command.parameters:
+            param.parameters = None
+
+        try:
+            manager.resolve(
+                {"message": resolvable_dict},
+                definitions=bg_command.parameters,
+                upload=False,
+            )
+        finally:
+            tracing.set_tracer()
+
+        assert tracer.span.call_args[0][0] == "download_parameter"
+        assert tracer.span.call_args[1]["attributes"]["brewtils.parameter.key"] == (
+            "message"
+        )
+
     def test_download_value_none(
         self, manager, resolver_mock, bg_command, bg_resolvable
     ):
@@ -231,3 +261,225 @@ class TestNestedMultiResolve(object):
         )
 
         assert resolved == {"message": [{"nested": "hi"}, {"nested": "hi"}]}
+
+
+class TestFileCache(object):
+    @pytest.fixture
+    def file_cache(self, tmpdir):
+        return FileCache(os.path.join(str(tmpdir), "cache"), 1024)
+
+    @pytest.fixture
+    def manager(self, resolver_mock, file_cache):
+        m = ResolutionManager(file_cache=file_cache)
+        m.resolvers = [resolver_mock]
+        return m
+
+    @pytest.fixture
+    def resolver_mock(self, resolver_mock):
+        resolver_mock.should_download.return_value = True
+        resolver_mock.should_cache.return_value = True
+
+        def load_cached(path, definition):
+            with open(path, "rb") as f:
+                return f.read()
+
+        resolver_mock.load_cached.side_effect = load_cached
+        return resolver_mock
+
+    @pytest.fixture
+    def definitions(self, bg_command):
+        for param in bg_command.parameters:
+            param.parameters = None
+        return bg_command.parameters
+
+    def test_bytes(self, manager, resolver_mock, file_cache, definitions):
+        resolver_mock.download.return_value = b"hi"
+        values = {"message": {"id": "1", "type": "bytes"}}
+
+        assert manager.resolve(values, definitions, upload=False) == {"message": b"hi"}
+        assert manager.resolve(values, definitions, upload=False) == {"message": b"hi"}
+
+        assert resolver_mock.download.call_count == 1
+        assert file_cache.stats["hits"] == 1
+        assert file_cache.stats["misses"] == 1
+
+    def test_file(self, manager, resolver_mock, definitions):
+        resolver_mock.download.side_effect = lambda *_: io.BytesIO(b"hi")
+        values = {"message": {"id": "1", "type": "base64"}}
+
+        for _ in range(2):
+            resolved = manager.resolve(values, definitions, upload=False)
+            assert resolved == {"message": b"hi"}
+
+        assert resolver_mock.download.call_count == 1
+
+    def test_too_large(self, manager, resolver_mock, definitions):
+        download = io.BytesIO(b"x" * 2048)
+        resolver_mock.download.return_value = download
+
+        resolved = manager.resolve(
+            {"message": {"id": "1", "type": "base64"}}, definitions, upload=False
+        )
+        assert resolved == {"message": download}
+        assert download.tell() == 0
+
+    def test_known_too_large(self, manager, resolver_mock, file_cache, definitions):
+        download = io.BytesIO(b"x" * 2048)
+        resolver_mock.download.return_value = download
+        values = {"message": {"id": "1", "type": "base64", "details": {"size": 2048}}}
+
+        assert manager.resolve(values, definitions, upload=False) == {
+            "message": download
+        }
+        assert file_cache.stats["misses"] == 0
+
+    def test_not_cacheable(self, manager, resolver_mock, file_cache, definitions):
+        resolver_mock.should_cache.return_value = False
+        resolver_mock.download.return_value = b"hi"
+        values = {"message": {"id": "1", "type": "bytes"}}
+
+        manager.resolve(values, definitions, upload=False)
+        manager.resolve(values, definitions, upload=False)
+
+        assert resolver_mock.download.call_count == 2
+        assert file_cache.stats["misses"] == 0
+
+
+class TestUploadIndex(object):
+    @pytest.fixture
+    def upload_index(self):
+        return UploadIndex()
+
+    @pytest.fixture
+    def manager(self, resolver_mock, upload_index):
+        m = ResolutionManager(upload_index=upload_index)
+        m.resolvers = [resolver_mock]
+        return m
+
+    @pytest.fixture
+    def definitions(self, bg_command):
+        for param in bg_command.parameters:
+            param.parameters = None
+        return bg_command.parameters
+
+    def test_dedupe(
+        self, manager, resolver_mock, definitions, resolvable_dict, bg_resolvable
+    ):
+        resolver_mock.should_upload.return_value = True
+        resolver_mock.should_cache.return_value = True
+        resolver_mock.upload.return_value = bg_resolvable
+
+        for _ in range(2):
+            resolved = manager.resolve({"message": b"hi"}, definitions, upload=True)
+            assert resolved == {"message": resolvable_dict}
+
+        assert resolver_mock.upload.call_count == 1
+
+    def test_different_scope(
+        self, manager, resolver_mock, upload_index, definitions, bg_resolvable
+    ):
+        resolver_mock.should_upload.return_value = True
+        resolver_mock.should_cache.return_value = True
+        resolver_mock.upload.return_value = bg_resolvable
+
+        other = ResolutionManager(upload_index=upload_index, upload_scope="other")
+        other.resolvers = [resolver_mock]
+
+        manager.resolve({"message": b"hi"}, definitions, upload=True)
+        other.resolve({"message": b"hi"}, definitions, upload=True)
+
+        assert resolver_mock.upload.call_count == 2
+
+    def test_different_content(
+        self, manager, resolver_mock, definitions, bg_resolvable
+    ):
+        resolver_mock.should_upload.return_value = True
+        resolver_mock.should_cache.return_value = True
+        resolver_mock.upload.return_value = bg_resolvable
+
+        manager.resolve({"message": b"hi"}, definitions, upload=True)
+        manager.resolve({"message": b"bye"}, definitions, upload=True)
+
+        assert resolver_mock.upload.call_count == 2
+
+    def test_not_cacheable(self, manager, resolver_mock, definitions, bg_resolvable):
+        resolver_mock.should_upload.return_value = True
+        resolver_mock.should_cache.return_value = False
+        resolver_mock.upload.return_value = bg_resolvable
+
+        manager.resolve({"message": b"hi"}, definitions, upload=True)
+        manager.resolve({"message": b"hi"}, definitions, upload=True)
+
+        assert resolver_mock.upload.call_count == 2
+
+
+class TestLazy(object):
+    @pytest.fixture
+    def definitions(self, bg_command):
+        for param in bg_command.parameters:
+            param.parameters = None
+        return bg_command.parameters
+
+    def test_proxy(self, manager, resolver_mock, definitions, resolvable_dict):
+        resolver_mock.should_download.return_value = True
+        resolver_mock.download.return_value = b"hi"
+        resolver_mock.proxy.side_effect = lambda load, _: LazyBytes(load)
+
+        resolved = manager.resolve(
+            {"message": resolvable_dict}, definitions, upload=False, lazy=True
+        )
+        assert isinstance(resolved["message"], LazyBytes)
+        assert resolver_mock.download.called is False
+
+        assert resolved["message"] == b"hi"
+        assert resolver_mock.download.call_count == 1
+
+    def test_no_proxy(self, manager, resolver_mock, definitions, resolvable_dict):
+        resolver_mock.should_download.return_value = True
+        resolver_mock.download.return_value = b"hi"
+        resolver_mock.proxy.return_value = None
+
+        resolved = manager.resolve(
+            {"message": resolvable_dict}, definitions, upload=False, lazy=True
+        )
+        assert resolved == {"message": b"hi"}
+
+    def test_multi(self, manager, resolver_mock, definitions, resolvable_dict):
+        resolver_mock.should_download.return_value = True
+        resolver_mock.proxy.side_effect = lambda load, _: LazyBytes(load)
+        for param in definitions:
+            param.multi = True
+
+        resolved = manager.resolve(
+            {"message": [resolvable_dict, resolvable_dict]},
+            definitions,
+            upload=False,
+            lazy=True,
+        )
+        assert all(isinstance(value, LazyBytes) for value in resolved["message"])
+        assert resolver_mock.download.called is False
+
+
+class TestPicklable(object):
+    @pytest.fixture
+    def definitions(self, bg_command):
+        for param in bg_command.parameters:
+            param.parameters = None
+        return bg_command.parameters
+
+    def test_detach(self, manager, resolver_mock, definitions, resolvable_dict):
+        resolver_mock.should_download.return_value = True
+        resolver_mock.detach.return_value = b"detached"
+
+        resolved = manager.resolve(
+            {"message": resolvable_dict},
+            definitions,
+            upload=False,
+            lazy=True,
+            picklable=True,
+        )
+        assert resolved == {"message": b"detached"}
+        assert resolver_mock.proxy.called is False
+        resolver_mock.detach.assert_called_once_with(
+            resolver_mock.download.return_value, ANY
+        )
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import threading
+import time
+
+import pytest
+from mock import patch
+
+from brewtils.models import Parameter
+from brewtils.resolvers.uploads import (
+    PERSISTED_MAX_AGE,
+    UploadIndex,
+    get_upload_index,
+)
+
+
+@pytest.fixture
+def definition():
+    return Parameter(type="Base64")
+
+
+@pytest.fixture
+def example_file(tmpdir):
+    path = os.path.join(str(tmpdir), "foo.txt")
+    with open(path, "wb") as f:
+        f.write(b"content")
+    return path
+
+
+class TestKey(object):
+    def test_bytes(self, definition):
+        assert UploadIndex.key(b"a", definition) == UploadIndex.key(b"a", definition)
+        assert UploadIndex.key(b"a", definition) != UploadIndex.key(b"b", definition)
+
+    def test_type(self):
+        assert UploadIndex.key(b"a", Parameter(type="Bytes")) != UploadIndex.key(
+            b"a", Parameter(type="Base64")
+        )
+
+    def test_path(self, definition, example_file):
+        assert UploadIndex.key(example_file, definition).startswith("base64:foo.txt:")
+
+    def test_missing_path(self, definition, tmpdir):
+        assert UploadIndex.key(os.path.join(str(tmpdir), "nope"), definition) is None
+
+    def test_file(self, definition, example_file):
+        with open(example_file, "rb") as f:
+            f.read(2)
+            key = UploadIndex.key(f, definition)
+
+            assert f.tell() == 2
+            assert key != UploadIndex.key(example_file, definition)
+
+            f.seek(0)
+            assert UploadIndex.key(f, definition) == UploadIndex.key(
+                example_file, definition
+            )
+
+    def test_text_file(self, definition, example_file):
+        with open(example_file, "r") as f:
+            assert UploadIndex.key(f, definition) == UploadIndex.key(
+                example_file, definition
+            )
+
+    def test_unnamed_file(self, definition):
+        assert UploadIndex.key(io.BytesIO(b"a"), definition).startswith("base64::")
+
+    def test_scope(self, definition):
+        assert UploadIndex.key(b"a", definition, scope="one") != UploadIndex.key(
+            b"a", definition, scope="two"
+        )
+        assert UploadIndex.key(b"a", definition, scope="one") == UploadIndex.key(
+            b"a", definition, scope="one"
+        )
+
+    def test_unhashable(self, definition):
+        assert UploadIndex.key(123, definition) is None
+
+
+class TestUploadIndex(object):
+    def test_get_set(self):
+        index = UploadIndex()
+        resolvable = {"id": "1", "details": {}}
+
+        assert index.get("key") is None
+        index.set("key", resolvable)
+
+        assert index.get("key") == resolvable
+        assert index.get("key") is not resolvable
+
+    def test_max_age(self):
+        index = UploadIndex(max_age=10)
+
+        with patch("brewtils.resolvers.uploads.time.time", return_value=100):
+            index.set("key", {"id": "1"})
+
+        with patch("brewtils.resolvers.uploads.time.time", return_value=105):
+            assert index.get("key") == {"id": "1"}
+
+        with patch("brewtils.resolvers.uploads.time.time", return_value=111):
+            assert index.get("key") is None
+
+    def test_expired_removed(self):
+        index = UploadIndex(max_age=10)
+
+        with patch("brewtils.resolvers.uploads.time.time", return_value=100):
+            index.set("old", {"id": "1"})
+
+        with patch("brewtils.resolvers.uploads.time.time", return_value=111):
+            index.set("new", {"id": "2"})
+
+        assert list(index._entries) == ["new"]
+
+    def test_lock_removed(self):
+        index = UploadIndex()
+
+        with index.lock("key"):
+            assert "key" in index._key_locks
+
+        assert index._key_locks == {}
+
+    def test_lock_exclusive(self):
+        index = UploadIndex()
+        running = []
+
+        def hold():
+            with index.lock("key"):
+                running.append(True)
+                time.sleep(0.05)
+                assert len(running) == 1
+                running.pop()
+
+        threads = [threading.Thread(target=hold) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert index._key_locks == {}
+
+    def test_persisted(self, tmpdir):
+        path = os.path.join(str(tmpdir), "uploads.json")
+
+        UploadIndex(path=path).set("key", {"id": "1"})
+        assert UploadIndex(path=path).get("key") == {"id": "1"}
+
+    def test_bad_file(self, tmpdir):
+        path = os.path.join(str(tmpdir), "uploads.json")
+        with open(path, "w") as f:
+            f.write("not json")
+
+        assert UploadIndex(path=path).get("key") is None
+
+    def test_clear(self, tmpdir):
+        path = os.path.join(str(tmpdir), "uploads.json")
+        index = UploadIndex(path=path)
+        index.set("key", {"id": "1"})
+        index.clear()
+
+        assert UploadIndex(path=path).get("key") is None
+
+    def test_shared(self, tmpdir):
+        path = os.path.join(str(tmpdir), "uploads.json")
+        assert get_upload_index(path) is get_upload_index(path)
+
+    def test_shared_default_max_age(self, tmpdir):
+        path = os.path.join(str(tmpdir), "uploads.json")
+        assert get_upload_index(path).max_age == PERSISTED_MAX_AGE
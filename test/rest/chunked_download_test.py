@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import threading
+
+import pytest
+
+from brewtils.rest.chunked_download import ChunkedDownload
+
+CHUNKS = [b"0123", b"4567", b"89"]
+
+
+def fetch(index):
+    return CHUNKS[index]
+
+
+class TestChunkedDownload(object):
+    def test_read(self):
+        with ChunkedDownload(fetch, len(CHUNKS)) as download:
+            assert download.read() == b"0123456789"
+            assert download.size == 10
+
+    def test_read_across_chunks(self):
+        with ChunkedDownload(fetch, len(CHUNKS)) as download:
+            assert download.read(3) == b"012"
+            assert download.read(6) == b"345678"
+            assert download.read(6) == b"9"
+            assert download.read(6) == b""
+
+    def test_seek(self):
+        with ChunkedDownload(fetch, len(CHUNKS)) as download:
+            assert download.seek(-3, io.SEEK_END) == 7
+            assert download.read() == b"789"
+
+            download.seek(2)
+            download.seek(3, io.SEEK_CUR)
+            assert download.tell() == 5
+            assert download.read(2) == b"56"
+
+    def test_no_chunks(self):
+        with ChunkedDownload(fetch, 0) as download:
+            assert download.read() == b""
+
+    def test_path(self, tmpdir):
+        path = os.path.join(str(tmpdir), "foo.bin")
+
+        download = ChunkedDownload(fetch, len(CHUNKS), path=path)
+        download.wait()
+        download.close()
+
+        with open(path, "rb") as f:
+            assert f.read() == b"0123456789"
+
+    def test_buffered(self):
+        download = io.BufferedReader(ChunkedDownload(fetch, len(CHUNKS)))
+        assert download.readline() == b"0123456789"
+
+    def test_read_blocks_for_chunk(self):
+        release = threading.Event()
+
+        def slow_fetch(index):
+            if index == 2:
+                release.wait()
+            return CHUNKS[index]
+
+        with ChunkedDownload(slow_fetch, len(CHUNKS)) as download:
+            assert download.read(8) == b"01234567"
+            assert download.size is None
+
+            threading.Timer(0.05, release.set).start()
+            assert download.read() == b"89"
+
+    def test_first_chunk_error(self):
+        def bad_fetch(index):
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            ChunkedDownload(bad_fetch, len(CHUNKS))
+
+    def test_chunk_error(self):
+        def bad_fetch(index):
+            if index == 2:
+                raise ValueError("Could not fetch chunk 2")
+            return CHUNKS[index]
+
+        with ChunkedDownload(bad_fetch, len(CHUNKS)) as download:
+            assert download.read(4) == b"0123"
+
+            with pytest.raises(ValueError):
+                download.read()
+
+            with pytest.raises(ValueError):
+                download.wait()
+
+    def test_bad_chunk_size(self):
+        def bad_fetch(index):
+            return b"45" if index == 1 else CHUNKS[index]
+
+        with ChunkedDownload(bad_fetch, len(CHUNKS)) as download:
+            with pytest.raises(ValueError):
+                download.wait()
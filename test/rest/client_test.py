@@ -418,6 +418,75 @@ class TestRestClient(object):
 
         assert ret == response
 
+    @pytest.fixture
+    def chunked_upload(self, client, session_mock, resolvable_chunk_dict, tmpdir):
+        path = os.path.join(str(tmpdir), "foo.bin")
+        with open(path, "wb") as f:
+            f.write(b"0123456789")
+
+        session_mock.get.return_value = Mock(
+            ok=True, json=Mock(return_value=resolvable_chunk_dict)
+        )
+        session_mock.post.return_value = Mock(ok=True)
+
+        return path, {"file_name": "foo.bin", "file_size": 10, "chunk_size": 4}
+
+    def test_post_chunked_file_chunks(self, client, session_mock, chunked_upload):
+        path, file_params = chunked_upload
+
+        with open(path, "rb") as f:
+            client.post_chunked_file(f, file_params, max_workers=3)
+
+        payloads = sorted(
+            (c[1]["json"]["offset"], c[1]["json"]["data"])
+            for c in session_mock.post.call_args_list
+        )
+        assert payloads == [(0, "MDEyMw=="), (1, "NDU2Nw=="), (2, "ODk=")]
+
+    def test_post_chunked_file_position(self, client, session_mock, chunked_upload):
+        path, file_params = chunked_upload
+
+        with open(path, "rb") as f:
+            client.post_chunked_file(f, file_params, current_position=8)
+
+        session_mock.post.assert_called_once_with(
+            ANY, json={"data": "ODk=", "offset": 0}
+        )
+
+    def test_post_chunked_file_retry(self, client, session_mock, chunked_upload):
+        path, file_params = chunked_upload
+        session_mock.post.side_effect = [
+            Mock(ok=False),
+            requests.exceptions.ConnectionError(),
+        ] + [Mock(ok=True)] * 3
+
+        with open(path, "rb") as f:
+            client.post_chunked_file(f, file_params, max_workers=1)
+
+        assert session_mock.post.call_count == 5
+
+    def test_post_chunked_file_out_of_retries(
+        self, client, session_mock, chunked_upload
+    ):
+        path, file_params = chunked_upload
+        session_mock.post.return_value = Mock(ok=False)
+
+        with pytest.raises(RuntimeError):
+            with open(path, "rb") as f:
+                client.post_chunked_file(f, file_params, max_workers=1)
+
+        assert session_mock.post.call_count == 4
+
+    def test_post_chunked_file_progress(self, client, chunked_upload):
+        path, file_params = chunked_upload
+        progress = Mock()
+
+        with open(path, "rb") as f:
+            client.post_chunked_file(f, file_params, progress=progress)
+
+        assert progress.call_count == 3
+        progress.assert_called_with(10, 10)
+
     def test_patch_admin(self, client, session_mock):
         client.patch_admin(payload="payload")
         session_mock.patch.assert_called_with(
@@ -470,3 +539,115 @@ class TestRestClient(object):
         client.get_garden("somegarden")
 
         assert get_tokens_mock.called is True
+
+
+class TestConditionalGet(object):
+    @pytest.fixture
+    def session_mock(self):
+        return MagicMock(name="session mock")
+
+    @pytest.fixture
+    def client(self, session_mock):
+        client = RestClient(bg_host="host", bg_port=80, conditional_get=True)
+        client.session = session_mock
+
+        return client
+
+    @staticmethod
+    def response(status_code=200, headers=None):
+        return Mock(
+            ok=status_code < 400, status_code=status_code, headers=headers or {}
+        )
+
+    def test_disabled_by_default(self, session_mock):
+        client = RestClient(bg_host="host", bg_port=80)
+        client.session = session_mock
+
+        client.get_systems(name="foo")
+        client.get_systems(name="foo")
+
+        session_mock.get.assert_called_with(client.system_url, params={"name": "foo"})
+
+    @pytest.mark.parametrize(
+        "headers,conditions",
+        [
+            ({"ETag": '"abc"'}, {"If-None-Match": '"abc"'}),
+            ({"Last-Modified": "then"}, {"If-Modified-Since": "then"}),
+            (
+                {"ETag": '"abc"', "Last-Modified": "then"},
+                {"If-None-Match": '"abc"', "If-Modified-Since": "then"},
+            ),
+        ],
+    )
+    def test_not_modified(self, client, session_mock, headers, conditions):
+        first = self.response(headers=headers)
+        session_mock.get.side_effect = [first, self.response(status_code=304)]
+
+        assert client.get_systems(name="foo") is first
+        assert first.brewtils_parsed == {}
+        session_mock.get.assert_called_with(
+            client.system_url, params={"name": "foo"}, headers={}
+        )
+
+        assert client.get_systems(name="foo") is first
+        session_mock.get.assert_called_with(
+            client.system_url, params={"name": "foo"}, headers=conditions
+        )
+
+    def test_modified(self, client, session_mock):
+        first = self.response(headers={"ETag": '"abc"'})
+        second = self.response(headers={"ETag": '"def"'})
+        session_mock.get.side_effect = [first, second, self.response(304)]
+
+        client.get_gardens()
+        assert client.get_gardens() is second
+        assert client.get_gardens() is second
+
+        session_mock.get.assert_called_with(
+            client.garden_url, params={}, headers={"If-None-Match": '"def"'}
+        )
+
+    def test_no_validators(self, client, session_mock):
+        session_mock.get.return_value = self.response()
+
+        client.get_config()
+        client.get_config()
+
+        session_mock.get.assert_called_with(client.config_url, params=None, headers={})
+
+    def test_error_evicts(self, client, session_mock):
+        session_mock.get.side_effect = [
+            self.response(headers={"ETag": '"abc"'}),
+            self.response(status_code=500),
+            self.response(),
+        ]
+
+        client.get_system("id")
+        client.get_system("id")
+        client.get_system("id")
+
+        session_mock.get.assert_called_with(
+            client.system_url + "id", params={}, headers={}
+        )
+
+    def test_params_are_separate(self, client, session_mock):
+        session_mock.get.return_value = self.response(headers={"ETag": '"abc"'})
+
+        client.get_logging_config(local=True)
+        client.get_logging_config(local=False)
+
+        session_mock.get.assert_called_with(
+            client.logging_url, params={"local": False}, headers={}
+        )
+
+    def test_max_size(self, client, session_mock):
+        client._conditional_cache.max_size = 1
+        session_mock.get.return_value = self.response(headers={"ETag": '"abc"'})
+
+        client.get_system("1")
+        client.get_system("2")
+        client.get_system("1")
+
+        session_mock.get.assert_called_with(
+            client.system_url + "1", params={}, headers={}
+        )
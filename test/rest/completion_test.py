@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+import json
+import ssl
+import threading
+
+import pytest
+from mock import Mock, call
+from six.moves import queue
+
+import brewtils.rest.completion
+from brewtils.errors import FetchError, RequestFailedError, TimeoutExceededError
+from brewtils.models import Request
+from brewtils.rest.completion import (
+    CompletionListener,
+    RequestPoller,
+    get_listener,
+    get_poller,
+    stop_listeners,
+    stop_pollers,
+)
+from brewtils.schema_parser import SchemaParser
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.sent = []
+        self.closed = threading.Event()
+
+    def recv(self):
+        message = self.messages.get(timeout=5)
+        if isinstance(message, Exception):
+            raise message
+        return message
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def close(self):
+        self.closed.set()
+        self.messages.put(IOError("closed"))
+
+
+def completed(bg_request, name="REQUEST_COMPLETED"):
+    return json.dumps(
+        {
+            "name": name,
+            "payload_type": "Request",
+            "payload": SchemaParser.serialize_request(bg_request, to_string=False),
+        }
+    )
+
+
+@pytest.fixture
+def connection():
+    return FakeConnection()
+
+
+@pytest.fixture
+def connect(connection):
+    return Mock(return_value=connection)
+
+
+@pytest.fixture
+def listener(connect):
+    the_listener = CompletionListener("ws://localhost/", connect=connect)
+    yield the_listener
+    the_listener.stop()
+
+
+@pytest.fixture
+def started(listener, connect):
+    listener.start()
+
+    for _ in range(500):
+        if listener.connected:
+            break
+        threading.Event().wait(0.01)
+
+    return listener
+
+
+class TestHandleMessage(object):
+    @pytest.mark.parametrize("name", ["REQUEST_COMPLETED", "REQUEST_CANCELED"])
+    def test_completes_waiter(self, listener, bg_request, name):
+        waiter = listener.watch(bg_request.id)
+
+        listener.handle_message(completed(bg_request, name=name))
+
+        assert waiter.wait(0).id == bg_request.id
+        assert listener._waiters == {}
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "not json",
+            "[]",
+            json.dumps({"name": "REQUEST_CREATED", "payload_type": "Request"}),
+            json.dumps({"name": "REQUEST_COMPLETED", "payload_type": "System"}),
+            json.dumps({"name": "REQUEST_COMPLETED", "payload_type": "Request"}),
+        ],
+    )
+    def test_ignored(self, listener, bg_request, message):
+        waiter = listener.watch(bg_request.id)
+
+        listener.handle_message(message)
+
+        assert waiter.wait(0) is None
+
+    def test_other_request(self, listener, bg_request):
+        waiter = listener.watch("other")
+
+        listener.handle_message(completed(bg_request))
+
+        assert waiter.wait(0) is None
+
+    def test_completed_before_watch(self, listener, bg_request):
+        listener.handle_message(completed(bg_request))
+
+        assert listener.watch(bg_request.id).wait(0).id == bg_request.id
+
+    def test_recent_size(self, connect, bg_request):
+        listener = CompletionListener("ws://localhost/", connect=connect, recent_size=1)
+
+        listener.handle_message(completed(bg_request))
+        bg_request.id = "other"
+        listener.handle_message(completed(bg_request))
+
+        assert list(listener._recent) == ["other"]
+
+    def test_callback(self, listener, bg_request):
+        callback = Mock()
+        listener.watch(bg_request.id, callback=callback)
+
+        listener.handle_message(completed(bg_request))
+
+        assert callback.call_args[0][0].id == bg_request.id
+
+    def test_callback_completed_before_watch(self, listener, bg_request):
+        callback = Mock()
+        listener.handle_message(completed(bg_request))
+
+        listener.watch(bg_request.id, callback=callback)
+
+        assert callback.call_args[0][0].id == bg_request.id
+
+    def test_callback_error(self, listener, bg_request):
+        waiter = listener.watch(bg_request.id, callback=Mock(side_effect=ValueError))
+
+        listener.handle_message(completed(bg_request))
+
+        assert waiter.wait(0).id == bg_request.id
+
+    def test_subscribe(self, listener):
+        callback = Mock()
+        listener.subscribe(["SYSTEM_UPDATED"], callback)
+
+        listener.handle_message(json.dumps({"name": "SYSTEM_UPDATED"}))
+        listener.handle_message(json.dumps({"name": "SYSTEM_CREATED"}))
+
+        callback.assert_called_once_with({"name": "SYSTEM_UPDATED"})
+
+    def test_subscribe_error(self, listener, bg_request):
+        listener.subscribe(["REQUEST_COMPLETED"], Mock(side_effect=ValueError))
+        waiter = listener.watch(bg_request.id)
+
+        listener.handle_message(completed(bg_request))
+
+        assert waiter.wait(0).id == bg_request.id
+
+    def test_unwatch(self, listener, bg_request):
+        waiter = listener.watch(bg_request.id)
+        listener.unwatch(waiter)
+
+        assert listener._waiters == {}
+
+        # Unwatching twice is harmless
+        listener.unwatch(waiter)
+
+
+class TestRun(object):
+    def test_receives_events(self, started, connection, bg_request):
+        waiter = started.watch(bg_request.id)
+
+        connection.messages.put(completed(bg_request))
+
+        assert waiter.wait(5).id == bg_request.id
+
+    def test_token(self, connect, connection):
+        listener = CompletionListener(
+            "ws://localhost/", token_provider=lambda: "token", connect=connect
+        )
+        listener._open()
+
+        connect.assert_called_once_with(
+            "ws://localhost/", header=["Authorization: Bearer token"]
+        )
+        assert json.loads(connection.sent[0]) == {
+            "name": "UPDATE_TOKEN",
+            "payload": "token",
+        }
+
+    def test_disconnect_wakes_waiters(self, started, connection, bg_request):
+        waiter = started.watch(bg_request.id)
+
+        connection.messages.put(IOError("connection lost"))
+
+        assert waiter.wait(5) is None
+        assert waiter._event.is_set() is False
+
+    def test_reconnects(self, connect, bg_request):
+        connections = [FakeConnection(), FakeConnection()]
+        connect.side_effect = connections
+
+        listener = CompletionListener(
+            "ws://localhost/", connect=connect, reconnect_delay=0.01
+        )
+        listener.start()
+
+        try:
+            connections[0].messages.put(IOError("connection lost"))
+
+            waiter = listener.watch(bg_request.id)
+            connections[1].messages.put(completed(bg_request))
+
+            # The waiter may be woken by the reconnection before the event arrives
+            for _ in range(3):
+                request = waiter.wait(5)
+                if request:
+                    break
+
+            assert request.id == bg_request.id
+        finally:
+            listener.stop()
+
+        assert connect.call_count == 2
+
+    def test_stop(self, started, connection):
+        started.stop()
+
+        assert connection.closed.is_set()
+        assert started.connected is False
+
+
+class TestGetListener(object):
+    @pytest.fixture(autouse=True)
+    def listener_class(self, monkeypatch):
+        listener_class = Mock()
+        monkeypatch.setattr(
+            brewtils.rest.completion, "CompletionListener", listener_class
+        )
+        yield listener_class
+        stop_listeners()
+
+    @pytest.fixture
+    def rest_client(self):
+        return Mock(base_url="http://localhost:2337/", access_token="token")
+
+    def test_shared(self, listener_class, rest_client):
+        listener = get_listener(rest_client)
+
+        assert get_listener(rest_client) is listener
+        assert listener_class.call_count == 1
+        assert listener_class.call_args[0][0] == (
+            "ws://localhost:2337/api/v1/socket/events/"
+        )
+        assert listener.start.call_count == 2
+
+    def test_ssl(self, listener_class, rest_client):
+        rest_client.base_url = "https://localhost:2337/prefix/"
+        rest_client.session.verify = False
+        rest_client.session.cert = ("cert", "key")
+
+        get_listener(rest_client)
+
+        args, kwargs = listener_class.call_args
+        assert args[0] == "wss://localhost:2337/prefix/api/v1/socket/events/"
+        assert kwargs["sslopt"] == {
+            "cert_reqs": ssl.CERT_NONE,
+            "certfile": "cert",
+            "keyfile": "key",
+        }
+        assert kwargs["token_provider"]() == "token"
+
+    def test_config(self, listener_class, rest_client):
+        get_listener(rest_client)
+
+        rest_client.username = "other"
+        get_listener(rest_client)
+
+        rest_client.session.verify = False
+        get_listener(rest_client)
+        get_listener(rest_client)
+
+        assert listener_class.call_count == 3
+
+    def test_not_installed(self, listener_class, rest_client):
+        listener_class.side_effect = ImportError
+
+        assert get_listener(rest_client) is None
+
+
+def in_progress(request_id):
+    return Request(id=request_id, status="IN_PROGRESS")
+
+
+def success(request_id):
+    return Request(id=request_id, status="SUCCESS", output="output")
+
+
+class TestRequestPoller(object):
+    @pytest.fixture
+    def easy_client(self):
+        return Mock(name="easy_client")
+
+    @pytest.fixture
+    def poller(self, easy_client):
+        the_poller = RequestPoller(easy_client, batch_size=2)
+        yield the_poller
+        the_poller.stop()
+
+    def test_stop(self, poller):
+        future = poller.submit(in_progress("1"))
+        poller.stop()
+
+        with pytest.raises(FetchError):
+            future.result(0)
+        assert poller.pending == 0
+
+    def test_already_complete(self, poller):
+        future = poller.submit(success("1"))
+
+        assert future.result(0).status == "SUCCESS"
+        assert poller.pending == 0
+
+    def test_batch(self, poller, easy_client):
+        futures = [poller.submit(in_progress(str(i))) for i in range(3)]
+        requests = {"0": success("0"), "1": in_progress("1"), "2": success("2")}
+        easy_client.find_unique_request.side_effect = lambda id: requests[id]
+
+        assert poller.poll() == 1
+        assert easy_client.find_unique_request.call_count == 2
+        assert futures[0].result(0).status == "SUCCESS"
+        assert futures[1].done() is False
+        assert futures[2].done() is False
+
+        # The Request that wasn't checked goes first next time
+        assert poller.poll() == 1
+        assert easy_client.find_unique_request.call_args_list[2] == call(id="2")
+        assert futures[2].result(0).status == "SUCCESS"
+        assert poller.pending == 1
+        assert easy_client.find_requests.called is False
+
+    def test_same_request(self, poller, easy_client):
+        futures = [poller.submit(in_progress("1")) for _ in range(2)]
+        easy_client.find_unique_request.return_value = success("1")
+
+        poller.poll()
+
+        easy_client.find_unique_request.assert_called_once_with(id="1")
+        assert all(f.result(0).status == "SUCCESS" for f in futures)
+
+    def test_not_found(self, poller, easy_client):
+        future = poller.submit(in_progress("1"))
+        easy_client.find_unique_request.return_value = None
+
+        poller.poll()
+
+        with pytest.raises(FetchError):
+            future.result(0)
+
+    def test_query_error(self, poller, easy_client):
+        future = poller.submit(in_progress("1"))
+        easy_client.find_unique_request.side_effect = ValueError
+
+        assert poller.poll() == 0
+        assert future.done() is False
+
+    def test_raise_on_error(self, poller, easy_client):
+        future = poller.submit(in_progress("1"), raise_on_error=True)
+        easy_client.find_unique_request.return_value = Request(id="1", status="ERROR")
+
+        poller.poll()
+
+        with pytest.raises(RequestFailedError):
+            future.result(0)
+
+    def test_timeout(self, poller, easy_client):
+        future = poller.submit(in_progress("1"), timeout=0.001)
+        threading.Event().wait(0.01)
+
+        poller.poll()
+
+        with pytest.raises(TimeoutExceededError):
+            future.result(0)
+        assert easy_client.find_unique_request.called is False
+
+    def test_thread(self, easy_client):
+        poller = RequestPoller(easy_client, interval=0.01)
+        easy_client.find_unique_request.side_effect = [in_progress("1"), success("1")]
+        poller.start()
+
+        try:
+            assert poller.submit(in_progress("1")).result(5).status == "SUCCESS"
+        finally:
+            poller.stop()
+
+        assert easy_client.find_unique_request.call_count == 2
+
+    def test_thread_timeout(self, easy_client):
+        poller = RequestPoller(easy_client, interval=60)
+        poller.start()
+
+        try:
+            future = poller.submit(in_progress("1"), timeout=0.01)
+
+            with pytest.raises(TimeoutExceededError):
+                future.result(5)
+        finally:
+            poller.stop()
+
+    def test_listener(self, easy_client, listener, bg_request):
+        poller = RequestPoller(easy_client, listener=listener)
+
+        future = poller.submit(in_progress(bg_request.id))
+        listener.handle_message(completed(bg_request))
+
+        assert future.result(0).id == bg_request.id
+        assert poller.pending == 0
+
+    def test_listener_unwatched(self, easy_client, listener):
+        poller = RequestPoller(easy_client, listener=listener)
+        easy_client.find_unique_request.return_value = success("1")
+
+        future = poller.submit(in_progress("1"))
+        poller.poll()
+
+        assert future.result(0).status == "SUCCESS"
+        assert listener._waiters == {}
+
+
+class TestGetPoller(object):
+    @pytest.fixture(autouse=True)
+    def poller_class(self, monkeypatch):
+        poller_class = Mock()
+        monkeypatch.setattr(brewtils.rest.completion, "RequestPoller", poller_class)
+        yield poller_class
+        stop_pollers()
+
+    def test_shared(self, poller_class):
+        easy_client = Mock()
+        easy_client.client.base_url = "http://localhost:2337/"
+
+        poller = get_poller(easy_client, max_interval=5)
+
+        assert get_poller(easy_client, max_interval=5) is poller
+        poller_class.assert_called_once_with(easy_client, listener=None, max_interval=5)
+        assert poller.start.call_count == 2
+
+    def test_config(self, poller_class):
+        easy_client = Mock()
+        easy_client.client.base_url = "http://localhost:2337/"
+        other_client = Mock()
+        other_client.client.base_url = "http://localhost:2337/"
+        other_client.client.username = "other"
+
+        get_poller(easy_client)
+        get_poller(easy_client, max_interval=5)
+        get_poller(easy_client, listener=Mock())
+        get_poller(other_client)
+        get_poller(other_client)
+
+        assert poller_class.call_count == 4
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import copy
+import os
 import warnings
 from base64 import b64decode, b64encode
 
@@ -428,6 +429,187 @@ def test_publish_event(client, rest_client, success, bg_event):
     assert client.publish_event(bg_event) is True
 
 
+class TestParsedResponses(object):
+    def test_reused(self, client, rest_client, parser, success):
+        success.brewtils_parsed = {}
+        rest_client.get_systems.return_value = success
+
+        first = client.find_systems()
+        second = client.find_systems()
+
+        assert first is second
+        assert parser.parse_system.call_count == 1
+
+    def test_not_reused(self, client, rest_client, parser, success):
+        rest_client.get_systems.return_value = success
+
+        client.find_systems()
+        client.find_systems()
+
+        assert parser.parse_system.call_count == 2
+
+
+class TestCreateRequests(object):
+    @pytest.fixture
+    def client(self, rest_client):
+        client = EasyClient(host="localhost", port="3000", api_version=1)
+        client.client = rest_client
+        return client
+
+    @pytest.fixture
+    def requests(self, bg_request):
+        requests = []
+        for i in range(5):
+            request = copy.deepcopy(bg_request)
+            request.id = None
+            request.parameters = {"i": i}
+            requests.append(request)
+        return requests
+
+    @staticmethod
+    def response(status_code, body):
+        return Mock(ok=status_code < 300, status_code=status_code, json=lambda: body)
+
+    @staticmethod
+    def created(payload):
+        """Server response for a serialized Request or list of Requests"""
+        many = payload.startswith("[")
+        requests = SchemaParser.parse_request(payload, from_string=True, many=many)
+
+        for request in requests if many else [requests]:
+            request.id = str(request.parameters["i"])
+
+        return SchemaParser.serialize_request(requests, to_string=False, many=many)
+
+    def test_batches(self, client, rest_client, requests):
+        rest_client.post_requests.side_effect = lambda payload, **kwargs: (
+            self.response(201, self.created(payload))
+        )
+
+        results = client.create_requests(requests, batch_size=2, blocking=False)
+
+        assert [r.id for r in results] == ["0", "1", "2", "3", "4"]
+        assert rest_client.post_requests.call_count == 3
+        rest_client.post_requests.assert_called_with(ANY, blocking=False)
+        assert client._bulk_requests_supported is True
+
+    @pytest.mark.parametrize(
+        "status_code,body",
+        [
+            (400, {"message": "{'_schema': ['Invalid input type.']}"}),
+            (404, "Not Found"),
+            (405, "Method Not Allowed"),
+            (415, "Unsupported Media Type"),
+        ],
+    )
+    def test_unsupported(self, client, rest_client, requests, status_code, body):
+        def post(payload, **kwargs):
+            if payload.startswith("["):
+                return self.response(status_code, body)
+            return self.response(201, self.created(payload))
+
+        rest_client.post_requests.side_effect = post
+
+        results = client.create_requests(requests, batch_size=2)
+
+        assert [r.id for r in results] == ["0", "1", "2", "3", "4"]
+        assert client._bulk_requests_supported is False
+
+        # One rejected batch, then everything posted individually
+        assert rest_client.post_requests.call_count == 6
+
+    def test_invalid_batch(self, client, rest_client, requests):
+        # A batch rejected for one bad Request doesn't stop later batches
+        def post(payload, **kwargs):
+            if '"i": 1' in payload:
+                return self.response(400, {"message": "Invalid parameter"})
+            return self.response(201, self.created(payload))
+
+        rest_client.post_requests.side_effect = post
+
+        results = client.create_requests(requests, batch_size=2)
+
+        assert results[0].id == "0"
+        assert isinstance(results[1], ValidationError)
+        assert [r.id for r in results[2:]] == ["2", "3", "4"]
+        assert client._bulk_requests_supported is True
+
+        # Rejected batch, two individual posts, then two more batches
+        assert rest_client.post_requests.call_count == 5
+        assert rest_client.post_requests.call_args_list[3][0][0].startswith("[")
+
+    def test_item_errors(self, client, rest_client, requests):
+        def post(payload, **kwargs):
+            if payload.startswith("[") or '"i": 1' in payload:
+                return self.response(400, "Invalid")
+            return self.response(201, self.created(payload))
+
+        rest_client.post_requests.side_effect = post
+
+        results = client.create_requests(requests[:3])
+
+        assert results[0].id == "0"
+        assert isinstance(results[1], ValidationError)
+        assert results[2].id == "2"
+
+    def test_all_failed(self, client, rest_client, requests):
+        rest_client.post_requests.return_value = self.response(400, "Invalid")
+
+        results = client.create_requests(requests[:2])
+
+        assert all(isinstance(r, ValidationError) for r in results)
+        assert client._bulk_requests_supported is None
+
+    def test_unexpected_response(self, client, rest_client, requests):
+        rest_client.post_requests.return_value = self.response(201, {"not": "a list"})
+
+        results = client.create_requests(requests[:2])
+
+        assert all(isinstance(r, SaveError) for r in results)
+        assert rest_client.post_requests.call_count == 1
+
+    @pytest.mark.parametrize("status_code", [408, 500, 503])
+    def test_server_error(self, client, rest_client, requests, status_code):
+        rest_client.post_requests.return_value = self.response(status_code, "Error")
+
+        results = client.create_requests(requests[:2])
+
+        assert all(isinstance(r, RestError) for r in results)
+        assert rest_client.post_requests.call_count == 1
+
+    def test_connection_error(self, client, rest_client, requests):
+        def post(payload, **kwargs):
+            if '"i": 2' in payload:
+                raise RestConnectionError("Down")
+            return self.response(201, self.created(payload))
+
+        rest_client.post_requests.side_effect = post
+
+        results = client.create_requests(requests, batch_size=2)
+
+        assert [r.id for r in results[:2]] == ["0", "1"]
+        assert all(isinstance(r, RestConnectionError) for r in results[2:4])
+        assert results[4].id == "4"
+
+    def test_single(self, client, rest_client, requests):
+        rest_client.post_requests.side_effect = lambda payload, **kwargs: (
+            self.response(201, self.created(payload))
+        )
+
+        results = client.create_requests(requests[:1])
+
+        assert results[0].id == "0"
+        assert rest_client.post_requests.call_args[0][0].startswith("{")
+
+    def test_empty(self, client, rest_client):
+        assert client.create_requests([]) == []
+        assert rest_client.post_requests.called is False
+
+    def test_bad_batch_size(self, client, requests):
+        with pytest.raises(ValueError):
+            client.create_requests(requests, batch_size=0)
+
+
 class TestQueues(object):
     def test_get(self, client, rest_client, success):
         rest_client.get_queues.return_value = success
@@ -580,6 +762,33 @@ class TestChunked(object):
         byte_obj = client.download_chunked_file("file_id")
         assert byte_obj.read() == b64decode(file_data)
 
+    def test_download_chunked_file_streaming(self, client, rest_client, tmpdir):
+        chunks = [b"0123", b"4567", b"89"]
+
+        client._check_chunked_file_validity = Mock(
+            return_value=(True, {"file_id": "file_id", "number_of_chunks": 3})
+        )
+        rest_client.get_chunked_file.side_effect = lambda file_id, params: Mock(
+            ok=True,
+            json=Mock(return_value={"data": b64encode(chunks[params["chunk"]])}),
+        )
+
+        path = os.path.join(str(tmpdir), "foo.bin")
+        with client.download_chunked_file("file_id", path=path) as file_obj:
+            assert file_obj.read() == b"0123456789"
+
+        with open(path, "rb") as f:
+            assert f.read() == b"0123456789"
+
+    def test_download_chunked_file_streaming_error(self, client, rest_client):
+        client._check_chunked_file_validity = Mock(
+            return_value=(True, {"file_id": "file_id", "number_of_chunks": 3})
+        )
+        rest_client.get_chunked_file.return_value = Mock(ok=False)
+
+        with pytest.raises(ValueError):
+            client.download_chunked_file("file_id", streaming=True)
+
     def test_upload_chunked_file(
         self,
         client,
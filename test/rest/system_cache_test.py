@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import pytest
+from mock import Mock
+
+import brewtils.rest.system_cache
+from brewtils.rest.system_cache import SYSTEM_EVENTS, SystemCache, get_system_cache
+
+KEY = ("http://localhost/", "ns", "system", "latest")
+
+
+@pytest.fixture
+def cache():
+    return SystemCache()
+
+
+@pytest.fixture
+def now(monkeypatch):
+    now = Mock(return_value=1000.0)
+    monkeypatch.setattr(brewtils.rest.system_cache.time, "time", now)
+    return now
+
+
+class TestGet(object):
+    def test_missing(self, cache):
+        assert cache.get(KEY, 60) is None
+
+    def test_hit(self, cache, now, bg_system):
+        cache.set(KEY, bg_system)
+        now.return_value += 60
+
+        assert cache.get(KEY, 60) is bg_system
+
+    def test_expired(self, cache, now, bg_system):
+        cache.set(KEY, bg_system)
+        now.return_value += 61
+
+        assert cache.get(KEY, 60) is None
+
+        # A different client may accept older definitions
+        assert cache.get(KEY, 120) is bg_system
+
+
+class TestInvalidate(object):
+    @pytest.fixture
+    def keys(self, cache, bg_system):
+        keys = [
+            KEY,
+            ("http://localhost/", "ns", "system", "1.0.0"),
+            ("http://localhost/", "other_ns", "system", "latest"),
+            ("http://localhost/", "ns", "other", "latest"),
+        ]
+        for key in keys:
+            cache.set(key, bg_system)
+        return keys
+
+    def remaining(self, cache, keys):
+        return [key for key in keys if cache.get(key, 60)]
+
+    def test_key(self, cache, keys):
+        cache.invalidate(key=KEY)
+        assert self.remaining(cache, keys) == keys[1:]
+
+    def test_name(self, cache, keys):
+        cache.invalidate(name="system")
+        assert self.remaining(cache, keys) == keys[3:]
+
+    def test_namespace_and_name(self, cache, keys):
+        cache.invalidate(namespace="ns", name="system")
+        assert self.remaining(cache, keys) == keys[2:]
+
+    def test_clear(self, cache, keys):
+        cache.clear()
+        assert self.remaining(cache, keys) == []
+
+
+class TestEvents(object):
+    def test_handle_event(self, cache, bg_system):
+        cache.set(KEY, bg_system)
+        cache.set(("http://localhost/", "ns", "other", "latest"), bg_system)
+
+        cache.handle_event({"name": "SYSTEM_UPDATED", "payload": {"name": "system"}})
+
+        assert cache.get(KEY, 60) is None
+        assert cache.get(("http://localhost/", "ns", "other", "latest"), 60)
+
+    def test_handle_event_no_payload(self, cache, bg_system):
+        cache.set(KEY, bg_system)
+
+        cache.handle_event({"name": "SYSTEM_REMOVED"})
+
+        assert cache.get(KEY, 60) is None
+
+    def test_subscribe(self, cache):
+        listener = Mock()
+
+        cache.subscribe(listener)
+        cache.subscribe(listener)
+
+        listener.subscribe.assert_called_once_with(SYSTEM_EVENTS, cache.handle_event)
+
+
+def test_get_system_cache():
+    assert get_system_cache() is get_system_cache()
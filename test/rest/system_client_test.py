@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 import logging
+import os
 import warnings
-from concurrent.futures import wait
+import threading
+from concurrent.futures import Future, wait
 
 import pytest
-from mock import Mock, call
+from mock import MagicMock, Mock, call
 from pytest_lazyfixture import lazy_fixture
 
 import brewtils.rest
+from brewtils import tracing
 from brewtils.errors import (
     FetchError,
     RequestFailedError,
@@ -15,6 +18,7 @@ from brewtils.errors import (
     TimeoutExceededError,
     ValidationError,
 )
+from brewtils.resolvers.uploads import PERSISTED_MAX_AGE
 from brewtils.rest.system_client import SystemClient
 
 
@@ -40,6 +44,7 @@ def easy_client(monkeypatch, bg_system):
     mock.find_systems.return_value = [bg_system]
     mock.client.bg_host = "localhost"
     mock.client.bg_port = 3000
+    mock.client.base_url = "http://localhost:3000/"
 
     monkeypatch.setattr(
         brewtils.rest.system_client, "EasyClient", Mock(return_value=mock)
@@ -364,6 +369,36 @@ class TestExecute(object):
         assert easy_client.create_request.call_count == 2
 
 
+class TestTracing(object):
+    @pytest.fixture
+    def tracer(self):
+        tracer = tracing.set_tracer(MagicMock(spec=tracing.Tracer))
+        tracer.inject.return_value = {"traceparent": "00-trace-span-01"}
+        yield tracer
+        tracing.set_tracer()
+
+    def test_send_bg_request(self, client, easy_client, mock_success, tracer):
+        easy_client.create_request.return_value = mock_success
+
+        client.speak()
+
+        assert tracer.span.call_args[0][0] == "send_bg_request"
+        assert tracer.span.call_args[1]["attributes"]["brewtils.request.command"] == (
+            "speak"
+        )
+
+        request = easy_client.create_request.call_args[0][0]
+        assert request.metadata["trace_context"] == {"traceparent": "00-trace-span-01"}
+
+    def test_disabled(self, client, easy_client, mock_success):
+        easy_client.create_request.return_value = mock_success
+
+        client.speak()
+
+        request = easy_client.create_request.call_args[0][0]
+        assert "trace_context" not in request.metadata
+
+
 class TestExecuteNonBlocking(object):
     @pytest.mark.usefixtures("sleep_patch")
     def test_speak(self, client, easy_client, mock_success, mock_in_progress):
@@ -481,6 +516,350 @@ class TestWaitForRequest(object):
                 future.result()
 
 
+class TestCompletionEvents(object):
+    @pytest.fixture
+    def listener(self, monkeypatch):
+        listener = Mock(connected=True)
+        monkeypatch.setattr(
+            brewtils.rest.system_client.completion,
+            "get_listener",
+            Mock(return_value=listener),
+        )
+        return listener
+
+    @pytest.fixture
+    def waiter(self, listener):
+        return listener.watch.return_value
+
+    @pytest.fixture
+    def client(self, listener):
+        return SystemClient(
+            bg_host="localhost",
+            bg_port=3000,
+            system_name="system",
+            completion_events=True,
+        )
+
+    def test_disabled(self, monkeypatch):
+        get_listener = Mock()
+        monkeypatch.setattr(
+            brewtils.rest.system_client.completion, "get_listener", get_listener
+        )
+
+        SystemClient(bg_host="localhost", bg_port=3000, system_name="system")
+
+        assert get_listener.called is False
+
+    @pytest.mark.usefixtures("sleep_patch")
+    def test_event(
+        self, client, easy_client, listener, waiter, mock_in_progress, mock_success
+    ):
+        easy_client.create_request.return_value = mock_in_progress
+        waiter.wait.return_value = mock_success
+
+        assert client.speak() == mock_success
+        listener.watch.assert_called_once_with(mock_in_progress.id)
+        listener.unwatch.assert_called_once_with(waiter)
+        assert easy_client.find_unique_request.called is False
+
+    def test_already_complete(self, client, easy_client, listener, mock_success):
+        easy_client.create_request.return_value = mock_success
+
+        assert client.speak() == mock_success
+        assert listener.watch.called is False
+
+    def test_missed_event(
+        self, client, easy_client, waiter, mock_in_progress, mock_success
+    ):
+        easy_client.create_request.return_value = mock_in_progress
+        easy_client.find_unique_request.return_value = mock_success
+        waiter.wait.return_value = None
+
+        assert client.speak() == mock_success
+        waiter.wait.assert_called_once_with(client._max_delay)
+
+    def test_disconnected(
+        self,
+        client,
+        easy_client,
+        listener,
+        waiter,
+        sleep_patch,
+        mock_in_progress,
+        mock_success,
+    ):
+        listener.connected = False
+        easy_client.create_request.return_value = mock_in_progress
+        easy_client.find_unique_request.side_effect = [mock_in_progress, mock_success]
+
+        assert client.speak() == mock_success
+        sleep_patch.assert_has_calls([call(0.5), call(1.0)])
+        assert waiter.wait.called is False
+        listener.unwatch.assert_called_once_with(waiter)
+
+    def test_timeout(self, client, easy_client, listener, waiter, mock_in_progress):
+        easy_client.create_request.return_value = mock_in_progress
+        easy_client.find_unique_request.return_value = mock_in_progress
+        waiter.wait.return_value = None
+
+        with pytest.raises(TimeoutExceededError):
+            client.speak(_timeout=0.01)
+
+        assert waiter.wait.call_args_list[0] == call(0.01)
+        listener.unwatch.assert_called_once_with(waiter)
+
+
+class TestBulkPolling(object):
+    @pytest.fixture
+    def poller(self, monkeypatch):
+        poller = Mock()
+        monkeypatch.setattr(
+            brewtils.rest.system_client.completion,
+            "get_poller",
+            Mock(return_value=poller),
+        )
+        return poller
+
+    @pytest.fixture
+    def client(self, poller):
+        return SystemClient(
+            bg_host="localhost",
+            bg_port=3000,
+            system_name="system",
+            bulk_polling=True,
+            max_delay=5,
+        )
+
+    def test_get_poller(self, client, easy_client):
+        brewtils.rest.system_client.completion.get_poller.assert_called_once_with(
+            easy_client, listener=None, max_interval=5
+        )
+
+    def test_non_blocking(self, client, easy_client, poller, mock_in_progress):
+        easy_client.create_request.return_value = mock_in_progress
+
+        future = client.speak(_blocking=False, _raise_on_error=True, _timeout=10)
+
+        assert future == poller.submit.return_value
+        poller.submit.assert_called_once_with(mock_in_progress, True, 10)
+
+    @pytest.mark.usefixtures("sleep_patch")
+    def test_blocking(
+        self, client, easy_client, poller, mock_in_progress, mock_success
+    ):
+        easy_client.create_request.return_value = mock_in_progress
+        easy_client.find_unique_request.return_value = mock_success
+
+        assert client.speak() == mock_success
+        assert poller.submit.called is False
+
+
+class TestSystemCache(object):
+    @pytest.fixture(autouse=True)
+    def cache(self):
+        cache = brewtils.rest.system_client.get_system_cache()
+        cache.clear()
+        yield cache
+        cache.clear()
+
+    @pytest.fixture
+    def client(self):
+        return SystemClient(
+            bg_host="localhost", bg_port=3000, system_name="system", system_cache_ttl=60
+        )
+
+    def test_shared(self, client, easy_client, bg_system):
+        client.load_bg_system()
+        other = SystemClient(
+            bg_host="localhost", bg_port=3000, system_name="system", system_cache_ttl=60
+        )
+        other.load_bg_system()
+
+        assert other.bg_system is bg_system
+        assert easy_client.find_systems.call_count == 1
+
+    def test_always_update(self, easy_client, mock_success):
+        client = SystemClient(
+            bg_host="localhost",
+            bg_port=3000,
+            system_name="system",
+            system_cache_ttl=60,
+            always_update=True,
+        )
+        easy_client.create_request.return_value = mock_success
+
+        client.speak()
+        client.speak()
+
+        assert easy_client.find_systems.call_count == 1
+
+    def test_not_cached(self, cache, easy_client):
+        for _ in range(2):
+            SystemClient(
+                bg_host="localhost", bg_port=3000, system_name="system"
+            ).load_bg_system()
+
+        assert easy_client.find_systems.call_count == 2
+
+    def test_different_constraint(self, client, easy_client):
+        client.load_bg_system()
+        SystemClient(
+            bg_host="localhost",
+            bg_port=3000,
+            system_name="system",
+            version_constraint="1.0.0",
+            system_cache_ttl=60,
+        ).load_bg_system()
+
+        assert easy_client.find_systems.call_count == 1
+        assert easy_client.find_unique_system.call_count == 1
+
+    def test_not_found(self, client, easy_client):
+        easy_client.find_systems.return_value = []
+
+        with pytest.raises(FetchError):
+            client.load_bg_system()
+        with pytest.raises(FetchError):
+            client.load_bg_system()
+
+        assert easy_client.find_systems.call_count == 2
+
+    def test_invalidated_on_validation_error(
+        self, client, easy_client, bg_system, bg_system_2, mock_success
+    ):
+        client.load_bg_system()
+        easy_client.find_systems.return_value = [bg_system, bg_system_2]
+        easy_client.create_request.side_effect = [ValidationError, mock_success]
+
+        assert client.speak() == mock_success
+        assert client.bg_system is bg_system_2
+        assert easy_client.find_systems.call_count == 2
+
+    def test_subscribes_listener(self, monkeypatch, cache):
+        listener = Mock()
+        monkeypatch.setattr(
+            brewtils.rest.system_client.completion,
+            "get_listener",
+            Mock(return_value=listener),
+        )
+        subscribe = Mock()
+        monkeypatch.setattr(cache, "subscribe", subscribe)
+
+        SystemClient(
+            bg_host="localhost",
+            bg_port=3000,
+            system_name="system",
+            system_cache_ttl=60,
+            completion_events=True,
+        )
+
+        subscribe.assert_called_once_with(listener)
+
+
+def done(result=None, exception=None):
+    future = Future()
+    if exception:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+    return future
+
+
+class TestMap(object):
+    @pytest.fixture
+    def send(self, client):
+        send = Mock(side_effect=lambda **kwargs: done(kwargs.get("number")))
+        client.send_bg_request = send
+        return send
+
+    def test_results(self, client, send):
+        params = [{"number": n} for n in range(5)]
+
+        assert list(client.map("speak", params, concurrency=2)) == list(range(5))
+        assert send.call_count == 5
+        assert send.call_args[1]["_blocking"] is False
+        assert send.call_args[1]["_command"] == "speak"
+
+    def test_common_kwargs(self, client, send):
+        list(client.map("speak", [{"number": 1}], _timeout=5, _comment="hi"))
+
+        assert send.call_args[1]["_timeout"] == 5
+        assert send.call_args[1]["_comment"] == "hi"
+        assert send.call_args[1]["number"] == 1
+
+    def test_lazy(self, client, send):
+        results = client.map("speak", ({"number": n} for n in range(10)), concurrency=2)
+
+        assert send.call_count == 0
+        assert next(results) == 0
+        assert send.call_count == 2
+
+    def test_ordered(self, client, send):
+        first = Future()
+        send.side_effect = [first, done(1), done(2)]
+        threading.Timer(0.05, first.set_result, args=(0,)).start()
+
+        assert list(client.map("speak", [{}] * 3)) == [0, 1, 2]
+
+    def test_unordered(self, client, send):
+        first = Future()
+        send.side_effect = [first, done(1), done(2)]
+
+        results = client.map("speak", [{}] * 3, ordered=False)
+
+        assert next(results) == 1
+        assert next(results) == 2
+
+        first.set_result(0)
+        assert list(results) == [0]
+
+    def test_raises(self, client, send):
+        send.side_effect = [done(0), ValidationError("bad"), done(2)]
+
+        results = client.map("speak", [{}] * 3, concurrency=1)
+
+        assert next(results) == 0
+        with pytest.raises(ValidationError):
+            next(results)
+        assert send.call_count == 2
+
+    def test_return_exceptions(self, client, send):
+        failed = RequestFailedError(Mock())
+        send.side_effect = [ValidationError("bad"), done(exception=failed), done(2)]
+
+        results = list(client.map("speak", [{}] * 3, return_exceptions=True))
+
+        assert isinstance(results[0], ValidationError)
+        assert results[1] is failed
+        assert results[2] == 2
+
+    def test_close(self, client, send):
+        waiting = Future()
+        send.side_effect = [done(0), waiting, done(2)]
+
+        results = client.map("speak", [{}] * 3, concurrency=2, ordered=False)
+        assert next(results) == 0
+
+        results.close()
+
+        assert waiting.cancelled()
+        assert send.call_count == 2
+
+    def test_bad_command(self, client):
+        with pytest.raises(AttributeError):
+            client.map("bad_command", [{}])
+
+    def test_bad_concurrency(self, client):
+        with pytest.raises(ValueError):
+            client.map("speak", [{}], concurrency=-1)
+
+    def test_send(self, client, easy_client, mock_success):
+        easy_client.create_request.return_value = mock_success
+
+        assert list(client.map("speak", [{"message": "hi"}])) == [mock_success]
+        assert easy_client.create_request.call_args[1]["blocking"] is False
+
+
 @pytest.mark.parametrize(
     "latest,versions",
     [
@@ -499,3 +878,66 @@ class TestWaitForRequest(object):
 def test_determine_latest(client, versions, latest):
     systems = [Mock(version=version) for version in versions]
     assert client._determine_latest(systems).version == latest
+
+
+class TestDedupeUploads(object):
+    def test_default(self):
+        client = SystemClient(bg_host="localhost", bg_port=3000, system_name="system")
+        assert client._resolver.upload_index is None
+
+    def test_session(self):
+        kwargs = dict(
+            bg_host="localhost", bg_port=3000, system_name="system", dedupe_uploads=True
+        )
+        client = SystemClient(**kwargs)
+
+        assert client._resolver.upload_index is not None
+        assert client._resolver.upload_index.path is None
+        assert client._resolver.upload_index.max_age is None
+        assert client._resolver.upload_scope.startswith("http://localhost:3000/")
+        assert (
+            SystemClient(**kwargs)._resolver.upload_index
+            is not client._resolver.upload_index
+        )
+
+    def test_persisted(self, tmpdir):
+        kwargs = dict(
+            bg_host="localhost",
+            bg_port=3000,
+            system_name="system",
+            upload_index=os.path.join(str(tmpdir), "uploads.json"),
+            upload_index_max_age=60,
+        )
+        client = SystemClient(**kwargs)
+
+        assert client._resolver.upload_index.max_age == 60
+        assert (
+            SystemClient(**kwargs)._resolver.upload_index
+            is client._resolver.upload_index
+        )
+
+    def test_persisted_default_max_age(self, tmpdir):
+        client = SystemClient(
+            bg_host="localhost",
+            bg_port=3000,
+            system_name="system",
+            upload_index=os.path.join(str(tmpdir), "uploads.json"),
+        )
+
+        assert client._resolver.upload_index.max_age == PERSISTED_MAX_AGE
+
+    def test_scope(self, easy_client):
+        scopes = set()
+        for url, namespace in [
+            ("http://a/", "a"),
+            ("http://a/", "b"),
+            ("http://b/", "a"),
+        ]:
+            easy_client.client.base_url = url
+            scopes.add(
+                SystemClient(
+                    system_name="system", system_namespace=namespace
+                )._resolver.upload_scope
+            )
+
+        assert len(scopes) == 3
@@ -854,3 +854,45 @@ class TestRoundTrip(object):
 
         assert len(serialized) == 1
         assert serialized[0] == patch_dict_no_envelop
+
+
+class TestSchemaCache(object):
+    def test_reuse(self):
+        assert SchemaParser._get_schema("SystemSchema") is SchemaParser._get_schema(
+            "SystemSchema"
+        )
+
+    @pytest.mark.parametrize(
+        "kwargs1,kwargs2",
+        [
+            ({"many": True}, {"many": False}),
+            ({"exclude": ("commands",)}, {}),
+            ({"strict": False}, {}),
+        ],
+    )
+    def test_different_kwargs(self, kwargs1, kwargs2):
+        schema1 = SchemaParser._get_schema("SystemSchema", **kwargs1)
+        schema2 = SchemaParser._get_schema("SystemSchema", **kwargs2)
+
+        assert schema1 is not schema2
+
+    def test_list_kwargs(self):
+        schema1 = SchemaParser._get_schema("SystemSchema", exclude=["commands"])
+        schema2 = SchemaParser._get_schema("SystemSchema", exclude=("commands",))
+
+        assert schema1 is schema2
+
+    def test_unhashable_kwargs(self):
+        schema1 = SchemaParser._get_schema("SystemSchema", context={"foo": "bar"})
+        schema2 = SchemaParser._get_schema("SystemSchema", context={"foo": "bar"})
+
+        assert schema1 is not schema2
+        assert schema1.context["models"] == SchemaParser._models
+
+    def test_serialize_then_parse(self, bg_system, system_dict):
+        """Serializing first must not prevent nested models from being parsed"""
+        SchemaParser.serialize_system(bg_system, to_string=False)
+
+        assert_system_equal(
+            SchemaParser.parse_system(system_dict, from_string=False), bg_system
+        )
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+import logging
+from contextlib import contextmanager
+
+import pytest
+from mock import Mock
+
+from brewtils import tracing
+from brewtils.models import Request
+from brewtils.request_handling import RequestProcessor
+from brewtils.schema_parser import SchemaParser
+
+
+class RecordingTracer(tracing.Tracer):
+    """Tracer that records spans, using span names as the context"""
+
+    def __init__(self):
+        self.spans = []
+        self.stack = []
+
+    @contextmanager
+    def span(self, name, context=None, attributes=None):
+        parent = context if context is not None else (self.stack or [None])[-1]
+        self.spans.append((name, parent, attributes))
+
+        self.stack.append(name)
+        try:
+            yield
+        finally:
+            self.stack.pop()
+
+    def inject(self):
+        return {"span": self.stack[-1]} if self.stack else {}
+
+    def extract(self, carrier):
+        return carrier["span"]
+
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.set_tracer(RecordingTracer())
+    yield tracer
+    tracing.set_tracer()
+
+
+class TestSetTracer(object):
+    def test_default(self):
+        assert isinstance(tracing.get_tracer(), tracing.NoopTracer)
+        assert tracing.is_enabled() is False
+
+    def test_set(self, tracer):
+        assert tracing.get_tracer() is tracer
+        assert tracing.is_enabled() is True
+
+    def test_enable(self):
+        pytest.importorskip("opentelemetry")
+
+        try:
+            assert tracing.enable() is True
+            assert isinstance(tracing.get_tracer(), tracing.OpenTelemetryTracer)
+        finally:
+            assert tracing.enable(False) is False
+
+    def test_enable_not_installed(self, monkeypatch, caplog):
+        def _missing():
+            raise ImportError
+
+        monkeypatch.setattr(tracing, "OpenTelemetryTracer", _missing)
+
+        with caplog.at_level(logging.WARNING):
+            assert tracing.enable() is False
+
+        assert isinstance(tracing.get_tracer(), tracing.NoopTracer)
+        assert len(caplog.records) == 1
+
+
+class TestDisabled(object):
+    def test_span(self):
+        with tracing.span("name") as span:
+            span.set_attribute("key", "value")
+
+    def test_inject(self):
+        assert tracing.inject_context({}) == {}
+
+    def test_extract(self):
+        assert tracing.extract_context({"trace_context": {"span": "a"}}) is None
+
+
+class TestContext(object):
+    def test_inject(self, tracer):
+        with tracing.span("parent"):
+            assert tracing.inject_context({"a": "b"}) == {
+                "a": "b",
+                "trace_context": {"span": "parent"},
+            }
+
+    def test_inject_no_span(self, tracer):
+        assert tracing.inject_context({}) == {}
+
+    @pytest.mark.parametrize(
+        "headers,metadata,expected",
+        [
+            ({}, {}, None),
+            (None, None, None),
+            ({}, {"trace_context": {"span": "m"}}, "m"),
+            ({"trace_context": {"span": "h"}}, {"trace_context": {"span": "m"}}, "h"),
+            ({"traceparent": "x", "span": "t"}, {"trace_context": {"span": "m"}}, "t"),
+        ],
+    )
+    def test_extract(self, tracer, headers, metadata, expected):
+        assert tracing.extract_context(headers, metadata) == expected
+
+
+class Target(object):
+    def echo(self, message):
+        return message
+
+
+class TestProcessing(object):
+    def test_spans(self, tracer):
+        processor = RequestProcessor(Target(), Mock(), Mock(), max_workers=1)
+
+        message = SchemaParser.serialize_request(
+            Request(
+                id="1",
+                command="echo",
+                parameters={"message": "hi"},
+                metadata={"trace_context": {"span": "send_bg_request"}},
+            ),
+            to_string=True,
+        )
+        processor.on_message_received(message, {}).result(timeout=5)
+
+        (process, process_parent, attributes), (invoke, invoke_parent, _) = tracer.spans
+        assert (process, process_parent) == ("process_message", "send_bg_request")
+        assert (invoke, invoke_parent) == ("invoke_command", "process_message")
+        assert attributes["brewtils.request.command"] == "echo"
+
+
+class TestOpenTelemetry(object):
+    @pytest.fixture
+    def exporter(self):
+        pytest.importorskip("opentelemetry.sdk")
+
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+            InMemorySpanExporter,
+        )
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+        tracing.set_tracer(tracing.OpenTelemetryTracer(tracer_provider=provider))
+        yield exporter
+        tracing.set_tracer()
+
+    def test_parent_child(self, exporter):
+        with tracing.span("send_bg_request"):
+            metadata = tracing.inject_context({})
+
+        assert "traceparent" in metadata["trace_context"]
+
+        with tracing.span(
+            "process_message", context=tracing.extract_context({}, metadata)
+        ):
+            pass
+
+        child, parent = sorted(
+            exporter.get_finished_spans(), key=lambda s: s.name != "process_message"
+        )
+        assert child.parent.span_id == parent.context.span_id
+        assert child.context.trace_id == parent.context.trace_id
+
+    def test_exception(self, exporter):
+        with pytest.raises(ValueError):
+            with tracing.span("invoke_command"):
+                raise ValueError("Oh no")
+
+        (span,) = exporter.get_finished_spans()
+        assert span.status.is_ok is False